@@ -4,6 +4,7 @@ class AchievementManager:
             "first_steps": {
                 "name": "First Steps",
                 "description": "Move to a new location",
+                "trigger": "move",
                 "unlocked": False,
                 "difficulty": "basic",
                 "reward": None
@@ -11,6 +12,7 @@ class AchievementManager:
             "survivalist": {
                 "name": "Survivalist",
                 "description": "Cook your first meal",
+                "trigger": "cook",
                 "unlocked": False,
                 "difficulty": "basic",
                 "reward": None
@@ -18,6 +20,8 @@ class AchievementManager:
             "wolf_whisperer": {
                 "name": "Wolf Whisperer",
                 "description": "Befriend a wolf without taking damage",
+                "trigger": "befriend",
+                "condition": lambda context: context.get("creature") == "wolf" and not context.get("damage_taken"),
                 "unlocked": False,
                 "difficulty": "intermediate",
                 "reward": None
@@ -25,6 +29,7 @@ class AchievementManager:
             "treasure_hunter": {
                 "name": "Treasure Hunter",
                 "description": "Find 5 valuable items",
+                "trigger": "find_treasure",
                 "unlocked": False,
                 "progress": 0,
                 "target": 5,
@@ -34,8 +39,10 @@ class AchievementManager:
             "master_chef": {
                 "name": "Master Chef",
                 "description": "Create 3 different types of meals",
+                "trigger": "cook",
+                "distinct": "meal_type",
                 "unlocked": False,
-                "progress": set(),
+                "progress": 0,
                 "target": 3,
                 "difficulty": "intermediate",
                 "reward": None
@@ -43,13 +50,26 @@ class AchievementManager:
             "explorer": {
                 "name": "Explorer",
                 "description": "Discover all location types",
+                "trigger": "discover_location",
+                "distinct": "location_type",
                 "unlocked": False,
-                "progress": set(),
+                "progress": 0,
                 "target": 3,
                 "difficulty": "advanced",
                 "reward": None
             }
         }
+        
+        self._listen()
+        self.seen = {}    # achievement id -> bitset of the distinct values counted
+        self.values = {}  # distinct context value -> its bit
+        
+    def _listen(self):
+        # action -> ids of the locked achievements listening for it
+        self.listeners = {}
+        for achievement_id, ach in self.achievements.items():
+            if not ach["unlocked"]:
+                self.listeners.setdefault(ach["trigger"], []).append(achievement_id)
 
     def unlock(self, achievement_id):
         """Alias for unlock_achievement for simpler API"""
@@ -60,13 +80,18 @@ class AchievementManager:
         ach = self.achievements[name]
         if not ach["unlocked"]:
             ach["unlocked"] = True
+            listeners = self.listeners[ach["trigger"]]
+            listeners.remove(name)
+            if not listeners:
+                del self.listeners[ach["trigger"]]
             
             if game_state:  # Only generate rewards if game_state provided
                 # Generate rewards
-                rewards = game_state.reward_generator.generate_reward(
-                    ach["difficulty"], 
-                    game_state.item_generator
-                )
+                with game_state.world_generator.lock:
+                    rewards = game_state.reward_generator.generate_reward(
+                        ach["difficulty"], 
+                        game_state.item_generator
+                    )
                 
                 # Give rewards to player
                 for item in rewards:
@@ -75,44 +100,46 @@ class AchievementManager:
                 # Format reward message
                 reward_msg = "\n".join(f"- {item.name}" for item in rewards)
                 return f"\n🏆 Achievement Unlocked: {name} - {ach['description']}\n\nRewards:\n{reward_msg}"
+            return self._format_achievement(name)
                 
         return None
 
     def check_achievement(self, game_state, action, context):
-        updates = []
+        """Count a game action towards the achievements listening for it
         
-        if action == "move":
-            if not self.achievements["first_steps"]["unlocked"]:
-                updates.append(self.unlock_achievement("first_steps", game_state))
-                
-        elif action == "cook":
-            if not self.achievements["survivalist"]["unlocked"]:
-                updates.append(self.unlock_achievement("survivalist", game_state))
-            
-            # Check master chef
-            meal_type = context.get("meal_type")
-            if meal_type:
-                ach = self.achievements["master_chef"]
-                if not ach["unlocked"]:
-                    ach["progress"].add(meal_type)
-                    if len(ach["progress"]) >= ach["target"]:
-                        ach["unlocked"] = True
-                        updates.append(self._format_achievement("Master Chef"))
-                        
-        elif action == "discover_location":
-            location_type = context.get("location_type")
-            if location_type:
-                ach = self.achievements["explorer"]
-                if not ach["unlocked"]:
-                    ach["progress"].add(location_type)
-                    if len(ach["progress"]) >= ach["target"]:
-                        ach["unlocked"] = True
-                        updates.append(self._format_achievement("Explorer"))
-                        
+        Only locked achievements listen, so an action costs nothing once
+        everything that cares about it is unlocked. Returns the unlock
+        messages.
+        """
+        updates = []
+        for achievement_id in list(self.listeners.get(action, ())):
+            if self._advance(achievement_id, context):
+                updates.append(self.unlock_achievement(achievement_id, game_state))
         return [update for update in updates if update]
         
-    def _format_achievement(self, name):
-        return f"\n🏆 Achievement Unlocked: {name} - {self.achievements[name]['description']}" 
+    def _advance(self, achievement_id, context):
+        """Count an action towards an achievement; returns whether it's now complete"""
+        ach = self.achievements[achievement_id]
+        condition = ach.get("condition")
+        if condition and not condition(context):
+            return False
+        if "distinct" in ach:
+            value = context.get(ach["distinct"])
+            if value is None:
+                return False
+            bit = 1 << self.values.setdefault(value, len(self.values))
+            seen = self.seen.get(achievement_id, 0)
+            if seen & bit:
+                return False
+            self.seen[achievement_id] = seen | bit
+        if "progress" not in ach:
+            return True
+        ach["progress"] += 1
+        return ach["progress"] >= ach["target"]
+        
+    def _format_achievement(self, achievement_id):
+        ach = self.achievements[achievement_id]
+        return f"\n🏆 Achievement Unlocked: {ach['name']} - {ach['description']}" 
 
     def is_unlocked(self, achievement_id):
         """Check if an achievement is unlocked"""
@@ -122,6 +149,26 @@ class AchievementManager:
         """Get progress for an achievement"""
         return self.achievements.get(achievement_id, {}).get("progress", 0)
         
+    def to_dict(self):
+        """Progress worth saving: what's unlocked, the counters and the distinct values seen"""
+        return {
+            "unlocked": [id for id, ach in self.achievements.items() if ach["unlocked"]],
+            "progress": {id: ach["progress"] for id, ach in self.achievements.items() if ach.get("progress")},
+            "values": sorted(self.values, key=self.values.get),
+            "seen": dict(self.seen)
+        }
+        
+    def restore(self, data):
+        """Replace all progress with what to_dict saved"""
+        progress, unlocked = data.get("progress", {}), set(data.get("unlocked", ()))
+        for achievement_id, ach in self.achievements.items():
+            ach["unlocked"] = achievement_id in unlocked
+            if "progress" in ach:
+                ach["progress"] = progress.get(achievement_id, 0)
+        self._listen()
+        self.values = {value: bit for bit, value in enumerate(data.get("values", ()))}
+        self.seen = {id: bits for id, bits in data.get("seen", {}).items() if id in self.achievements}
+        
     def get_all_progress(self):
         """Get progress for all achievements"""
         return {id: ach.get("progress", 0) 
@@ -1,9 +1,124 @@
+import sys
+from items import Item
+
+
+class LocationDelta:
+    """Player-made changes to a generated location.
+
+    Generated content is rebuilt from the world seed, so only what the
+    player changed (items taken or dropped, creatures killed) is stored.
+    Dropped items and removed entities carry the game minute they were
+    recorded, None until the world simulation first settles them.
+    """
+    def __init__(self):
+        self.items_taken = []       # Names of generated items removed
+        self.items_added = []       # Items brought in after generation
+        self.items_added_at = []    # Minute each added item was dropped
+        self.entities_removed = []  # Names of generated entities removed
+        self.entities_removed_at = []  # Minute each entity was removed
+        self.entities_added = []    # Transient, e.g. summoned allies
+        self.rooms = {}             # Cave room index -> LocationDelta
+        
+    def is_empty(self):
+        if self.items_taken or self.items_added or self.entities_removed:
+            return False
+        return all(room.is_empty() for room in self.rooms.values())
+        
+    def record_item_added(self, item):
+        self.items_added.append(item)
+        self.items_added_at.append(None)
+        
+    def record_item_removed(self, item):
+        if any(added is item for added in self.items_added):
+            kept = [(added, minute) for added, minute in zip(self.items_added, self.items_added_at)
+                    if added is not item]
+            self.items_added = [added for added, _ in kept]
+            self.items_added_at = [minute for _, minute in kept]
+        else:
+            self.items_taken.append(item.name)
+            
+    def record_entity_added(self, entity):
+        self.entities_added.append(entity)
+        
+    def record_entity_removed(self, entity):
+        if any(added is entity for added in self.entities_added):
+            self.entities_added = [added for added in self.entities_added if added is not entity]
+        else:
+            self.entities_removed.append(entity.name)
+            self.entities_removed_at.append(None)
+            
+    def expire(self, now, respawn_minutes, decay_minutes):
+        """Drop the removals and dropped items that have outlived their time
+
+        Entries without a minute yet are stamped with now. Returns the
+        names of the entities due to respawn and the items that decayed;
+        quest items never decay.
+        """
+        removed = [(name, now if minute is None else minute)
+                   for name, minute in zip(self.entities_removed, self.entities_removed_at)]
+        respawned = [name for name, minute in removed if now - minute >= respawn_minutes]
+        removed = [(name, minute) for name, minute in removed if now - minute < respawn_minutes]
+        self.entities_removed = [name for name, _ in removed]
+        self.entities_removed_at = [minute for _, minute in removed]
+        
+        added = [(item, now if minute is None else minute)
+                 for item, minute in zip(self.items_added, self.items_added_at)]
+        decayed = [item for item, minute in added
+                   if now - minute >= decay_minutes and item.type != Item.QUEST_ITEM]
+        added = [(item, minute) for item, minute in added if not any(item is gone for gone in decayed)]
+        self.items_added = [item for item, _ in added]
+        self.items_added_at = [minute for _, minute in added]
+        return respawned, decayed
+            
+    def apply(self, location):
+        """Replay the recorded changes onto a freshly generated location"""
+        for name in self.items_taken:
+            match = next((item for item in location.items if item.name == name), None)
+            if match:
+                location.items.remove(match)
+        for name in self.entities_removed:
+            match = next((entity for entity in location.entities if entity.name == name), None)
+            if match:
+                location.entities.remove(match)
+        location.items.extend(self.items_added)
+        
+    def to_dict(self):
+        return {
+            "items_taken": list(self.items_taken),
+            "items_added": [item.to_dict() for item in self.items_added],
+            "items_added_at": list(self.items_added_at),
+            "entities_removed": list(self.entities_removed),
+            "entities_removed_at": list(self.entities_removed_at),
+            "rooms": {str(index): room.to_dict()
+                      for index, room in self.rooms.items() if not room.is_empty()}
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        delta = cls()
+        delta.items_taken = list(data.get("items_taken", []))
+        delta.items_added = [Item.from_dict(item) for item in data.get("items_added", [])]
+        delta.items_added_at = list(data.get("items_added_at", [None] * len(delta.items_added)))
+        delta.entities_removed = list(data.get("entities_removed", []))
+        delta.entities_removed_at = list(data.get("entities_removed_at",
+                                                  [None] * len(delta.entities_removed)))
+        delta.rooms = {int(index): cls.from_dict(room)
+                       for index, room in data.get("rooms", {}).items()}
+        return delta
+
+
 class Location:
+    # Rarer attributes (cave_rooms, room_index, ...) land in the __dict__
+    # extension slot, created only when first used
+    __slots__ = ("id", "location_type", "name", "description", "coordinates", "items",
+                 "entities", "connections", "changes", "cave_seed", "surface", "last_seen", "__dict__")
+    
     def __init__(self, location_type, name):
-        self.id = id(self)  # Add unique ID
-        self.location_type = location_type
-        self.name = name
+        self.id = None  # Allocated by the location table once discovered
+        self.location_type = sys.intern(location_type)
+        self.name = sys.intern(name)
         self.description = ""
+        self.coordinates = None
         self.items = []
         self.entities = []
         self.connections = {
@@ -12,18 +127,44 @@ class Location:
             "east": None,
             "west": None
         }
+        # Only set for seeded locations, once generation has finished
+        self.changes = None
+        self.cave_seed = None  # Seed of the cave system below, if any
+        self.surface = None    # For cave rooms, the location above
+        self.last_seen = None  # Game minute wandering creatures were last accounted for
+        
+    def track_changes(self, delta=None):
+        """Start recording player changes, replaying a stored delta if given"""
+        if delta:
+            delta.apply(self)
+        self.changes = delta or LocationDelta()
+        
+    def is_modified(self):
+        return self.changes is not None and not self.changes.is_empty()
         
     def add_item(self, item):
         """Add an item to this location"""
         self.items.append(item)
+        if self.changes is not None:
+            self.changes.record_item_added(item)
         
     def add_entity(self, entity):
         """Add an entity to this location"""
         self.entities.append(entity)
+        if self.changes is not None:
+            self.changes.record_entity_added(entity)
         
     def remove_item(self, item):
         """Remove an item from this location"""
         self.items.remove(item)
+        if self.changes is not None:
+            self.changes.record_item_removed(item)
+            
+    def remove_entity(self, entity):
+        """Remove an entity (killed or departed) from this location"""
+        self.entities.remove(entity)
+        if self.changes is not None:
+            self.changes.record_entity_removed(entity)
         
     def get_description(self):
         """Get the full description including items and entities"""
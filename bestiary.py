@@ -1,4 +1,8 @@
-from items import Item
+from items import Item, ItemTemplate
+from loot_table import LootTable
+
+CREATURE_DROP_CHANCE = 0.25  # Chance of each drop a generated creature lists by loot key
+CREATURE_FOODS = {"raw meat": 12.5}  # Creature drops that are food, with their food value
 
 class EntityType:
     def __init__(self, name, description, loot_table=None, hostile=False, 
@@ -13,17 +17,18 @@ class EntityType:
 
 class Bestiary:
     def __init__(self):
+        # Loot tables hold (ItemTemplate, drop chance) pairs
         self.entities = {
             # Neutral entities
             "dead body": EntityType(
                 name="dead body",
                 description="A lifeless body lies in the grass",
                 loot_table=[
-                    (Item("gold coins", "A handful of golden coins"), 0.7),
-                    (Item("dagger", "A rusty but serviceable dagger"), 0.5),
-                    (Item("letter", "A weathered letter with mysterious contents"), 0.3),
-                    (Item("brass key", "An ornate brass key"), 0.2),
-                    (Item("silver ring", "A silver ring with strange markings"), 0.4)
+                    (ItemTemplate.get("gold coins", "A handful of golden coins", Item.MISC), 0.7),
+                    (ItemTemplate.get("dagger", "A rusty but serviceable dagger", Item.WEAPON), 0.5),
+                    (ItemTemplate.get("letter", "A weathered letter with mysterious contents", Item.QUEST_ITEM), 0.3),
+                    (ItemTemplate.get("brass key", "An ornate brass key", Item.QUEST_ITEM), 0.2),
+                    (ItemTemplate.get("silver ring", "A silver ring with strange markings", Item.MISC), 0.4)
                 ],
                 story="""The body appears to be that of a previous adventurer. 
                 Their final expression suggests they died in fear rather than from wounds.
@@ -37,8 +42,8 @@ class Bestiary:
                 hostile=True,
                 preferred_food="meat",
                 loot_table=[
-                    (Item("wolf fang", "A sharp fang from a wolf"), 0.3),
-                    (Item("wolf pelt", "A thick, grey wolf pelt"), 0.5)
+                    (ItemTemplate.get("wolf fang", "A sharp fang from a wolf", Item.MISC), 0.3),
+                    (ItemTemplate.get("wolf pelt", "A thick, grey wolf pelt", Item.MISC), 0.5)
                 ],
                 story="""The wolves in these lands are unusually large and intelligent.
                 Local legends speak of an ancient pact between wolves and the first settlers,
@@ -51,7 +56,7 @@ class Bestiary:
                 description="A large bat hangs from the ceiling, something glints around its neck",
                 preferred_food="fruit",
                 loot_table=[
-                    (Item("silver chain", "A delicate silver chain, perhaps from a previous adventurer"), 1.0)
+                    (ItemTemplate.get("silver chain", "A delicate silver chain, perhaps from a previous adventurer", Item.MISC), 1.0)
                 ],
                 story="""These aren't ordinary bats - they're descendants of the messenger bats
                 used by the ancient cave dwellers. The chains they wear were once used to carry
@@ -61,8 +66,33 @@ class Bestiary:
             # Add more entity types as needed...
         }
     
+        self.loot_tables = {}  # name -> compiled LootTable, built on first use
+    
     def get_entity_type(self, name):
         return self.entities.get(name)
+        
+    def get_loot_table(self, name, extra=(), multiplier=1.0):
+        """Return the compiled loot table for an entity type, or None if it has no loot
+        
+        extra lists further drops by loot key ("wolf_pelt"), as generated
+        creatures carry them, and multiplier scales every chance.
+        """
+        key = name if not extra and multiplier == 1.0 else (name, tuple(extra), multiplier)
+        if key not in self.loot_tables:
+            entity_type = self.entities.get(name)
+            loot = list(entity_type.loot_table) if entity_type else []
+            names = {template.name for template, _ in loot}
+            for loot_key in extra:
+                item_name = loot_key.replace("_", " ")
+                if item_name not in names:
+                    names.add(item_name)
+                    item_type = Item.FOOD if item_name in CREATURE_FOODS else Item.MISC
+                    template = ItemTemplate.get(item_name, f"A {item_name} taken from a {name}", item_type)
+                    loot.append((template, CREATURE_DROP_CHANCE))
+            if multiplier != 1.0:
+                loot = [(template, min(1.0, chance * multiplier)) for template, chance in loot]
+            self.loot_tables[key] = LootTable(loot) if loot else None
+        return self.loot_tables[key]
     
     def get_all_entries(self):
         return self.entities.items() 
\ No newline at end of file
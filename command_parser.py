@@ -4,7 +4,10 @@ from commands import (LookCommand, SearchCommand, MoveCommand,
                      TalkCommand, FeedCommand, SurveyCommand, 
                      CampCommand, EatCommand, DrinkCommand,
                      EquipCommand, UnequipCommand, EquipmentCommand,
-                     QuestCommand, AchievementsCommand, StatsCommand)
+                     QuestCommand, AchievementsCommand, StatsCommand,
+                     TravelCommand, MapCommand, BuyCommand,
+                     SellCommand, AppraiseCommand, CraftCommand,
+                     CookCommand)
 
 class CommandParser:
     def __init__(self):
@@ -27,6 +30,11 @@ class CommandParser:
             's': lambda args: MoveCommand(['south']),
             'e': lambda args: MoveCommand(['east']),
             'w': lambda args: MoveCommand(['west']),
+            'u': lambda args: MoveCommand(['up']),
+            'd': lambda args: MoveCommand(['down']),
+            'travel': TravelCommand,
+            'journey': TravelCommand,
+            'map': MapCommand,
             
             # Inventory commands
             'inventory': InventoryCommand,
@@ -68,6 +76,13 @@ class CommandParser:
             'feed': FeedCommand,
             'give': FeedCommand,
             
+            # Trading commands
+            'buy': BuyCommand,
+            'purchase': BuyCommand,
+            'sell': SellCommand,
+            'appraise': AppraiseCommand,
+            'value': AppraiseCommand,
+            
             # Environment commands
             'survey': SurveyCommand,
             'scan': SurveyCommand,
@@ -80,6 +95,11 @@ class CommandParser:
             'sleep': CampCommand,
             'make camp': CampCommand,
             'set camp': CampCommand,
+            'cook': CookCommand,
+            'prepare': CookCommand,
+            'brew': CookCommand,
+            'craft': CraftCommand,
+            'make': CraftCommand,
             'eat': EatCommand,
             'consume': EatCommand,
             'taste': EatCommand,
@@ -1,4 +1,5 @@
-from items import Item
+from crafting import CRAFTING, COOKING
+from inventory import GEAR_SCORES
 
 
 class Command:
@@ -36,10 +37,48 @@ class MoveCommand(Command):
             return
             
         direction = self.args[0].lower()
-        if direction in ['north', 'south', 'east', 'west']:
-            game_state.current_location.move_direction(direction, game_state)
+        if direction in ['north', 'south', 'east', 'west', 'up', 'down']:
+            destination = game_state.move(direction)
+            if destination is None:
+                print("You can't go that way.")
+            else:
+                print(f"You head {direction}. {destination.name}.")
+        else:
+            print("You can only move north, south, east, west, up, or down.")
+
+class TravelCommand(Command):
+    def execute(self, game_state):
+        args = self.args[1:] if self.args and self.args[0].lower() == 'to' else self.args
+        if not args:
+            print("Where would you like to travel? (a place you've been, or x,y)")
+            return
+            
+        if getattr(game_state.current_location, 'surface', None) is not None:
+            print("You need to be above ground to travel.")
+            return
+            
+        planner = game_state.route_planner
+        target = ' '.join(args)
+        goal = planner.resolve_target(target)
+        if goal is None:
+            print(f"You don't know of any {target}.")
+            return
+            
+        route = planner.find_route(game_state.current_location.coordinates, goal)
+        if route is None:
+            print("You don't know a way there.")
+            return
+        if not route:
+            print("You're already there.")
+            return
+            
+        steps = game_state.travel(route)
+        location = game_state.current_location
+        if steps < len(route):
+            print(f"After {steps} steps your journey is interrupted!")
+            print(location.get_description())
         else:
-            print("You can only move north, south, east, or west.")
+            print(f"You travel {steps} steps and arrive at {location.name}.")
 
 class InventoryCommand(Command):
     def execute(self, game_state):
@@ -112,7 +151,9 @@ class HelpCommand(Command):
 === Basic Commands ===
 - look (l) : examine your surroundings
 - examine/read/inspect (x) : look at something closely
-- go/move/walk <direction> : move in a direction (n/s/e/w)
+- go/move/walk <direction> : move in a direction (n/s/e/w, u/d in caves)
+- travel <place or x,y> : journey to somewhere you've already been
+- map : show the area you've explored
 - take/get/grab : pick up an item
 - inventory (i/inv) : check your belongings
 - help (h/?) : show this help message
@@ -123,15 +164,25 @@ class HelpCommand(Command):
 - attack/fight/hit : attempt to attack something
 - feed/give : try to feed something with an item
 
+=== Trading Commands ===
+- buy : see what a merchant here has for sale
+- buy <item> / buy cheapest <kind> / buy best <kind> [under <gold>]
+- sell <item> : sell something to a merchant
+- appraise/value <item> : find out what something is worth
+
 === Equipment Commands ===
 - equip/wear/wield : equip an item
+- equip best [damage|defense|balanced] : equip the best gear you carry
 - unequip/remove : remove equipped item
 - equipment/gear (eq) : check your equipment and stats
 
 === Survival Commands ===
 - eat/taste <food> : consume food items
 - drink/sip : drink water if you have it
-- cook/prepare : set up camp and cook food
+- cook/prepare : set up camp and see what you can cook
+- cook <dish> / cook max <dish> : cook one, or as many as you can
+- craft : see what you can craft
+- craft <item> / craft max <item> : craft one, or as many as you can
 - rest : recover energy when safe
 - camp : set up camp for cooking and resting
 - status : check your health and needs
@@ -165,7 +216,11 @@ class AttackCommand(Command):
                 if result.get('player_damage'):
                     final_damage = max(0, result['player_damage'] - defense)
                     player.health -= final_damage
+                    entity.damage_dealt = getattr(entity, 'damage_dealt', 0) + final_damage
                     print(f"You took {final_damage} damage!")
+                if entity.health <= 0:
+                    kind = game_state.entity_generator.kind_of(entity.name) or entity.name
+                    game_state.report_progress("defeat_enemy", {"enemy": entity, "creature": kind})
                 return result['message']
                 
         print(f"There is no {target} here to attack.")
@@ -211,16 +266,94 @@ class FeedCommand(Command):
             if item_name.lower() in item.name.lower():
                 result = target_entity.feed(item, game_state)
                 # Check for story progression
-                story_update = game_state.story.check_progress(game_state, "feed", 
-                    {"target": target_entity.name, "item": item.name})
-                if story_update:
-                    print("\n" + "="*50)
-                    print("New chapter unlocked!")
-                    print(story_update)
+                kind = game_state.entity_generator.kind_of(target_entity.name) or target_entity.name
+                befriended = getattr(target_entity, 'befriended', False)
+                game_state.report_progress("feed", {"target": kind, "item": item.name, "befriended": befriended})
+                if befriended:
+                    game_state.report_progress("befriend", {
+                        "creature": kind, "damage_taken": getattr(target_entity, 'damage_dealt', 0)})
                 return result
                 
         print(f"You don't have any {item_name} to feed them.") 
 
+class BuyCommand(Command):
+    def execute(self, game_state):
+        market = game_state.market
+        merchant = market.merchant()
+        if merchant is None:
+            print("There's no merchant here to trade with.")
+            return
+            
+        npc, entity = merchant
+        npcs = game_state.npcs
+        if not self.args:
+            wares = npcs.stock_index(npc).all()
+            if not wares:
+                print("The merchant has nothing left to sell.")
+                return
+            print("\n=== For Sale ===")
+            for ware in wares:
+                price = market.asking_price(market.prices.ware_value(*npcs.wares[ware]))
+                print(f"- {npcs.ware_item(ware)}: {price} gold")
+            print(f"You have {game_state.player.gold} gold.")
+            return
+            
+        ware = market.find_ware(npc, self.args)
+        if ware is None:
+            print(f"The merchant has nothing like {' '.join(self.args)} for you.")
+            return
+        print(market.buy(npc, entity, ware))
+
+class SellCommand(Command):
+    def execute(self, game_state):
+        if not self.args:
+            print("What would you like to sell?")
+            return
+            
+        market = game_state.market
+        merchant = market.merchant()
+        if merchant is None:
+            print("There's no merchant here to trade with.")
+            return
+            
+        item_name = ' '.join(self.args).lower()
+        for item in game_state.player.inventory:
+            if item_name in item.name.lower():
+                print(market.sell(*merchant, item))
+                return
+                
+        print(f"You don't have a {item_name} to sell.")
+
+class AppraiseCommand(Command):
+    def execute(self, game_state):
+        if not self.args:
+            print("What would you like to appraise?")
+            return
+            
+        market = game_state.market
+        merchant = market.merchant()
+        item_name = ' '.join(self.args).lower()
+        for item in game_state.player.inventory:
+            if item_name in item.name.lower():
+                value = market.prices.value(item)
+                if value is None:
+                    print(f"The {item.name} isn't something you could sell.")
+                elif merchant is None:
+                    print(f"You reckon the {item.name} is worth about {value} gold.")
+                else:
+                    print(f"The merchant would give you {market.offer(value)} gold for the {item.name}.")
+                return
+                
+        if merchant is not None:
+            npc, _ = merchant
+            ware = market.find_ware(npc, self.args)
+            if ware is not None:
+                value = market.prices.ware_value(*game_state.npcs.wares[ware])
+                print(f"The merchant wants {market.asking_price(value)} gold for the {game_state.npcs.ware_item(ware).name}.")
+                return
+                
+        print(f"You don't see any {item_name} to appraise.")
+
 class JournalCommand(Command):
     def execute(self, game_state):
         game_state.player.show_journal() 
@@ -255,6 +388,10 @@ class EquipCommand(Command):
             print("What would you like to equip?")
             return
             
+        if self.args[0].lower() == "best":
+            self._equip_best(game_state)
+            return
+            
         item_name = ' '.join(self.args)
         player = game_state.player
         
@@ -265,6 +402,21 @@ class EquipCommand(Command):
                 return
                 
         print(f"You don't have a {item_name} to equip.") 
+        
+    def _equip_best(self, game_state):
+        mode = self.args[1].lower() if len(self.args) > 1 else "balanced"
+        if mode not in GEAR_SCORES:
+            print(f"Equip the best for what? Try {', '.join(GEAR_SCORES)}.")
+            return
+            
+        player = game_state.player
+        loadout = player.best_loadout(mode)
+        if not loadout:
+            print("You're already wearing the best you have.")
+            return
+        player.equip_loadout(loadout)
+        for slot, item in loadout.items():
+            print(f"{slot.capitalize()}: {item}")
 
 class SaveCommand(Command):
     def execute(self, game_state):
@@ -344,6 +496,7 @@ class CampCommand(Command):
             return
             
         print("You gather materials and set up a small camp.")
+        game_state.milestones["made_camp"] = True
         print("\nAvailable actions:")
         print("1. Cook food")
         print("2. Rest")
@@ -357,87 +510,31 @@ class CampCommand(Command):
             self._rest(game_state)
             
     def _cook_food(self, game_state):
-        print("\nCooking options:")
-        print("1. Cook raw food")
-        print("2. Prepare meal (combine foods)")
-        print("3. Make tea from herbs")
-        print("4. Cancel")
-        
-        choice = input("\nWhat would you like to do? ")
-        
-        if choice == "1":
-            self._cook_raw_food(game_state)
-        elif choice == "2":
-            self._prepare_meal(game_state)
-        elif choice == "3":
-            self._make_tea(game_state)
-            
-    def _prepare_meal(self, game_state):
-        food_items = [item for item in game_state.player.inventory 
-                     if item.type == "food" and "raw" not in item.name.lower()]
-        
-        if len(food_items) < 2:
-            print("You need at least 2 food items to prepare a meal.")
+        recipes = game_state.recipes
+        options = list(recipes.craftable(game_state.player.inventory, COOKING).items())
+        if not options:
+            print("You don't have anything to cook.")
             return
             
-        print("\nAvailable ingredients:")
-        for i, item in enumerate(food_items, 1):
-            print(f"{i}. {item.name}")
-            
-        try:
-            print("\nSelect two ingredients (e.g., '1 2'):")
-            choices = input().split()
-            if len(choices) != 2:
-                return
-                
-            idx1, idx2 = map(lambda x: int(x) - 1, choices)
-            item1 = food_items[idx1]
-            item2 = food_items[idx2]
-            
-            # Create a better meal
-            meal_value = (item1.food_value + item2.food_value) * 1.2
-            meal = Item(f"prepared meal", 
-                       f"A tasty meal made from {item1.name} and {item2.name}",
-                       "food", food_value=meal_value)
-                       
-            game_state.player.remove_item(item1)
-            game_state.player.remove_item(item2)
-            game_state.player.add_item(meal)
-            game_state.advance_time(20)
-            print(f"\nYou prepare a delicious meal combining {item1.name} and {item2.name}!")
-            
-        except (ValueError, IndexError):
-            print("Invalid choice.")
-            
-    def _make_tea(self, game_state):
-        herbs = [item for item in game_state.player.inventory 
-                if item.type == "food" and "herb" in item.name.lower()]
+        print("\nCooking options:")
+        for i, (name, count) in enumerate(options, 1):
+            print(f"{i}. {name} (enough for {count})")
+        print(f"{len(options) + 1}. Cancel")
         
-        if not herbs:
-            print("You need herbs to make tea.")
-            return
-            
-        print("\nAvailable herbs:")
-        for i, item in enumerate(herbs, 1):
-            print(f"{i}. {item.name}")
-            
         try:
-            choice = int(input("\nWhich herbs to use? ")) - 1
-            if choice < 0 or choice >= len(herbs):
+            choice = int(input("\nWhat would you like to do? ")) - 1
+            if choice < 0 or choice >= len(options):
                 return
-                
-            herb = herbs[choice]
-            tea = Item("herbal tea", 
-                      f"A soothing tea made from {herb.name}",
-                      "food", food_value=herb.food_value * 1.5)
-                      
-            game_state.player.remove_item(herb)
-            game_state.player.add_item(tea)
-            game_state.advance_time(10)
-            print(f"\nYou prepare a refreshing tea from {herb.name}!")
-            
-        except (ValueError, IndexError):
-            print("Invalid choice.")
+        except ValueError:
+            return
+        recipe = recipes.recipes[options[choice][0]]
+        made = recipes.craft(recipe, game_state.player)
+        if not made:
+            print(f"You don't have what you need for {recipe.name}.")
+            return
+        game_state.advance_time(recipe.minutes)
+        print(f"\nYou prepare {made[0].description[0].lower()}{made[0].description[1:]}!")
+        game_state.report_progress("cook", {"recipe": recipe.name, "meal_type": recipe.name, "count": len(made)})
             
     def _rest(self, game_state):
         game_state.advance_time(60)  # Rest for an hour
@@ -510,22 +607,72 @@ class EquipmentCommand(Command):
                 print(f"{slot.capitalize()}: Nothing equipped") 
 
 class CraftCommand(Command):
+    kinds = CRAFTING
+    verb = "craft"
+    
     def execute(self, game_state):
-        recipes = {
-            "torch": {"wood": 1, "cloth": 1},
-            "bandage": {"herbs": 2},
-            "water_flask": {"water": 1, "leather": 1}
-        }
-        # Show available recipes based on inventory 
+        recipes = game_state.recipes
+        player = game_state.player
+        if not self.args:
+            makeable = recipes.craftable(player.inventory, self.kinds)
+            if not makeable:
+                print(f"You don't have what you need to {self.verb} anything.")
+                return
+            print(f"\n=== You Can {self.verb.capitalize()} ===")
+            for name, count in makeable.items():
+                print(f"- {name} (enough for {count})")
+            return
+            
+        words = [word.lower() for word in self.args]
+        batch = words[0] in ("max", "all") and len(words) > 1
+        if batch:
+            words = words[1:]
+        recipe = recipes.find(' '.join(words), self.kinds)
+        if recipe is None:
+            print(f"You don't know how to {self.verb} {' '.join(words)}.")
+            return
+            
+        batches = recipes.craftable(player.inventory, self.kinds).get(recipe.name, 0)
+        if not batches:
+            needs = ", ".join(f"{count} {key}" for key, count in recipe.needs.items())
+            print(f"You need {needs} to {self.verb} {recipe.name}.")
+            return
+        if not batch:
+            batches = 1
+        made = recipes.craft(recipe, player, batches)
+        if not made:
+            print(f"You don't have what you need to {self.verb} {recipe.name}.")
+            return
+        game_state.advance_time(recipe.minutes * batches)  # A whole batch is one action
+        print(f"You {self.verb} {len(made)} {recipe.name}.")
+        self._crafted(game_state, recipe, made)
+        
+    def _crafted(self, game_state, recipe, made):
+        game_state.report_progress(self.verb, {"recipe": recipe.name, "meal_type": recipe.name, "count": len(made)})
+
+class CookCommand(CraftCommand):
+    kinds = COOKING
+    verb = "cook"
+    
+    def execute(self, game_state):
+        if any(entity.hostile for entity in game_state.current_location.entities):
+            print("You can't cook here - there are hostile creatures nearby!")
+            return
+        super().execute(game_state)
+        
+    def _crafted(self, game_state, recipe, made):
+        game_state.milestones["made_camp"] = True  # Cooking means a fire was lit
+        super()._crafted(game_state, recipe, made)
 
 class QuestCommand(Command):
     def execute(self, game_state):
         print("\n=== Active Quests ===")
-        for quest_id, quest in game_state.story.quests.items():
-            if not quest["completed"]:
-                print(f"\n{quest['name']}:")
-                current_stage = 1
-                for stage_num, desc in quest["stages"].items():
+        story = game_state.story
+        for quest_id, quest in story.quests.items():
+            current_stage = story.quest_stages.get(quest_id, 0)
+            if current_stage < len(quest["stages"]):
+                print(f"\n{quest['title']}:")
+                for stage_num, desc in enumerate(quest["stages"]):
                     status = "✓" if stage_num < current_stage else "•"
                     print(f"{status} {desc}") 
 
@@ -535,14 +682,24 @@ class AchievementsCommand(Command):
         for ach_id, ach in game_state.achievements.achievements.items():
             status = "✓" if ach["unlocked"] else "□"
             if "progress" in ach and not ach["unlocked"]:
-                if isinstance(ach["progress"], set):
-                    progress = f" ({len(ach['progress'])}/{ach['target']})"
-                else:
-                    progress = f" ({ach['progress']}/{ach['target']})"
+                progress = f" ({ach['progress']}/{ach['target']})"
             else:
                 progress = ""
             print(f"{status} {ach['name']}{progress}: {ach['description']}") 
 
+class MapCommand(Command):
+    def execute(self, game_state):
+        width, height = 60, 20
+        location = game_state.current_location
+        lines = game_state.map_renderer.render(location.coordinates, width, height)
+        x, y = location.coordinates
+        print("\n=== Map ===")
+        print("+" + "-" * width + "+")
+        for line in lines:
+            print("|" + line + "|")
+        print("+" + "-" * width + "+")
+        print(f"You are at {x},{y}.  @ you  . meadow  T forest  O cave")
+
 class StatsCommand(Command):
     def execute(self, game_state):
         player = game_state.player
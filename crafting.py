@@ -0,0 +1,145 @@
+from array import array
+from items import Item
+
+CRAFTING = ("craft",)
+COOKING = ("cook", "tea")
+
+# Every recipe the game knows. needs maps ingredient keys to how many are
+# used up; an ingredient key is an item's full name, its kind (the last
+# word of its name) or its type, with raw food kept apart from "food". An
+# item counts as the first of those any recipe asks for, and nothing else.
+# Food results are worth food_multiplier times the food value that went in.
+RECIPES = (
+    {"name": "torch", "kind": "craft", "needs": {"wood": 1, "cloth": 1}, "minutes": 10,
+     "result": ("torch", "A torch made from {ingredients}", Item.MISC)},
+    {"name": "bandage", "kind": "craft", "needs": {"herbs": 2}, "minutes": 5,
+     "result": ("bandage", "A poultice of {ingredients}", Item.MISC)},
+    {"name": "water flask", "kind": "craft", "needs": {"water": 1, "leather": 1}, "minutes": 10,
+     "result": ("water flask", "A leather flask of water", Item.MISC)},
+    {"name": "leather", "kind": "craft", "needs": {"pelt": 1}, "minutes": 30,
+     "result": ("leather", "Leather tanned from {ingredients}", Item.MISC)},
+    {"name": "cooked meat", "kind": "cook", "needs": {"raw meat": 1}, "minutes": 15,
+     "result": ("cooked meat", "Meat roasted over the fire", Item.FOOD), "food_multiplier": 2.0},
+    {"name": "prepared meal", "kind": "cook", "needs": {"food": 2}, "minutes": 20,
+     "result": ("prepared meal", "A tasty meal made from {ingredients}", Item.FOOD), "food_multiplier": 1.2},
+    {"name": "herbal tea", "kind": "tea", "needs": {"herbs": 1}, "minutes": 10,
+     "result": ("herbal tea", "A soothing tea made from {ingredients}", Item.FOOD), "food_multiplier": 1.5}
+)
+
+
+def ingredient_keys(template):
+    """The ingredient keys an item of this template counts towards"""
+    name = template.name.lower().replace("_", " ")
+    item_type = template.type
+    if item_type == Item.FOOD and "raw" in name.split():
+        item_type = "raw food"  # Only cooking recipes take raw food
+    return tuple(dict.fromkeys((name, name.split()[-1], item_type)))
+
+
+class Recipe:
+    __slots__ = ("name", "kind", "needs", "vector", "minutes", "result", "food_multiplier")
+
+    def __init__(self, entry, key_index):
+        self.name = entry["name"]
+        self.kind = entry["kind"]
+        self.needs = dict(entry["needs"])
+        self.vector = tuple((key_index[key], count) for key, count in self.needs.items())
+        self.minutes = entry["minutes"]
+        self.result = entry["result"]
+        self.food_multiplier = entry.get("food_multiplier")
+
+
+class RecipeBook:
+    """Registry of crafting, cooking and tea recipes, compiled for matching
+
+    Each recipe becomes a count vector over the ingredient keys it uses.
+    An inventory is counted into one array('H') over all keys in a single
+    pass, with each template's key worked out once; crafting picks
+    ingredients by the same key, so the counts are what it can deliver.
+    Only recipes using a key the inventory actually has are then looked
+    at, and how many of each can be made is the smallest count // need
+    over its vector.
+    """
+    def __init__(self, recipes=RECIPES):
+        self.keys = {}     # ingredient key -> index into count vectors
+        for entry in recipes:
+            for key in entry["needs"]:
+                self.keys.setdefault(key, len(self.keys))
+        self.recipes = {entry["name"]: Recipe(entry, self.keys) for entry in recipes}
+        self.users = [[] for _ in self.keys]  # key index -> recipes needing that key
+        for recipe in self.recipes.values():
+            for index, _ in recipe.vector:
+                self.users[index].append(recipe)
+        self.template_keys = {}  # (name, type) -> index of the key it counts as, or None
+
+    def key_of(self, template):
+        """Index of the one ingredient key items of this template count as, or None"""
+        # Only the name and type decide the key, and keying on them doesn't keep templates alive
+        fields = (template.name, template.type)
+        if fields in self.template_keys:
+            return self.template_keys[fields]
+        index = next((self.keys[key] for key in ingredient_keys(template) if key in self.keys), None)
+        self.template_keys[fields] = index
+        return index
+
+    def count(self, inventory):
+        """Count an inventory into a vector over the ingredient keys"""
+        counts = array('H', bytes(2 * len(self.keys)))
+        for item in inventory:
+            index = self.key_of(item.template)
+            if index is not None:
+                counts[index] += 1
+        return counts
+
+    def craftable(self, inventory, kinds=None):
+        """Return {recipe name: how many can be made} for the given recipe kinds"""
+        counts = self.count(inventory)
+        candidates = {recipe.name: recipe
+                      for index, count in enumerate(counts) if count
+                      for recipe in self.users[index]
+                      if kinds is None or recipe.kind in kinds}
+        makeable = {}
+        for name, recipe in candidates.items():
+            batches = min(counts[index] // need for index, need in recipe.vector)
+            if batches:
+                makeable[name] = batches
+        return makeable
+
+    def find(self, name, kinds=None):
+        """Return the recipe called name, or the first whose name contains it"""
+        name = name.lower()
+        recipes = [recipe for recipe in self.recipes.values() if kinds is None or recipe.kind in kinds]
+        return (next((recipe for recipe in recipes if recipe.name == name), None)
+                or next((recipe for recipe in recipes if name in recipe.name), None))
+
+    def craft(self, recipe, player, batches=1):
+        """Use up the ingredients for some batches of a recipe; returns the items made
+
+        Returns an empty list, using nothing, if the ingredients run short.
+        """
+        wanted = {index: need * batches for index, need in recipe.vector}
+        picked = {index: [] for index in wanted}  # key index -> items picked for it
+        for item in player.inventory:
+            index = self.key_of(item.template)
+            if wanted.get(index):
+                wanted[index] -= 1
+                picked[index].append(item)
+        if any(wanted.values()):
+            return []
+
+        for items in picked.values():
+            for item in items:
+                player.remove_item(item)
+        made = []
+        name, description, item_type = recipe.result
+        for batch in range(batches):
+            # Every batch takes its own share of each ingredient
+            used = [item for index, need in recipe.vector
+                    for item in picked[index][batch * need:(batch + 1) * need]]
+            ingredients = " and ".join(sorted({item.name for item in used}))
+            item = Item(name, description.format(ingredients=ingredients), item_type)
+            if recipe.food_multiplier:
+                item.food_value = sum(item.food_value for item in used) * recipe.food_multiplier
+            player.add_item(item)
+            made.append(item)
+        return made
@@ -0,0 +1,123 @@
+import math
+import random
+from population_model import SPECIES
+from time_manager import DAY_PARTS, PART_MINUTES
+
+# Wandering creatures turning up per hour, by location type and time of day
+ENCOUNTER_RATES = {
+    "meadow": {"Night": 0.05, "Morning": 0.2, "Afternoon": 0.15, "Evening": 0.25},
+    "forest": {"Night": 0.3, "Morning": 0.15, "Afternoon": 0.1, "Evening": 0.3},
+    "cave": {"Night": 0.1, "Morning": 0.05, "Afternoon": 0.05, "Evening": 0.4}
+}
+CAVE_DWELLERS = {"cave": "bat"}  # Location types whose visitors don't come from the population model
+MAX_CREATURES = 3  # Arrivals stop once a location holds this many creatures
+
+
+def poisson(mean, rng=random):
+    """Draw a Poisson-distributed count in constant expected time
+
+    Small means walk the distribution directly; larger ones use Hörmann's
+    transformed rejection (PTRS), which needs about one try per draw
+    however large the mean is.
+    """
+    if mean <= 0:
+        return 0
+    if mean < 10:
+        count = 0
+        term = cumulative = math.exp(-mean)
+        u = rng.random()
+        while u > cumulative and term > 0:
+            count += 1
+            term *= mean / count
+            cumulative += term
+        return count
+
+    root = math.sqrt(mean)
+    log_mean = math.log(mean)
+    b = 0.931 + 2.53 * root
+    a = -0.059 + 0.02483 * b
+    inverse_alpha = 1.1239 + 1.1328 / (b - 3.4)
+    v_r = 0.9277 - 3.6224 / (b - 2)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        count = math.floor((2 * a / us + b) * u + mean + 0.43)
+        if us >= 0.07 and v <= v_r:
+            return count
+        if count < 0 or (us < 0.013 and v > us):
+            continue
+        if (math.log(v) + math.log(inverse_alpha) - math.log(a / (us * us) + b)
+                <= -mean + count * log_mean - math.lgamma(count + 1)):
+            return count
+
+
+class EncounterScheduler:
+    """Brings wandering creatures into locations as time passes
+
+    Arrivals at a location form a Poisson process whose rate depends on
+    the location type and the time of day. Each location remembers when
+    it was last accounted for, and catching it up draws the number of
+    arrivals for the whole gap at once: the expected count comes from
+    integrating the rate over the gap in closed form, so waiting a minute
+    or a week costs the same. Arrivals are transient, like summoned
+    allies: they aren't saved and vanish if the location is evicted.
+    """
+    def __init__(self, game_state, rng=None):
+        self.game_state = game_state
+        self.rng = rng or random
+
+    def expected_arrivals(self, location_type, start, end):
+        """Mean number of creatures arriving between two game minutes"""
+        rates = ENCOUNTER_RATES.get(location_type)
+        if rates is None or end <= start:
+            return 0.0
+        return self._cumulative(rates, end) - self._cumulative(rates, start)
+
+    def _cumulative(self, rates, minute):
+        """Expected arrivals from minute 0 up to a game minute"""
+        minutes_per_day = self.game_state.time.minutes_per_day
+        per_part = [rates[part] * PART_MINUTES / 60 for part in DAY_PARTS]
+        days, minute = divmod(minute, minutes_per_day)
+        part, into = divmod(minute, PART_MINUTES)
+        return days * sum(per_part) + sum(per_part[:part]) + rates[DAY_PARTS[part]] * into / 60
+
+    def catch_up(self, location):
+        """Add the creatures that turned up since the location was last seen
+
+        Returns the new arrivals. A location seen for the first time only
+        starts its clock.
+        """
+        now = self.game_state.time.current_time
+        last_seen = getattr(location, 'last_seen', None)
+        location.last_seen = now
+        if last_seen is None:
+            return []
+
+        room = MAX_CREATURES - len(location.entities)
+        mean = self.expected_arrivals(location.location_type, last_seen, now)
+        if room <= 0 or mean <= 0:
+            return []
+        arrivals = []
+        for _ in range(min(room, poisson(mean, self.rng))):
+            kind = self._arrival_kind(location)
+            if kind is None:
+                break
+            with self.game_state.world_generator.lock:  # The prefetcher generates with the same caches
+                creature = self.game_state.entity_generator.generate_entity(kind, rng=self.rng)
+            creature.hostile = kind == "wolf"
+            creature = self.game_state.simulation.admit(location, creature)
+            location.add_entity(creature)
+            arrivals.append(creature)
+        return arrivals
+
+    def _arrival_kind(self, location):
+        """Pick what kind of creature turns up, following the local populations"""
+        kind = CAVE_DWELLERS.get(location.location_type)
+        coordinates = getattr(location, 'coordinates', None)
+        if kind is not None or coordinates is None:
+            return kind
+        expected = self.game_state.simulation.expected_animals(*coordinates)
+        if not any(expected):
+            return None
+        return self.rng.choices(SPECIES, weights=expected)[0]
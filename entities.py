@@ -1,18 +1,37 @@
 import random
-from items import Item
+import sys
+from bestiary import CREATURE_FOODS
+from items import Item, ItemTemplate
+
+# What a dead body might be carrying; every body draws from these shared templates
+DEAD_BODY_LOOT = (
+    ItemTemplate.get("gold coins", "A handful of golden coins", Item.MISC),
+    ItemTemplate.get("dagger", "A rusty but serviceable dagger", Item.WEAPON),
+    ItemTemplate.get("letter", "A weathered letter with mysterious contents", Item.QUEST_ITEM),
+    ItemTemplate.get("brass key", "An ornate brass key", Item.QUEST_ITEM),
+    ItemTemplate.get("silver ring", "A silver ring with strange markings", Item.MISC)
+)
 
 class Entity:
+    # Generator-assigned attributes get slots too; anything rarer lands in
+    # the __dict__ extension slot, created only when first used
+    __slots__ = ("name", "description", "inventory", "hostile", "health", "damage",
+                 "defense", "dodge_chance", "crit_chance", "special_attacks", "abilities",
+                 "behavior", "trait", "trait_rarity", "loot_table", "loot_multiplier",
+                 "is_rare", "__dict__")
+    
     def __init__(self, name, description):
-        self.name = name
+        self.name = sys.intern(name)
         self.description = description
-        self.inventory = []
+        self.inventory = ()  # Shared empty default; a list once the entity carries loot
         self.hostile = False
         self.health = 20  # Default health
         self.damage = 3   # Default damage
         self.defense = 0  # Default defense
         self.dodge_chance = 0.1  # Base 10% dodge chance
         self.crit_chance = 0.1   # Base 10% crit chance
-        self.special_attacks = []
+        self.special_attacks = ()
+        self.abilities = ()
         
         # Entity-specific initialization
         if name == "wolf":
@@ -22,48 +41,63 @@ class Entity:
             self.defense = 2
             self.dodge_chance = 0.15
             self.crit_chance = 0.2
-            self.special_attacks = [
+            self.special_attacks = (
                 ("Fierce Bite", 1.5, 0.3),  # (name, damage_mult, chance)
                 ("Pack Call", 1.2, 0.2)     # Might summon another wolf
-            ]
+            )
         elif name == "bandit":
             self.hostile = True
             self.health = 40
             self.damage = 6
             self.defense = 3
             self.dodge_chance = 0.2
-            self.special_attacks = [
+            self.special_attacks = (
                 ("Backstab", 2.0, 0.15),
                 ("Disarm", 0.5, 0.25)  # Reduces player damage temporarily
-            ]
+            )
         elif name == "spider":
             self.hostile = True
             self.health = 25
             self.damage = 5
             self.defense = 1
             self.dodge_chance = 0.25
-            self.special_attacks = [
+            self.special_attacks = (
                 ("Web Shot", 0.8, 0.3),  # Reduces dodge chance
                 ("Poison Bite", 1.2, 0.2)  # DOT effect
-            ]
+            )
             
         # Add random items to certain entities when they're created
         if name == "dead body":
             if random.random() < 0.2:  # 20% chance of finding nothing
-                self.inventory = []
+                self.inventory = ()
             else:
-                possible_items = [
-                    Item("gold coins", "A handful of golden coins"),
-                    Item("dagger", "A rusty but serviceable dagger"),
-                    Item("letter", "A weathered letter with mysterious contents"),
-                    Item("brass key", "An ornate brass key"),
-                    Item("silver ring", "A silver ring with strange markings")
-                ]
+                self.inventory = []
                 # Add 1-3 random items to the body
                 for _ in range(random.randint(1, 3)):
                     if random.random() < 0.7:  # 70% chance per item slot
-                        self.inventory.append(random.choice(possible_items))
+                        self.inventory.append(Item.from_template(random.choice(DEAD_BODY_LOOT)))
     
+    @classmethod
+    def spawn(cls, name, description, health, damage, defense, dodge_chance=0.1, crit_chance=0.1):
+        """Create a generated creature straight from its stats
+        
+        Skips the named presets in __init__, which generated variants
+        ("grey wolf", "cave bat", ...) never match anyway.
+        """
+        entity = cls.__new__(cls)
+        entity.name = name
+        entity.description = description
+        entity.inventory = ()
+        entity.hostile = False
+        entity.health = health
+        entity.damage = damage
+        entity.defense = defense
+        entity.dodge_chance = dodge_chance
+        entity.crit_chance = crit_chance
+        entity.special_attacks = ()
+        entity.abilities = ()
+        return entity
+        
     def __str__(self):
         return self.name
         
@@ -79,7 +113,7 @@ class Entity:
         # Move items to the location
         for item in self.inventory:
             game_state.current_location.add_item(item)
-        self.inventory.clear()
+        self.inventory = ()
         
         return result 
         
@@ -107,10 +141,13 @@ class Entity:
                 game_state.player.remove_item(item)
                 return "The bat eagerly takes the fruit and drops its silver chain!"
             return "The bat doesn't seem interested in that."
-        elif self.name == "wolf":
-            if "meat" in item.name.lower():
+        elif self.name == "wolf" or self.name.endswith(" wolf"):
+            # Whether this meal won the wolf over, for the story to read
+            self.befriended = "meat" in item.name.lower()
+            if self.befriended:
                 self.hostile = False
                 game_state.player.remove_item(item)
+                self._leave_population(game_state)  # A tame wolf no longer hunts
                 return "The wolf devours the meat and seems much friendlier now!"
             return "The wolf only seems interested in meat." 
         
@@ -138,7 +175,8 @@ class Entity:
         if self.health <= 0:
             result['message'] = f"You defeated the {self.name}!"
             self._drop_loot(game_state)
-            game_state.current_location.entities.remove(self)
+            self._leave_population(game_state)
+            game_state.current_location.remove_entity(self)
         elif self.hostile:
             # Check for special attack
             special_attack = self._choose_special_attack()
@@ -173,21 +211,47 @@ class Entity:
         return result
         
     def _drop_loot(self, game_state):
+        # Loot draws on generator caches the prefetcher's thread fills too
+        with game_state.world_generator.lock:
+            self._roll_loot(game_state)
+            
+    def _roll_loot(self, game_state):
         # Drop any inventory items
         for item in self.inventory:
             game_state.current_location.add_item(item)
             
+        # Generated creatures are variants ("dire wolf") of a bestiary kind
+        generator = getattr(game_state, 'entity_generator', None)
+        kind = (generator.kind_of(self.name) if generator else None) or self.name
+            
+        # Drop whatever the bestiary says this kind of creature carries, plus its own loot
+        bestiary = getattr(game_state, 'bestiary', None)
+        loot = None
+        if bestiary:
+            loot = bestiary.get_loot_table(kind, getattr(self, 'loot_table', ()),
+                                           getattr(self, 'loot_multiplier', 1.0))
+        if loot:
+            for template in loot.drops():
+                game_state.current_location.add_item(
+                    Item.from_template(template, food_value=CREATURE_FOODS.get(template.name, 0)))
+            
         # Generate random loot based on entity type
-        if self.name == "wolf":
+        if kind == "wolf":
             if random.random() < 0.5:
                 game_state.current_location.add_item(
-                    game_state.item_generator.generate_item("weapon", quality_level=2)
+                    game_state.item_generator.generate_item("weapon", quality=2)
                 )
-        elif self.name == "bandit":
+        elif kind == "bandit":
             if random.random() < 0.7:
                 game_state.current_location.add_item(
                     game_state.item_generator.generate_item(random.choice(["weapon", "armor"]))
                 ) 
+                
+    def _leave_population(self, game_state):
+        # The wild population around here is one animal smaller
+        simulation = getattr(game_state, 'simulation', None)
+        if simulation is not None:
+            simulation.record_loss(self.name, getattr(game_state.current_location, 'coordinates', None))
         
     def _choose_special_attack(self):
         for attack in self.special_attacks:
@@ -198,6 +262,7 @@ class Entity:
         
     def _summon_ally(self, game_state):
         if self.name == "wolf":
-            new_wolf = game_state.entity_generator.generate_entity("wolf", "hostile")
+            with game_state.world_generator.lock:
+                new_wolf = game_state.entity_generator.generate_entity("wolf", "hostile")
             new_wolf.health = int(new_wolf.health * 0.7)  # Summoned allies are weaker
             game_state.current_location.add_entity(new_wolf) 
\ No newline at end of file
@@ -0,0 +1,255 @@
+import random
+from array import array
+from entities import Entity
+from world_generator import DIRECTION_OFFSETS
+
+# Numeric per-creature state, one typed column each
+COLUMNS = (
+    ("health", 'd'),
+    ("max_health", 'd'),
+    ("damage", 'd'),
+    ("defense", 'd'),
+    ("dodge_chance", 'd'),
+    ("crit_chance", 'd'),
+    ("speed", 'd'),   # Chance of taking a step each movement pass
+    ("regen", 'd'),   # Health regained per minute
+    ("x", 'i'),
+    ("y", 'i'),
+    ("hostile", 'b')
+)
+
+COLUMN_INDEX = {column: index for index, (column, _) in enumerate(COLUMNS)}
+
+BASE_SPEED = 0.5
+BASE_REGEN = 0.01  # Fraction of max health per minute
+SPEED_MODIFIERS = {"territorial": 0.2, "swift": 2.0, "sluggish": 0.5, "stubborn": 0.5}
+REGEN_MODIFIERS = {"regenerating": 5.0, "battle-worn": 3.0}
+STEPS = tuple(DIRECTION_OFFSETS.values())
+# Entity attributes that aren't columns, carried over when an Entity is adopted
+CARRIED = ("inventory", "special_attacks", "abilities", "trait_rarity", "loot_table",
+           "loot_multiplier", "is_rare")
+
+
+def _column_property(column, whole=False):
+    def getter(view):
+        value = getattr(view.store, column)[view.row]
+        return int(value) if whole and value.is_integer() else value
+
+    def setter(view, value):
+        getattr(view.store, column)[view.row] = value
+
+    return property(getter, setter)
+
+
+def _field_property(field):
+    def getter(view):
+        return getattr(view.store, field)[view.row]
+
+    def setter(view, value):
+        getattr(view.store, field)[view.row] = value
+
+    return property(getter, setter)
+
+
+class EntityView(Entity):
+    """An Entity whose state lives in a row of an EntityStore
+
+    Reads and writes of stats go straight to the store's columns, so
+    combat and everything else written against Entity works unchanged
+    while simulation passes keep updating the same numbers.
+    """
+    __slots__ = ("store", "row")
+
+    name = _field_property("names")
+    description = _field_property("descriptions")
+    trait = _field_property("traits")
+    behavior = _field_property("behaviors")
+    damage = _column_property("damage", whole=True)
+    defense = _column_property("defense", whole=True)
+    dodge_chance = _column_property("dodge_chance")
+    crit_chance = _column_property("crit_chance")
+
+    @property
+    def health(self):
+        value = self.store.health[self.row]
+        return int(value) if value.is_integer() else value
+
+    @health.setter
+    def health(self, value):
+        self.store.set_health(self.row, value)
+
+    @property
+    def hostile(self):
+        return bool(self.store.hostile[self.row])
+
+    @hostile.setter
+    def hostile(self, value):
+        self.store.hostile[self.row] = bool(value)
+
+
+class EntityStore:
+    """Creatures kept column by column for world-scale simulation
+
+    Each creature is a row: numeric state sits in array columns (see
+    COLUMNS) and its name, description, trait and behavior in plain list
+    columns. Freed rows go on a free list and are reused by the next add.
+    Systems such as regenerate and wander update the columns in one pass
+    over just the rows they affect; view(row) gives an Entity for code
+    that wants one. Change health through set_health (views do) so the
+    store knows which rows are wounded.
+    """
+    def __init__(self):
+        for column, typecode in COLUMNS:
+            setattr(self, column, array(typecode))
+        self.names = []
+        self.descriptions = []
+        self.traits = []
+        self.behaviors = []
+        self.alive = bytearray()
+        self.free = []
+        self.wounded = set()  # Live rows below max health
+        self.views = {}  # row -> EntityView handed out for it
+
+    def __len__(self):
+        return len(self.alive) - len(self.free)
+
+    def rows(self):
+        """Ids of every live row"""
+        return [row for row, alive in enumerate(self.alive) if alive]
+
+    def add(self, name, description, health, damage, defense, dodge_chance=0.1, crit_chance=0.1,
+            position=(0, 0), hostile=False, trait=None, behavior=None):
+        """Store a creature and return its row"""
+        speed = BASE_SPEED * SPEED_MODIFIERS.get(behavior, 1.0) * SPEED_MODIFIERS.get(trait, 1.0)
+        regen = health * BASE_REGEN * REGEN_MODIFIERS.get(trait, 1.0)
+        values = (health, health, damage, defense, dodge_chance, crit_chance, speed, regen,
+                  position[0], position[1], bool(hostile))
+        return self._insert(values, (name, description, trait, behavior))
+
+    def _insert(self, values, fields):
+        columns = (self.names, self.descriptions, self.traits, self.behaviors)
+        if self.free:
+            row = self.free.pop()
+            for (column, _), value in zip(COLUMNS, values):
+                getattr(self, column)[row] = value
+            for column, value in zip(columns, fields):
+                column[row] = value
+            self.alive[row] = 1
+        else:
+            row = len(self.alive)
+            for (column, _), value in zip(COLUMNS, values):
+                getattr(self, column).append(value)
+            for column, value in zip(columns, fields):
+                column.append(value)
+            self.alive.append(1)
+        if values[COLUMN_INDEX["health"]] < values[COLUMN_INDEX["max_health"]]:
+            self.wounded.add(row)
+        return row
+
+    def add_entity(self, entity, position=(0, 0)):
+        return self.add(entity.name, entity.description, entity.health, entity.damage, entity.defense,
+                        entity.dodge_chance, entity.crit_chance, position, entity.hostile,
+                        getattr(entity, 'trait', None), getattr(entity, 'behavior', None))
+
+    def adopt(self, entity, position=(0, 0)):
+        """Store an Entity and return the view that takes its place"""
+        view = self.view(self.add_entity(entity, position))
+        for attribute in CARRIED:
+            if hasattr(entity, attribute):
+                setattr(view, attribute, getattr(entity, attribute))
+        view.__dict__.update(entity.__dict__)
+        return view
+
+    def add_batch(self, batch, positions):
+        """Store every creature of an EntityBatch, one position per row; returns the rows"""
+        describe = batch.generator.describe
+        return [self.add(name, describe(trait, name, behavior), health, damage, defense,
+                         dodge, crit, position, trait=trait, behavior=behavior)
+                for name, trait, behavior, health, damage, defense, dodge, crit, position
+                in zip(batch.names, batch.traits, batch.behaviors, batch.health, batch.damage,
+                       batch.defense, batch.dodge_chance, batch.crit_chance, positions)]
+
+    def move_to(self, row, other, position):
+        """Move a creature into another store with all its state; returns its new row"""
+        values = [getattr(self, column)[row] for column, _ in COLUMNS]
+        values[COLUMN_INDEX["x"]], values[COLUMN_INDEX["y"]] = position
+        fields = (self.names[row], self.descriptions[row], self.traits[row], self.behaviors[row])
+        self.remove(row)
+        return other._insert(values, fields)
+
+    def remove(self, row):
+        """Free a row; its numbers are zeroed so passes leave it alone"""
+        if not self.alive[row]:
+            return
+        for column, _ in COLUMNS:
+            getattr(self, column)[row] = 0
+        for column in (self.names, self.descriptions, self.traits, self.behaviors):
+            column[row] = None
+        self.alive[row] = 0
+        self.free.append(row)
+        self.wounded.discard(row)
+        view = self.views.pop(row, None)
+        if view is not None:
+            view.row = None
+
+    def view(self, row):
+        """Return the Entity view for a live row, the same object each time"""
+        view = self.views.get(row)
+        if view is None:
+            if not self.alive[row]:
+                raise KeyError(f"No creature in row {row}")
+            view = EntityView.__new__(EntityView)
+            view.store = self
+            view.row = row
+            view.inventory = ()
+            view.special_attacks = ()
+            view.abilities = ()
+            self.views[row] = view
+        return view
+
+    def rows_at(self, x, y):
+        """Rows of the live creatures standing at (x, y)"""
+        return [row for row, (cx, cy, alive) in enumerate(zip(self.x, self.y, self.alive))
+                if alive and cx == x and cy == y]
+
+    def set_health(self, row, value):
+        self.health[row] = value
+        if value < self.max_health[row]:
+            self.wounded.add(row)
+        else:
+            self.wounded.discard(row)
+
+    def regenerate(self, minutes=1):
+        """Heal every wounded, still living creature for some minutes, up to its max health"""
+        health, max_health, regen = self.health, self.max_health, self.regen
+        for row in list(self.wounded):
+            value = health[row]
+            if value <= 0:
+                continue  # Left for reap
+            value += regen[row] * minutes
+            if value >= max_health[row]:
+                value = max_health[row]
+                self.wounded.discard(row)
+            health[row] = value
+
+    def wander(self, rng=None):
+        """Let every live creature take a random step with its speed as the chance
+
+        Returns the number of creatures that moved.
+        """
+        rng = rng or random
+        draw = rng.random
+        movers = [row for row, speed in enumerate(self.speed) if draw() < speed]  # Freed rows have speed 0
+        x, y = self.x, self.y
+        for row, (dx, dy) in zip(movers, rng.choices(STEPS, k=len(movers))):
+            x[row] += dx
+            y[row] += dy
+        return len(movers)
+
+    def reap(self):
+        """Free the rows of creatures that have died; returns how many"""
+        health = self.health
+        dead = [row for row in self.wounded if health[row] <= 0]
+        for row in dead:
+            self.remove(row)
+        return len(dead)
@@ -22,7 +22,7 @@ class EventManager:
         }
         
     def check_events(self, game_state):
-        hour = (game_state.time.minutes // 60) % 24
+        hour = (game_state.time.current_time // 60) % 24
         location_type = game_state.current_location.location_type
         
         # Check time-specific events
@@ -8,23 +8,51 @@ from time_manager import TimeManager
 from events import EventManager
 from generators import LocationGenerator, ItemGenerator, EntityGenerator, RewardGenerator
 from achievements import AchievementManager
-from world_generator import WorldGenerator
+from bestiary import Bestiary
+from world_generator import WorldGenerator, ORIGIN, DIRECTION_OFFSETS
+from residency_manager import ResidencyManager
+from prefetcher import LocationPrefetcher
+from route_planner import RoutePlanner
+from map_renderer import MapRenderer
+from location_table import LocationTable
+from world_simulation import WorldSimulation
+from encounters import EncounterScheduler
+from npc_population import NPCPopulation
+from trading import Market
+from crafting import RecipeBook
 from combat_system import CombatSystem
 from command_parser import CommandParser
 from display import Display
 
+OPPOSITE_DIRECTIONS = {
+    "north": "south",
+    "south": "north",
+    "east": "west",
+    "west": "east",
+    "up": "down",
+    "down": "up"
+}
+
 class GameState:
     def __init__(self, player):
         # Initialize basic attributes first
         self.player = player
         self.current_location = None
-        self.discovered_locations = {}
+        self.discovered_locations = {}  # location id -> Location, for those in memory
+        self.locations = LocationTable()  # Every discovered cell, kept after eviction
+        self.location_deltas = {}   # (x, y) -> LocationDelta for locations not in memory
+        self.residency = ResidencyManager()
+        self.prefetcher = LocationPrefetcher(self)
+        self.route_planner = RoutePlanner(self)
+        self.map_renderer = MapRenderer(self)
+        self.last_heading = None
         self.quest_log = []
         self.discovered_areas = set()
         self.milestones = {
             "wolves_befriended": False,
             "cave_discovered": False,
-            "crystal_found": False
+            "crystal_found": False,
+            "made_camp": False
         }
         
         # Initialize systems
@@ -43,34 +71,191 @@ class GameState:
         self.item_generator = ItemGenerator()
         self.entity_generator = EntityGenerator()
         self.reward_generator = RewardGenerator()
+        self.bestiary = Bestiary()
+        self.simulation = WorldSimulation(self)
+        self.encounters = EncounterScheduler(self)
+        self.npcs = NPCPopulation(self)
+        self.market = Market(self)
+        self.recipes = RecipeBook()
         
         # Set up starting location last
-        starting_location = self.world_generator._generate_meadow()
+        starting_location = self.get_location_at(*ORIGIN)
         self.set_current_location(starting_location)
         
+    def report_progress(self, action, context):
+        """Pass a game action to the story and the achievements, printing whatever it unlocks"""
+        story_update = self.story.check_progress(self, action, context)
+        if story_update:
+            print(f"\n{story_update}")
+        for message in self.achievements.check_achievement(self, action, context):
+            print(message)
+            
     def set_current_location(self, location):
         """Set the current location"""
         if location is None:
             return
+        previous = self.current_location
+            
+        # Locations built by hand take the place of whatever the player stood on
+        if getattr(location, 'coordinates', None) is None:
+            location.coordinates = previous.coordinates if previous else ORIGIN
             
         self.current_location = location
+        self.simulation.focus(*location.coordinates)
+        context = {"location_type": location.location_type}
+        self.report_progress("enter_location", context)
+        if previous is not None and previous is not location:
+            self.report_progress("move", context)
+        self.encounters.catch_up(location)  # Whatever wandered in while the player was away
+        self.npcs.meet(location)
+        if getattr(location, 'surface', None) is not None:
+            # Cave rooms live and die with the location above them
+            self.residency.touch(location.surface)
+            self.residency.enforce(self)
+            return
         if not hasattr(self.current_location, 'items'):
             self.current_location.items = []
         if not hasattr(self.current_location, 'entities'):
             self.current_location.entities = []
-        if location.id not in self.discovered_locations:
-            self.discovered_locations[location.id] = location
+        location_id = self.locations.id_at(*location.coordinates)
+        if location_id is None:
+            location_id = self.locations.allocate(location.coordinates)
+            self.route_planner.invalidate()  # A new cell joins the travel graph
+            self.map_renderer.mark_dirty(*location.coordinates)
+            self.report_progress("discover_location", context)
+        location.id = location_id
+        self.discovered_locations[location_id] = location
+        self.location_deltas.pop(location.coordinates, None)  # Now carried by the location
+        self.residency.touch(location)
+        self.residency.enforce(self)
             
     def get_location(self, location_id):
-        return self.discovered_locations.get(location_id)
+        location = self.discovered_locations.get(location_id)
+        if location is None and location_id in self.locations:
+            location = self.get_location_at(*self.locations.coordinates_of(location_id))
+        return location
+        
+    def get_location_at(self, x, y):
+        """Return the location at (x, y), regenerating it from the world seed if needed
+        
+        Discovered locations that were evicted from memory are faulted back in
+        under their original id, with their stored delta replayed.
+        """
+        location_id = self.locations.id_at(x, y)
+        if location_id is not None and location_id in self.discovered_locations:
+            location = self.discovered_locations[location_id]
+            self.residency.touch(location)
+            return location
+            
+        delta = self.location_deltas.get((x, y))
+        location = self.prefetcher.take(x, y)
+        if location is None:
+            location = self.world_generator.generate_location_at(x, y, self, delta)
+        elif delta:
+            location.track_changes(delta)
+        self.simulation.adopt(location)
+        if location_id is not None:
+            self.residency.faults += 1
+            location.id = location_id
+            self.discovered_locations[location_id] = location
+            self.location_deltas.pop((x, y), None)
+            self.residency.touch(location)
+            self.residency.enforce(self)
+        return location
+        
+    def move(self, direction):
+        """Move the player one cell in a direction and return the new location
+        
+        Underground, and when climbing up or down, movement follows the cave
+        room connections instead; None is returned if there is no way through.
+        """
+        if direction in ("up", "down") or getattr(self.current_location, 'surface', None) is not None:
+            return self._move_underground(direction)
+            
+        destination = self._step(direction)
+        self.advance_time(self.time.minutes_per_action)
+        
+        # Generate the likely next cells while the player reads and types
+        self.prefetcher.schedule(destination.coordinates, direction)
+        return destination
+        
+    def _step(self, direction):
+        """Move one cell on the surface grid without passing any time"""
+        x, y = self.current_location.coordinates
+        dx, dy = DIRECTION_OFFSETS[direction]
+        destination = self.get_location_at(x + dx, y + dy)
+        
+        self.current_location.connections[direction] = destination
+        destination.connections[OPPOSITE_DIRECTIONS[direction]] = self.current_location
+        self.set_current_location(destination)
+        self.last_heading = direction
+        return destination
+        
+    def travel(self, route):
+        """Follow a route of directions as a single action
+        
+        The trip stops early on arriving somewhere with a hostile creature.
+        Time for every step taken is passed in one go at the end. Returns
+        the number of steps taken.
+        """
+        steps = 0
+        for direction in route:
+            destination = self._step(direction)
+            steps += 1
+            if any(getattr(entity, 'hostile', False) for entity in destination.entities):
+                break
+        if steps:
+            self.advance_time(steps * self.time.minutes_per_action, ticks=steps)
+            self.prefetcher.schedule(self.current_location.coordinates, self.last_heading)
+        return steps
+        
+    def _move_underground(self, direction):
+        location = self.current_location
+        if direction == "down" and getattr(location, 'cave_seed', None) is not None and not location.connections.get("down"):
+            self.world_generator.generate_cave_system(location, self)
+            
+        destination = location.connections.get(direction)
+        if destination is None:
+            return None
+        self.set_current_location(destination)
+        self.last_heading = direction
+        self.advance_time(self.time.minutes_per_action)
+        return destination
+        
+    def collect_location_deltas(self):
+        """Gather player changes for every modified location, loaded or not"""
+        deltas = dict(self.location_deltas)
+        for location in self.discovered_locations.values():
+            if getattr(location, 'changes', None) is not None and location.is_modified():
+                deltas[location.coordinates] = location.changes
+        return deltas
+        
+    def reset_world(self, seed, location_deltas, position, locations=None, npcs=None):
+        """Rebuild the world from a seed and saved deltas, placing the player at position
+        
+        A saved location table keeps the explored area and its ids, and
+        saved NPCs replace the ones the seed would produce.
+        """
+        self.world_generator.seed = seed
+        self.discovered_locations = {}
+        self.locations = locations if locations is not None else LocationTable()
+        self.location_deltas = dict(location_deltas)
+        self.residency.clear()
+        self.route_planner.invalidate()
+        self.map_renderer.invalidate()
+        self.simulation.reset()
+        self.npcs.reset(npcs)
+        self.current_location = None
+        self.set_current_location(self.get_location_at(*position))
         
-    def generate_location(self):
+    def generate_location(self, x=0, y=0):
+        """Generate a location whose type follows the biome map at (x, y)"""
         location_types = {
             'meadow': self._generate_meadow,
             'forest': self._generate_forest,
             'cave': self._generate_cave
         }
-        location_type = random.choice(list(location_types.keys()))
+        location_type = self.world_generator.biome_map.biome_at(x, y)
         return location_types[location_type]()
         
     def _generate_meadow(self):
@@ -109,12 +294,19 @@ class GameState:
             
         return location 
         
-    def advance_time(self, minutes):
+    def advance_time(self, minutes, ticks=1):
+        """Pass time; ticks is how many actions' worth of needs to drain"""
         new_day = self.time.advance_time(minutes)
         if new_day:
             self.save_system.save_game(self, "autosave.json")
             print("\nA new day begins... Game auto-saved.")
-        self.player.update_needs()
+        self.player.update_needs(ticks)
+        self.simulation.tick(minutes)
+        for creature in self.encounters.catch_up(self.current_location):
+            print(f"\nA {creature.name} wanders in.")
+        self.npcs.tick()
+        for npc in self.npcs.meet(self.current_location):
+            print(f"\nA {npc.name} arrives.")
         
         # Check for time-based events
         event = self.event_manager.check_events(self)
@@ -1,13 +1,16 @@
 from .location_generator import LocationGenerator
 from .item_generator import ItemGenerator
-from .entity_generator import EntityGenerator
+from .entity_generator import EntityGenerator, EntityBatch
 from .note_generator import NoteGenerator
 from .reward_generator import RewardGenerator
+from .cave_generator import CaveSystemGenerator
 
 __all__ = [
     'LocationGenerator',
     'ItemGenerator',
     'EntityGenerator',
+    'EntityBatch',
     'NoteGenerator',
-    'RewardGenerator'
+    'RewardGenerator',
+    'CaveSystemGenerator'
 ] 
\ No newline at end of file
@@ -0,0 +1,204 @@
+import random
+from base_classes import Location
+
+
+OPPOSITES = {"north": "south", "south": "north", "east": "west", "west": "east"}
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+class CaveRoom:
+    """A connected open region of a carved cave grid"""
+    def __init__(self, runs, stride):
+        self.runs = runs  # (row, bitmask) pairs making up the region
+        self.size = sum(_popcount(mask) for _, mask in runs)
+        total_x = total_y = 0
+        for row, mask in runs:
+            length = _popcount(mask)
+            start = (mask & -mask).bit_length() - 1
+            total_x += length * (start + (length - 1) / 2)
+            total_y += length * row
+        self.center = (total_x / self.size, total_y / self.size)
+
+
+class CaveSystemGenerator:
+    """Generates multi-room cave systems with a cellular automaton
+
+    The grid is held as a single integer bitboard (1 = open floor) with a
+    blank padding column after every row, so each smoothing step is a
+    handful of whole-grid shifts and bit-sliced additions rather than a
+    loop over cells. Rooms are found by labelling horizontal runs of floor
+    row by row and merging runs that touch, then linked into a tree of
+    Location connections.
+    """
+    def __init__(self, width=48, height=32, steps=4, min_room_size=12, max_rooms=6):
+        self.width = width
+        self.height = height
+        self.steps = steps
+        self.min_room_size = min_room_size
+        self.max_rooms = max_rooms
+
+    def carve(self, rng, width=None, height=None):
+        """Carve a cave grid, returning (bitboard, stride)"""
+        width = width or self.width
+        height = height or self.height
+        stride = width + 1
+        row_mask = (1 << width) - 1
+        full = 0
+        for row in range(height):
+            full |= row_mask << (row * stride)
+
+        grid = rng.getrandbits(stride * height) & full
+        for _ in range(self.steps):
+            grid = self._smooth(grid, stride, full)
+        return grid, stride
+
+    def _smooth(self, grid, stride, full):
+        """One automaton step: a cell is floor when 5+ of its 3x3 block are floor"""
+        columns = (grid >> 1, grid, grid << 1)
+        planes = []
+        for shifted in columns:
+            for neighbour in (shifted >> stride, shifted, shifted << stride):
+                self._add_plane(planes, neighbour & full)
+        while len(planes) < 4:
+            planes.append(0)
+        ones, twos, fours, eights = planes[:4]
+        # count >= 5  <=>  8-bit set, or 4-bit set together with the 1 or 2 bit
+        return (eights | (fours & (twos | ones))) & full
+
+    def _add_plane(self, planes, bits):
+        """Add a bitboard into bit-sliced counters (planes[i] holds the 2**i bit)"""
+        for i in range(len(planes)):
+            carry = planes[i] & bits
+            planes[i] ^= bits
+            bits = carry
+            if not bits:
+                return
+        if bits:
+            planes.append(bits)
+
+    def find_rooms(self, grid, stride, height=None):
+        """Split the open floor into connected rooms, largest first"""
+        height = height or self.height
+        row_mask = (1 << (stride - 1)) - 1
+        parents = []
+        runs = []
+        previous = []  # Run indices in the previous row
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        for row in range(height):
+            bits = (grid >> (row * stride)) & row_mask
+            current = []
+            while bits:
+                low = bits & -bits
+                run = bits & ~(bits + low)
+                bits ^= run
+                index = len(runs)
+                runs.append((row, run))
+                parents.append(index)
+                for other in previous:
+                    if runs[other][1] & run:
+                        parents[find(other)] = find(index)
+                current.append(index)
+            previous = current
+
+        groups = {}
+        for index, run in enumerate(runs):
+            groups.setdefault(find(index), []).append(run)
+        rooms = [CaveRoom(group, stride) for group in groups.values()]
+        rooms = [room for room in rooms if room.size >= self.min_room_size]
+        rooms.sort(key=lambda room: -room.size)
+        return rooms
+
+    def link_rooms(self, rooms):
+        """Join rooms into a tree, returning (room_a, room_b, direction) edges"""
+        if not rooms:
+            return []
+        used = [set() for _ in rooms]
+        in_tree = [0]
+        edges = []
+        while len(in_tree) < len(rooms):
+            best = None
+            for a in in_tree:
+                if len(used[a]) == 4:
+                    continue
+                for b in range(len(rooms)):
+                    if b in in_tree:
+                        continue
+                    ax, ay = rooms[a].center
+                    bx, by = rooms[b].center
+                    distance = (ax - bx) ** 2 + (ay - by) ** 2
+                    if best is None or distance < best[0]:
+                        best = (distance, a, b)
+            _, a, b = best
+            direction = self._pick_direction(rooms[a].center, rooms[b].center, used[a])
+            used[a].add(direction)
+            used[b].add(OPPOSITES[direction])
+            edges.append((a, b, direction))
+            in_tree.append(b)
+        return edges
+
+    def _pick_direction(self, start, end, taken):
+        """Prefer the compass direction pointing from start towards end"""
+        dx = end[0] - start[0]
+        dy = start[1] - end[1]  # Grid rows grow southwards
+        horizontal = "east" if dx >= 0 else "west"
+        vertical = "north" if dy >= 0 else "south"
+        preferred = [horizontal, vertical] if abs(dx) >= abs(dy) else [vertical, horizontal]
+        for direction in preferred + [OPPOSITES[preferred[1]], OPPOSITES[preferred[0]]]:
+            if direction not in taken:
+                return direction
+
+    def generate(self, surface, game_state, seed, room_deltas=None):
+        """Build the rooms below a surface cave and connect them to it
+
+        Each room's contents come from its own seed, so the system is
+        rebuilt identically whenever the surface cell is regenerated.
+        """
+        rng = random.Random(seed)
+        grid, stride = self.carve(rng)
+        rooms = self.find_rooms(grid, stride)[:self.max_rooms]
+        room_deltas = room_deltas if room_deltas is not None else {}
+
+        locations = []
+        for index, room in enumerate(rooms):
+            room_rng = random.Random(seed * 1000003 + index)
+            location = self._populate_room(index, room, game_state, room_rng)
+            location.coordinates = surface.coordinates
+            location.surface = surface
+            location.room_index = index
+            location.track_changes(room_deltas.get(index))
+            room_deltas[index] = location.changes
+            locations.append(location)
+
+        for a, b, direction in self.link_rooms(rooms):
+            locations[a].connections[direction] = locations[b]
+            locations[b].connections[OPPOSITES[direction]] = locations[a]
+
+        if locations:
+            surface.connections["down"] = locations[0]
+            locations[0].connections["up"] = surface
+        surface.cave_rooms = locations
+        return locations
+
+    def _populate_room(self, index, room, game_state, rng):
+        """Fill a room with creatures and items scaled to its size"""
+        size_word = "vast" if room.size > 200 else "wide" if room.size > 60 else "narrow"
+        location = Location("cave", f"A {size_word} cavern")
+        location.description = (game_state.location_generator.generate_description("cave", rng)
+                                + f" The cavern is {size_word}.")
+
+        richness = min(1.0, room.size / 150)
+        if rng.random() < 0.3 + 0.4 * richness:
+            location.add_item(game_state.item_generator.generate_item("quest_item", rng=rng))
+        if rng.random() < 0.2 + 0.3 * richness:
+            creature = "troll" if index > 0 and rng.random() < 0.15 else "bat"
+            location.add_entity(game_state.entity_generator.generate_entity(creature, rng=rng))
+        return location
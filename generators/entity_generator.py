@@ -1,6 +1,112 @@
 import random
+import sys
+from array import array
 from entities import Entity
-from models.traits import TraitSystem
+from models.traits import TraitSystem, VECTOR_STATS
+
+# Loot multipliers for creatures whose template doesn't override them
+DEFAULT_TRAIT_LOOT_BONUS = {
+    "common": 1.0,
+    "uncommon": 1.5,
+    "rare": 2.0
+}
+
+# Stats a bestiary entry sets directly; the rest keep the Entity defaults
+TEMPLATE_STATS = ("health", "damage", "defense")
+DEFAULT_DODGE_CHANCE = 0.1
+DEFAULT_CRIT_CHANCE = 0.1
+
+# Trait pools in the order a batch's pool column numbers them
+TRAIT_RARITIES = ("common", "uncommon", "rare")
+RARE_CREATURE = len(TRAIT_RARITIES)  # Pool code for rare creatures: rare traits, rare loot
+
+
+class CreatureTemplate:
+    """A bestiary entry compiled once into the form spawning needs
+
+    Lists become tuples, traits map straight to their rarity, and each
+    trait's stat modifiers become a multiplier vector over VECTOR_STATS.
+    Loot tables stay the bestiary's own lists so entities share them.
+    """
+    __slots__ = ("variants", "rare_variants", "behaviors", "base_stats",
+                 "rare_multiplier", "loot_table", "rare_loot_table", "common_traits",
+                 "uncommon_traits", "rare_traits", "trait_pools", "trait_rarity", "loot_bonus",
+                 "trait_effects")
+
+    def __init__(self, entry, trait_system):
+        fields = {
+            "variants": tuple(sys.intern(name) for name in entry["variants"]),
+            "rare_variants": tuple(sys.intern(name) for name in entry["rare_variants"]),
+            "behaviors": tuple(entry["behaviors"]),
+            "base_stats": tuple(entry["stats"][stat][0] for stat in TEMPLATE_STATS),
+            "rare_multiplier": entry["rare_stats_multiplier"],
+            "loot_table": entry["loot_table"],
+            "rare_loot_table": entry["rare_loot_table"],
+            "common_traits": tuple(entry["common_traits"]),
+            "uncommon_traits": tuple(entry["uncommon_traits"]),
+            "rare_traits": tuple(entry["rare_traits"]),
+            "loot_bonus": dict(entry.get("trait_loot_bonus", DEFAULT_TRAIT_LOOT_BONUS))
+        }
+        fields["trait_pools"] = tuple(fields[f"{rarity}_traits"] for rarity in TRAIT_RARITIES)
+        # Later assignments win, so a trait listed twice takes its rarest rarity
+        trait_rarity = {}
+        for rarity in ("common", "uncommon", "rare"):
+            for trait in entry[f"{rarity}_traits"]:
+                trait_rarity[trait] = rarity
+        fields["trait_rarity"] = trait_rarity
+        fields["trait_effects"] = {trait: trait_system.compile(trait) for trait in trait_rarity}
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("creature templates are shared and can't be changed")
+
+
+class EntityBatch:
+    """Many generated creatures of one type stored column by column
+
+    Names, traits and behaviors are lists of shared strings; rarity and
+    trait pool are byte columns and the stats are array('d') columns, so
+    a simulation can update whole columns without building any Entity.
+    Call entity(i) or entities() to materialize them when needed.
+    """
+    __slots__ = ("generator", "template", "names", "traits", "behaviors", "is_rare", "pools",
+                 "health", "damage", "defense", "dodge_chance", "crit_chance")
+
+    def __init__(self, generator, template, names, traits, behaviors, is_rare, pools, stat_rows):
+        self.generator = generator
+        self.template = template
+        self.names = names
+        self.traits = traits
+        self.behaviors = behaviors
+        self.is_rare = is_rare
+        self.pools = pools
+        for stat, column in zip(VECTOR_STATS, zip(*stat_rows) if stat_rows else ((),) * len(VECTOR_STATS)):
+            setattr(self, stat, array('d', column))
+
+    def __len__(self):
+        return len(self.names)
+
+    def entity(self, index):
+        """Build the Entity for one row from its current column values"""
+        stats = [_number(getattr(self, stat)[index]) for stat in VECTOR_STATS]
+        return self.generator._materialize(
+            self.template, self.names[index], self.traits[index], self.behaviors[index],
+            self.pools[index], stats)
+
+    def entities(self):
+        """Build every row's Entity, in row order"""
+        materialize, template = self.generator._materialize, self.template
+        columns = [getattr(self, stat) for stat in VECTOR_STATS]
+        return [materialize(template, name, trait, behavior, pool, [_number(value) for value in stats])
+                for name, trait, behavior, pool, *stats
+                in zip(self.names, self.traits, self.behaviors, self.pools, *columns)]
+
+
+def _number(value):
+    """Give back whole-number stats as ints, the way single spawns have them"""
+    return int(value) if value.is_integer() else value
+
 
 class EntityGenerator:
     def __init__(self):
@@ -141,66 +247,207 @@ class EntityGenerator:
                     "world-breaker",# Destroys terrain
                     "titan-blood" # Grows stronger in combat
                 ]
+            },
+            "rabbit": {
+                "variants": ["brown rabbit", "grey hare", "cottontail"],
+                "rare_variants": ["moon hare", "silver rabbit", "jackalope"],
+                "behaviors": ["skittish", "grazing", "burrowing"],
+                "stats": {
+                    "health": (10, 15),
+                    "damage": (1, 2),
+                    "defense": (0, 1)
+                },
+                "rare_stats_multiplier": 2.0,
+                "loot_table": ["rabbit_pelt", "raw_meat", "rabbit_foot"],
+                "rare_loot_table": ["silver_fur", "moon_charm", "jackalope_antler"],
+                "possible_traits": ["speckled", "plump", "lop-eared"],
+                "common_traits": [
+                    "young",      # Less health but faster
+                    "plump",      # More health
+                    "skittish",   # Flees more easily
+                    "alert",      # Better at dodging
+                    "speckled",   # Blends into the undergrowth
+                    "lop-eared"   # Slow to notice danger
+                ],
+                "uncommon_traits": [
+                    "swift",      # Double movement speed
+                    "burrower",   # Escapes underground
+                    "kicker"      # Strong hind legs
+                ],
+                "rare_traits": [
+                    "moon-touched", # Glows faintly at night
+                    "lucky"         # Better loot drops
+                ]
+            },
+            "deer": {
+                "variants": ["red deer", "roe deer", "white-tailed deer"],
+                "rare_variants": ["white stag", "elder stag", "spirit deer"],
+                "behaviors": ["grazing", "wary", "herd"],
+                "stats": {
+                    "health": (15, 20),
+                    "damage": (2, 3),
+                    "defense": (0, 1)
+                },
+                "rare_stats_multiplier": 2.0,
+                "loot_table": ["deer_hide", "antler", "raw_meat"],
+                "rare_loot_table": ["white_hide", "elder_antler", "spirit_essence"],
+                "possible_traits": ["antlered", "spotted", "old"],
+                "common_traits": [
+                    "young",      # Less health but faster
+                    "old",        # Slower
+                    "spotted",    # Blends into the forest
+                    "wary",       # Better at dodging
+                    "antlered",   # More damage
+                    "timid"       # Flees more easily
+                ],
+                "uncommon_traits": [
+                    "swift",      # Double movement speed
+                    "herd-leader", # Warns nearby deer
+                    "territorial" # Stands its ground in rutting season
+                ],
+                "rare_traits": [
+                    "spirit-touched", # Vanishes when cornered
+                    "blessed"         # Divine protection, resistant to damage
+                ]
             }
         }
+        self.templates = {}  # entity type -> CreatureTemplate, compiled on first spawn
+        self.kinds = {name: entity_type
+                      for entity_type, entry in self.bestiary.items()
+                      for name in (entity_type, *entry["variants"], *entry["rare_variants"])}
+        self.descriptions = {}  # (trait, variant, behavior) -> description
+        
+    def get_template(self, entity_type):
+        """Return the compiled template for an entity type"""
+        template = self.templates.get(entity_type)
+        if template is None:
+            if entity_type not in self.bestiary:
+                raise ValueError(f"Unknown entity type: {entity_type}")
+            template = CreatureTemplate(self.bestiary[entity_type], self.trait_system)
+            self.templates[entity_type] = template
+        return template
 
-    def generate_entity(self, entity_type, level=1, force_rare=False):
-        """Generate an entity with random traits and stats"""
-        if entity_type not in self.bestiary:
-            raise ValueError(f"Unknown entity type: {entity_type}")
-            
-        template = self.bestiary[entity_type]
+    def kind_of(self, name):
+        """Return the entity type a creature's name belongs to, or None"""
+        return self.kinds.get(name)
+
+    def generate_entity(self, entity_type, level=1, force_rare=False, rng=None):
+        """Generate an entity with random traits and stats
+        
+        Pass a seeded random.Random as rng to make the result reproducible.
+        """
+        template = self.get_template(entity_type)
+        rng = rng or random
         
         # Determine rarity and traits
-        is_rare = force_rare or random.random() < 0.05
+        is_rare = force_rare or rng.random() < 0.05
         
         # Select variant based on rarity
         if is_rare:
-            variant = random.choice(template["rare_variants"])
-            trait_pool = template["rare_traits"]
-            loot_table = template["rare_loot_table"]
-            multiplier = template["rare_stats_multiplier"]
+            variant = rng.choice(template.rare_variants)
+            pool = RARE_CREATURE
+            trait_pool = template.rare_traits
         else:
-            variant = random.choice(template["variants"])
-            # Roll for trait rarity
-            trait_roll = random.random()
-            if trait_roll < 0.05:  # 5% chance for rare trait
-                trait_pool = template["rare_traits"]
-                loot_multiplier = template["trait_loot_bonus"]["rare"]
-            elif trait_roll < 0.20:  # 15% chance for uncommon trait
-                trait_pool = template["uncommon_traits"]
-                loot_multiplier = template["trait_loot_bonus"]["uncommon"]
-            else:
-                trait_pool = template["common_traits"]
-                loot_multiplier = template["trait_loot_bonus"]["common"]
-            
-            loot_table = template["loot_table"]
-            multiplier = 1.0
+            variant = rng.choice(template.variants)
+            pool = self._roll_pool(rng.random())
+            trait_pool = template.trait_pools[pool]
         
-        trait = random.choice(trait_pool)
-        behavior = random.choice(template["behaviors"])
+        trait = rng.choice(trait_pool)
+        behavior = rng.choice(template.behaviors)
+        stats = self._scaled_stats(template, is_rare, trait, 1 + 0.1 * level)
+        return self._materialize(template, variant, trait, behavior, pool, stats)
         
-        # Scale stats based on level and rarity
-        stats = {
-            stat: int(base * multiplier * (1 + 0.1 * level))
-            for stat, (base, _) in template["stats"].items()
-        }
+    def generate_entities(self, entity_type, n, level=1, force_rare=False, rng=None):
+        """Generate n creatures of one type at once as an EntityBatch
+        
+        Rarity, variant, trait and behavior are each drawn for the whole
+        batch in bulk, and stats are worked out once per (rarity, trait)
+        pair and shared down the columns. A seeded rng makes the batch
+        reproducible, though it won't match n separate generate_entity calls.
+        """
+        template = self.get_template(entity_type)
+        rng = rng or random
+        rows = range(n)
+        
+        if force_rare:
+            is_rare = bytearray(b"\x01") * n
+        else:
+            is_rare = bytearray(rng.random() < 0.05 for _ in rows)
+        rolls = [rng.random() for _ in rows]
+        pools = bytearray(RARE_CREATURE if rare else self._roll_pool(roll)
+                          for rare, roll in zip(is_rare, rolls))
+        
+        names = [None] * n
+        rare_rows = [i for i in rows if is_rare[i]]
+        common_rows = [i for i in rows if not is_rare[i]]
+        for indices, variants in ((rare_rows, template.rare_variants), (common_rows, template.variants)):
+            for i, variant in zip(indices, rng.choices(variants, k=len(indices))):
+                names[i] = variant
+                
+        traits = [None] * n
+        for pool, trait_pool in enumerate(template.trait_pools + (template.rare_traits,)):
+            indices = [i for i in rows if pools[i] == pool]
+            for i, trait in zip(indices, rng.choices(trait_pool, k=len(indices))):
+                traits[i] = trait
+                
+        behaviors = rng.choices(template.behaviors, k=n)
         
-        # Create entity
-        entity = Entity(variant, f"A {trait} {variant} that appears {behavior}")
-        entity.health = stats["health"]
-        entity.damage = stats["damage"]
-        entity.defense = stats["defense"]
+        growth = 1 + 0.1 * level
+        stat_cache = {}
+        stat_rows = []
+        for key in zip(is_rare, traits):
+            row = stat_cache.get(key)
+            if row is None:
+                row = stat_cache[key] = self._scaled_stats(template, key[0], key[1], growth)
+            stat_rows.append(row)
+        return EntityBatch(self, template, names, traits, behaviors, is_rare, pools, stat_rows)
+        
+    def _roll_pool(self, trait_roll):
+        """Turn a trait rarity roll into a pool code for a non-rare creature"""
+        if trait_roll < 0.05:  # 5% chance for rare trait
+            return 2
+        if trait_roll < 0.20:  # 15% chance for uncommon trait
+            return 1
+        return 0
+        
+    def _scaled_stats(self, template, is_rare, trait, growth):
+        """Scale base stats for level and rarity, then apply the trait's multiplier vector"""
+        multiplier = template.rare_multiplier if is_rare else 1.0
+        stats = [int(base * multiplier * growth) for base in template.base_stats]
+        stats += (DEFAULT_DODGE_CHANCE, DEFAULT_CRIT_CHANCE)
+        effect = template.trait_effects[trait]
+        if effect is not None:
+            stats = [value * modifier if modifier != 1.0 else value
+                     for value, modifier in zip(stats, effect.multipliers)]
+        return stats
+        
+    def describe(self, trait, variant, behavior):
+        """Return the (shared) description of a rolled creature"""
+        key = (trait, variant, behavior)
+        description = self.descriptions.get(key)
+        if description is None:
+            description = self.descriptions[key] = f"A {trait} {variant} that appears {behavior}"
+        return description
+        
+    def _materialize(self, template, variant, trait, behavior, pool, stats):
+        """Build the Entity for a rolled creature"""
+        entity = Entity.spawn(variant, self.describe(trait, variant, behavior), *stats)
         entity.behavior = behavior
         entity.trait = trait
-        entity.trait_rarity = "rare" if trait in template["rare_traits"] else \
-                             "uncommon" if trait in template["uncommon_traits"] else \
-                             "common"
-        entity.loot_table = loot_table
-        entity.loot_multiplier = loot_multiplier if not is_rare else multiplier
-        entity.is_rare = is_rare
-        
-        # Apply trait effects
-        self.trait_system.apply_trait(entity, trait)
+        entity.trait_rarity = template.trait_rarity[trait]
+        if pool == RARE_CREATURE:
+            entity.loot_table = template.rare_loot_table
+            entity.loot_multiplier = template.rare_multiplier
+            entity.is_rare = True
+        else:
+            entity.loot_table = template.loot_table
+            entity.loot_multiplier = template.loot_bonus[TRAIT_RARITIES[pool]]
+            entity.is_rare = False
         
-        return entity 
\ No newline at end of file
+        effect = template.trait_effects[trait]
+        if effect is not None:
+            for stat, modifier in effect.other_modifiers:
+                setattr(entity, stat, getattr(entity, stat, 0) * modifier)
+            if effect.abilities:
+                entity.abilities = list(effect.abilities)
+        return entity
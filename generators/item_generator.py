@@ -1,5 +1,7 @@
 import random
-from items import Item
+from items import Item, ItemTemplate
+
+RAW_FOODS = ("meat",)  # Food types that come raw and need cooking
 
 class ItemGenerator:
     def __init__(self):
@@ -7,14 +9,16 @@ class ItemGenerator:
             "weapon": ["Sharp", "Rusty", "Ancient", "Blessed", "Cursed"],
             "armor": ["Sturdy", "Worn", "Enchanted", "Heavy", "Light"],
             "accessory": ["Glowing", "Mysterious", "Powerful", "Delicate"],
-            "quest_item": ["Ancient", "Mysterious", "Sacred", "Lost"]
+            "quest_item": ["Ancient", "Mysterious", "Sacred", "Lost"],
+            "food": ["Fresh", "Hearty", "Dried"]
         }
         
         self.materials = {
             "weapon": ["Iron", "Steel", "Bronze", "Crystal", "Bone"],
             "armor": ["Leather", "Chain", "Plate", "Hide", "Scale"],
             "accessory": ["Silver", "Gold", "Wood", "Stone", "Crystal"],
-            "quest_item": ["Crystal", "Scroll", "Relic", "Artifact"]
+            "quest_item": ["Crystal", "Scroll", "Relic", "Artifact"],
+            "food": [None]  # Food is named by its type alone
         }
         
         self.item_types = {
@@ -32,27 +36,101 @@ class ItemGenerator:
                 "key": {"weight": 1},
                 "scroll": {"weight": 1},
                 "artifact": {"weight": 2}
+            },
+            "food": {
+                "bread": {"food_value": (15, 25), "weight": 1},
+                "meat": {"food_value": (25, 40), "weight": 2},
+                "fruit": {"food_value": (10, 20), "weight": 1},
+                "herbs": {"food_value": (5, 15), "weight": 1}
             }
         }
+        # (category, prefix, material, type) -> shared ItemTemplate, filled on first use
+        self.templates = {}
+        # category -> every (template, type) combination, for batch draws
+        self.combinations = {}
 
-    def generate_item(self, category, quality=0):
-        """Generate a random item of given category and quality"""
+    def generate_item(self, category, quality=0, rng=None):
+        """Generate a random item of given category and quality
+        
+        Pass a seeded random.Random as rng to make the result reproducible.
+        """
         if category not in self.prefixes:
             return None  # Return None for unknown categories
         
-        prefix = random.choice(self.prefixes[category])
-        material = random.choice(self.materials[category])
-        item_type = random.choice(list(self.item_types[category].keys()))
+        rng = rng or random
+        prefix = rng.choice(self.prefixes[category])
+        material = rng.choice(self.materials[category])
+        item_type = rng.choice(list(self.item_types[category].keys()))
         
         base_stats = self.item_types[category][item_type]
-        name = f"{prefix} {material} {item_type}"
+        template = self.get_template(category, prefix, material, item_type)
         
         if category in ["weapon", "armor"]:
             # Handle combat items as before
-            return self._generate_combat_item(category, name, base_stats, quality)
+            return self._generate_combat_item(category, template, base_stats, quality)
+        elif category == "food":
+            return Item.from_template(template, food_value=self._food_value(item_type, quality))
         else:
             # Handle other item types
-            return Item(name, f"A {name.lower()}", category, weight=base_stats["weight"])
+            return Item.from_template(template)
+            
+    def generate_items(self, category, n, quality=0, rng=None):
+        """Generate n random items of a category in one go
+        
+        Every prefix/material/type combination is equally likely, as with
+        generate_item, so the whole batch is a single draw over the
+        category's templates. Unknown categories give an empty list.
+        """
+        if category not in self.item_types:
+            return []
+        
+        rng = rng or random
+        combinations = self.combinations.get(category)
+        if combinations is None:
+            combinations = self.combinations[category] = [
+                (self.get_template(category, prefix, material, item_type), item_type)
+                for prefix in self.prefixes[category]
+                for material in self.materials[category]
+                for item_type in self.item_types[category]
+            ]
+        
+        # Rolled stats only depend on the type and quality, so work them out once per type
+        stat_bonus = quality * 2
+        bonuses = {}
+        for item_type, base_stats in self.item_types[category].items():
+            if category == "weapon":
+                bonuses[item_type] = (base_stats["damage"][0] + stat_bonus, 0)
+            elif category == "armor":
+                bonuses[item_type] = (0, base_stats["defense"][0] + stat_bonus)
+            elif category == "food":
+                bonuses[item_type] = (0, 0, self._food_value(item_type, quality))
+            else:
+                bonuses[item_type] = (0, 0)
+        
+        from_template = Item.from_template
+        return [from_template(template, *bonuses[item_type])
+                for template, item_type in rng.choices(combinations, k=n)]
+            
+    def get_template(self, category, prefix, material, item_type):
+        """Return the shared template for a prefix/material/type combination"""
+        key = (category, prefix, material, item_type)
+        template = self.templates.get(key)
+        if template is None:
+            if category == "food" and item_type in RAW_FOODS:
+                name = f"raw {item_type}"
+            elif category == "food":
+                name = f"{prefix} {item_type}"
+            else:
+                name = f"{prefix} {material} {item_type}"
+            weight = self.item_types[category][item_type]["weight"]
+            template = ItemTemplate.get(name, f"A {name.lower()}", category, weight=weight)
+            self.templates[key] = template
+        return template
+
+    def _food_value(self, food_type, quality=0):
+        """How filling a food is; raw food is worth half until it's cooked"""
+        food_value = self.item_types["food"][food_type]["food_value"][0] + quality * 2
+        return food_value * 0.5 if food_type in RAW_FOODS else food_value
 
     def generate_item_by_name(self, name):
         """Generate a specific item by name"""
@@ -70,16 +148,14 @@ class ItemGenerator:
         
         return self.generate_item(category) 
 
-    def _generate_combat_item(self, category, name, base_stats, quality=0):
+    def _generate_combat_item(self, category, template, base_stats, quality=0):
         """Helper method to generate combat items (weapons/armor)"""
         stat_bonus = quality * 2  # More significant quality impact
         
         if category == "weapon":
             damage = base_stats["damage"][0] + stat_bonus  # Use base damage + quality bonus
-            return Item(name, f"A {name.lower()}", category, 
-                       damage_bonus=damage, weight=base_stats["weight"])
+            return Item.from_template(template, damage_bonus=damage)
                    
         elif category == "armor":
             defense = base_stats["defense"][0] + stat_bonus  # Use base defense + quality bonus
-            return Item(name, f"A {name.lower()}", category,
-                       defense_bonus=defense, weight=base_stats["weight"]) 
\ No newline at end of file
+            return Item.from_template(template, defense_bonus=defense) 
\ No newline at end of file
@@ -18,10 +18,19 @@ class LocationGenerator:
             }
         }
 
-    def generate_location(self, location_type):
+    def generate_location(self, location_type, rng=None):
         """Generate a location of the given type"""
         if location_type not in self.descriptors:
             raise ValueError(f"Unknown location type: {location_type}")
             
+        return Location(location_type, self.generate_description(location_type, rng))
+        
+    def generate_description(self, location_type, rng=None):
+        """Describe a location, picking a feature with rng (seeded or global)"""
+        if location_type not in self.descriptors:
+            raise ValueError(f"Unknown location type: {location_type}")
+            
+        rng = rng or random
         template = self.descriptors[location_type]
-        return Location(location_type, template["description"]) 
\ No newline at end of file
+        feature = rng.choice(template["features"])
+        return f"{template['description']} You notice {feature}." 
\ No newline at end of file
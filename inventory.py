@@ -0,0 +1,146 @@
+from bisect import bisect_left, bisect_right
+
+GEAR_SLOTS = ("weapon", "armor", "accessory")  # Items of these types go in the slot of that name
+# How each way of choosing gear scores an item; the second number breaks ties
+GEAR_SCORES = {
+    "damage": lambda item: (item.damage_bonus, item.defense_bonus),
+    "defense": lambda item: (item.defense_bonus, item.damage_bonus),
+    "balanced": lambda item: (item.damage_bonus + item.defense_bonus,
+                              min(item.damage_bonus, item.defense_bonus))
+}
+
+
+def gear_score(item, mode):
+    """An item's score for a way of choosing gear; nothing equipped scores lowest"""
+    return GEAR_SCORES[mode](item) if item is not None else (float("-inf"), float("-inf"))
+
+
+class GearIndex:
+    """Carried gear sorted by score within each slot
+
+    Every slot keeps, for each way of scoring, a sorted list of the
+    scores of the items that fit it with the items alongside, so the best
+    item for a slot is the last entry. Each item's entry remembers the
+    slot and scores it was filed under, and how many times it is carried;
+    removal uses what was remembered and only unfiles the last copy. An
+    item whose type or bonuses changed since it was filed is filed again
+    when it reaches the top of a list, or at once through refresh.
+    """
+    def __init__(self):
+        self.scores = {(slot, mode): [] for slot in GEAR_SLOTS for mode in GEAR_SCORES}
+        self.items = {key: [] for key in self.scores}
+        self.entries = {}  # id(item) -> [item, slot, {mode: score}, copies carried]
+
+    def add(self, item):
+        entry = self.entries.get(id(item))
+        if entry is not None:
+            entry[3] += 1
+            return
+        slot, scores = self._file(item)
+        self.entries[id(item)] = [item, slot, scores, 1]
+
+    def remove(self, item):
+        entry = self.entries.get(id(item))
+        if entry is None:
+            return
+        entry[3] -= 1
+        if not entry[3]:
+            del self.entries[id(item)]
+            self._unfile(item, entry[1], entry[2])
+
+    def refresh(self, item):
+        """File an item again under its current type and bonuses"""
+        entry = self.entries.get(id(item))
+        if entry is not None:
+            self._unfile(item, entry[1], entry[2])
+            entry[1], entry[2] = self._file(item)
+
+    def best(self, slot, mode="balanced"):
+        """The carried item scoring highest for a slot, or None"""
+        items = self.items[(slot, mode)]
+        while items:
+            item = items[-1]
+            _, filed_slot, scores, _ = self.entries[id(item)]
+            if item.type == filed_slot and GEAR_SCORES[mode](item) == scores[mode]:
+                return item
+            self.refresh(item)  # Changed since it was filed
+        return None
+
+    def _file(self, item):
+        """Insert an item into its slot's lists; returns the slot and scores used"""
+        slot = item.type
+        if slot not in GEAR_SLOTS:
+            return None, None
+        scores = {mode: score(item) for mode, score in GEAR_SCORES.items()}
+        for mode, score in scores.items():
+            values = self.scores[(slot, mode)]
+            position = bisect_right(values, score)
+            values.insert(position, score)
+            self.items[(slot, mode)].insert(position, item)
+        return slot, scores
+
+    def _unfile(self, item, slot, scores):
+        if slot is None:
+            return
+        for mode, score in scores.items():
+            values, items = self.scores[(slot, mode)], self.items[(slot, mode)]
+            position = bisect_left(values, score)
+            while items[position] is not item:
+                position += 1
+            del values[position]
+            del items[position]
+
+
+class Inventory(list):
+    """The player's items, with a GearIndex kept up to date as they change"""
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.gear = GearIndex()
+        for item in self:
+            self.gear.add(item)
+
+    def append(self, item):
+        super().append(item)
+        self.gear.add(item)
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self.gear.add(item)
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        for item in items:
+            self.gear.add(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def remove(self, item):
+        super().remove(item)
+        self.gear.remove(item)
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self.gear.remove(item)
+        return item
+
+    def clear(self):
+        super().clear()
+        self.gear = GearIndex()
+
+    def __setitem__(self, index, value):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        value = list(value) if isinstance(index, slice) else value
+        super().__setitem__(index, value)
+        for item in removed:
+            self.gear.remove(item)
+        for item in (value if isinstance(index, slice) else [value]):
+            self.gear.add(item)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for item in removed:
+            self.gear.remove(item)
@@ -1,6 +1,77 @@
+import sys
+import threading
+import weakref
 from colors import Colors
 
+
+class ItemTemplate:
+    """Immutable description shared by every item of one kind
+
+    Generators produce a small, fixed set of name/material/type
+    combinations, so each combination's strings and base stats are built
+    once and every item of that kind points at the same template. The
+    cache only holds templates weakly, so one made for a single item (a
+    meal named after its ingredients, say) goes away with its items. Items
+    are made on the prefetcher's thread too, so lookups take a lock.
+    """
+    FIELDS = ("name", "description", "type", "rarity", "weight")
+    __slots__ = FIELDS + ("__weakref__",)
+    _cache = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, name, description, item_type, rarity="common", weight=None):
+        # Names, types and rarities repeat across thousands of items, so share one copy
+        object.__setattr__(self, "name", sys.intern(name))
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "type", sys.intern(item_type))
+        object.__setattr__(self, "rarity", sys.intern(rarity))
+        object.__setattr__(self, "weight", weight)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("item templates are shared and can't be changed")
+
+    @classmethod
+    def get(cls, name, description, item_type, rarity="common", weight=None):
+        """Return the shared template for these fields, creating it once"""
+        key = (name, description, item_type, rarity, weight)
+        with cls._lock:
+            template = cls._cache.get(key)
+            if template is None:
+                template = cls(name, description, item_type, rarity, weight)
+                cls._cache[key] = template
+        return template
+
+    def replace(self, **fields):
+        """Return the template with some fields changed"""
+        values = {field: getattr(self, field) for field in self.FIELDS}
+        values.update(fields)
+        return self.get(values["name"], values["description"], values["type"],
+                        values["rarity"], values["weight"])
+
+
+def _template_field(field):
+    def getter(item):
+        return getattr(item.template, field)
+
+    def setter(item, value):
+        # Changing one item moves it to another template; the shared one stays intact
+        item.template = item.template.replace(**{field: value})
+
+    return property(getter, setter)
+
+
 class Item:
+    # Common attributes get fixed slots; anything rarer (use_effect, ...)
+    # lands in the __dict__ extension slot, created only when first used
+    __slots__ = ("template", "examine_text", "damage_bonus", "defense_bonus",
+                 "food_value", "__dict__")
+    
+    name = _template_field("name")
+    description = _template_field("description")
+    type = _template_field("type")
+    rarity = _template_field("rarity")
+    weight = _template_field("weight")
+    
     # Define standard item types as class variables
     WEAPON = "weapon"
     ARMOR = "armor"
@@ -41,24 +112,55 @@ class Item:
             rarity (str): Rarity of the item
             **kwargs: Additional properties like damage_bonus, defense_bonus, food_value
         """
-        self.name = name
-        self.description = description
-        self.type = item_type
-        self.rarity = rarity
+        self.template = ItemTemplate.get(name, description, item_type, rarity,
+                                         kwargs.pop("weight", None))
         self.examine_text = None
         
+        # Initialize default values
+        self.damage_bonus = 0
+        self.defense_bonus = 0
+        self.food_value = 0
+        
         # Set additional properties from kwargs
         for key, value in kwargs.items():
             setattr(self, key, value)
-            
-        # Initialize default values
-        if not hasattr(self, 'damage_bonus'):
-            self.damage_bonus = 0
-        if not hasattr(self, 'defense_bonus'):
-            self.defense_bonus = 0
-        if not hasattr(self, 'food_value'):
-            self.food_value = 0
-        
+
+    @classmethod
+    def from_template(cls, template, damage_bonus=0, defense_bonus=0, food_value=0):
+        """Create an item of a shared template with its own rolled stats"""
+        item = cls.__new__(cls)
+        item.template = template
+        item.examine_text = None
+        item.damage_bonus = damage_bonus
+        item.defense_bonus = defense_bonus
+        item.food_value = food_value
+        return item
+
+    def to_dict(self):
+        """Serialize the item for saves and location deltas"""
+        template = self.template
+        data = {
+            "name": template.name,
+            "description": template.description,
+            "item_type": template.type,
+            "rarity": template.rarity
+        }
+        if template.weight is not None:
+            data["weight"] = template.weight
+        data.update({slot: getattr(self, slot) for slot in self.__slots__
+                     if slot not in ("template", "__dict__") and hasattr(self, slot)})
+        data.update(self.__dict__)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an item saved with to_dict"""
+        data = dict(data)
+        examine_text = data.pop("examine_text", None)
+        item = cls(data.pop("name"), data.pop("description"), data.pop("item_type"), **data)
+        item.examine_text = examine_text
+        return item
+
     def examine(self, game_state=None):
         """Return detailed examination text for the item"""
         if game_state and self.name.lower() == "mysterious note":
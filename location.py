@@ -29,6 +29,10 @@ class Location:
         """Remove an item from this location"""
         self.items.remove(item)
         
+    def remove_entity(self, entity):
+        """Remove an entity from this location"""
+        self.entities.remove(entity)
+        
     def get_description(self):
         """Get the full description including items and entities"""
         desc = self.description
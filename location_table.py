@@ -0,0 +1,73 @@
+from array import array
+from world_generator import DIRECTION_OFFSETS
+
+NO_LOCATION = 0  # Adjacency value for "nothing discovered that way"; real ids start at 1
+DIRECTIONS = ("north", "south", "east", "west")
+OPPOSITES = {"north": "south", "south": "north", "east": "west", "west": "east"}
+
+
+class LocationTable:
+    """Dense, integer-indexed record of every discovered cell
+
+    Ids are handed out in discovery order starting from 1, so they are
+    stable across saves and never reused. Coordinates and the four
+    neighbour ids are kept in parallel array('i') columns indexed by id,
+    which lets pathfinding, saving and the map work on plain integers
+    whether or not the locations themselves are in memory.
+    """
+    def __init__(self):
+        self.xs = array('i', [0])
+        self.ys = array('i', [0])
+        self.adjacency = {direction: array('i', [NO_LOCATION]) for direction in DIRECTIONS}
+        self.index = {}  # (x, y) -> id
+
+    def __len__(self):
+        return len(self.xs) - 1
+
+    def __contains__(self, location_id):
+        return isinstance(location_id, int) and 0 < location_id < len(self.xs)
+
+    def ids(self):
+        return range(1, len(self.xs))
+
+    def id_at(self, x, y):
+        return self.index.get((x, y))
+
+    def coordinates_of(self, location_id):
+        return self.xs[location_id], self.ys[location_id]
+
+    def neighbour(self, location_id, direction):
+        """Return the id of the discovered cell next door, or NO_LOCATION"""
+        return self.adjacency[direction][location_id]
+
+    def allocate(self, coordinates):
+        """Give a newly discovered cell the next id and link it to known neighbours"""
+        location_id = len(self.xs)
+        x, y = coordinates
+        self.xs.append(x)
+        self.ys.append(y)
+        self.index[(x, y)] = location_id
+        for direction in DIRECTIONS:
+            dx, dy = DIRECTION_OFFSETS[direction]
+            neighbour = self.index.get((x + dx, y + dy), NO_LOCATION)
+            self.adjacency[direction].append(neighbour)
+            if neighbour:
+                self.adjacency[OPPOSITES[direction]][neighbour] = location_id
+        return location_id
+
+    def to_dict(self):
+        data = {"x": self.xs[1:].tolist(), "y": self.ys[1:].tolist()}
+        for direction in DIRECTIONS:
+            data[direction] = self.adjacency[direction][1:].tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls()
+        table.xs.extend(data["x"])
+        table.ys.extend(data["y"])
+        for direction in DIRECTIONS:
+            table.adjacency[direction].extend(data[direction])
+        table.index = {(x, y): location_id
+                       for location_id, (x, y) in enumerate(zip(table.xs, table.ys)) if location_id}
+        return table
@@ -0,0 +1,98 @@
+import random
+from array import array
+
+# Independent drops are compiled into one alias table over every possible
+# set of drops; past this many entries that table gets too big, so each
+# entry is rolled on its own instead
+MAX_JOINT_ENTRIES = 10
+
+
+def _build_alias(weights):
+    """Walker/Vose alias table for sampling indices in proportion to weights"""
+    count = len(weights)
+    total = sum(weights)
+    scaled = [weight * count / total for weight in weights]
+    prob = array('d', [1.0]) * count
+    alias = array('i', range(count))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        low, high = small.pop(), large.pop()
+        prob[low] = scaled[low]
+        alias[low] = high
+        scaled[high] += scaled[low] - 1.0
+        (small if scaled[high] < 1.0 else large).append(high)
+    # Whatever is left is at 1.0 up to rounding and keeps its own column
+    return prob, alias
+
+
+def _sample(outcomes, prob, alias, uniforms):
+    """Map uniform numbers to outcomes through an alias table, one lookup each"""
+    count = len(prob)
+    last = count - 1
+    drawn = []
+    for u in uniforms:
+        x = u * count
+        column = min(int(x), last)
+        drawn.append(outcomes[column] if x - column < prob[column] else outcomes[alias[column]])
+    return drawn
+
+
+class LootTable:
+    """A creature's (template, probability) loot list compiled for sampling
+
+    Draws hand back the shared ItemTemplates, never new items; wrap them
+    with Item.from_template when they actually land somewhere. Two modes:
+
+    - pick: exactly one entry, weighted by probability
+    - drops: every entry rolls its own probability, so zero or more drop
+
+    Both cost a single alias lookup per draw, and *_many versions draw a
+    whole batch from one list of random numbers.
+    """
+    __slots__ = ("templates", "chances", "pick_table", "drop_table")
+
+    def __init__(self, entries):
+        self.templates = tuple(template for template, _ in entries)
+        self.chances = tuple(chance for _, chance in entries)
+        
+        self.pick_table = None
+        if sum(self.chances) > 0:
+            self.pick_table = (self.templates,) + _build_alias(self.chances)
+            
+        self.drop_table = None
+        if len(self.templates) <= MAX_JOINT_ENTRIES:
+            # Outcome mask has bit i set when entry i drops
+            outcomes, weights = [], []
+            for mask in range(1 << len(self.templates)):
+                weight = 1.0
+                for i, chance in enumerate(self.chances):
+                    weight *= chance if mask >> i & 1 else 1.0 - chance
+                outcomes.append(tuple(t for i, t in enumerate(self.templates) if mask >> i & 1))
+                weights.append(weight)
+            self.drop_table = (tuple(outcomes),) + _build_alias(weights)
+
+    def __len__(self):
+        return len(self.templates)
+
+    def pick(self, rng=None):
+        """Return one template, or None if nothing in the table can drop"""
+        return self.pick_many(1, rng)[0]
+
+    def drops(self, rng=None):
+        """Return the tuple of templates dropped by one kill"""
+        return self.drops_many(1, rng)[0]
+
+    def pick_many(self, n, rng=None):
+        rng = rng or random
+        if self.pick_table is None:
+            return [None] * n
+        return _sample(*self.pick_table, [rng.random() for _ in range(n)])
+
+    def drops_many(self, n, rng=None):
+        rng = rng or random
+        if self.drop_table is None:
+            pairs = tuple(zip(self.templates, self.chances))
+            return [tuple(template for template, chance in pairs if rng.random() < chance)
+                    for _ in range(n)]
+        return _sample(*self.drop_table, [rng.random() for _ in range(n)])
@@ -0,0 +1,93 @@
+from colors import Colors
+from world_generator import CHUNK_SIZE, ORIGIN, chunk_of
+
+UNKNOWN_TILE = " "
+TILES = {
+    "meadow": Colors.colorize(".", Colors.SUCCESS),
+    "forest": Colors.colorize("T", Colors.UNCOMMON),
+    "cave": Colors.colorize("O", Colors.COMMON)
+}
+PLAYER_TILE = Colors.colorize("@", Colors.WARNING, bold=True)
+
+
+class MapRenderer:
+    """Draws the explored world around the player
+
+    Rendered tiles are cached per chunk, one tuple of tile strings per
+    chunk row. A chunk is only rebuilt after it has been marked dirty, so
+    drawing a viewport just slices and joins cached rows no matter how
+    much of the world has been explored.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.chunks = {}   # (cx, cy) -> tuple of rows, row 0 is the chunk's lowest y
+        self.dirty = set()
+        self.rebuilds = 0
+
+    def mark_dirty(self, x, y):
+        """Note that the cell at (x, y) was discovered or has changed"""
+        self.dirty.add(chunk_of(x, y))
+
+    def invalidate(self):
+        """Drop every cached chunk, e.g. after loading a different world"""
+        self.chunks.clear()
+        self.dirty.clear()
+
+    def chunk_rows(self, cx, cy):
+        key = (cx, cy)
+        rows = self.chunks.get(key)
+        if rows is None or key in self.dirty:
+            rows = self._render_chunk(cx, cy)
+            self.chunks[key] = rows
+            self.dirty.discard(key)
+        return rows
+
+    def _render_chunk(self, cx, cy):
+        self.rebuilds += 1
+        game_state = self.game_state
+        known = game_state.locations.index
+        biome_map = game_state.world_generator.biome_map
+        x0, y0 = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+        rows = []
+        for y in range(y0, y0 + CHUNK_SIZE):
+            row = []
+            for x in range(x0, x0 + CHUNK_SIZE):
+                location_id = known.get((x, y))
+                if location_id is None:
+                    row.append(UNKNOWN_TILE)
+                    continue
+                location = game_state.discovered_locations.get(location_id)
+                if location is not None:
+                    location_type = location.location_type
+                elif (x, y) == ORIGIN:
+                    location_type = "meadow"
+                else:
+                    location_type = biome_map.biome_at(x, y)  # Evicted, but its biome is fixed
+                row.append(TILES.get(location_type, "?"))
+            rows.append(tuple(row))
+        return tuple(rows)
+
+    def render(self, center, width=60, height=20):
+        """Return the viewport around center as lines of text, north at the top"""
+        px, py = center
+        left = px - width // 2
+        top = py + (height - 1) // 2
+        lines = []
+        for y in range(top, top - height, -1):
+            parts = []
+            x = left
+            while x < left + width:
+                cx, cy = chunk_of(x, y)
+                row = self.chunk_rows(cx, cy)[y - cy * CHUNK_SIZE]
+                start = x - cx * CHUNK_SIZE
+                end = min(CHUNK_SIZE, start + left + width - x)
+                if y == py and x <= px < x + end - start:
+                    split = px - cx * CHUNK_SIZE
+                    parts.extend(row[start:split])
+                    parts.append(PLAYER_TILE)
+                    parts.extend(row[split + 1:end])
+                else:
+                    parts.extend(row[start:end])
+                x += end - start
+            lines.append("".join(parts))
+        return lines
@@ -1,10 +1,38 @@
+def _rare_enemy(player, context):
+    return getattr(context.get("enemy"), "is_rare", False)
+
+
+def _rare_kills(player, context):
+    """Rare kills so far, counting this one"""
+    return player.stats.get("rare_kills", 0) + 1
+
+
 class Achievement:
-    def __init__(self, name, description, reward_exp=0):
+    def __init__(self, name, description, reward_exp=0, trigger=None, target=1,
+                 condition=None, progress=None, distinct=None):
+        """
+        Initialize an achievement
+        
+        Args:
+            trigger (str): The action this achievement listens for
+            target (int): Progress needed to complete it
+            condition: (player, context) -> bool; actions failing it don't count
+            progress: (player, context) -> int, for progress kept elsewhere;
+                by default each counted action adds one
+            distinct (str): Context field that must take a new value to count
+        """
         self.name = name
         self.description = description
         self.completed = False
         self.reward_exp = reward_exp
         self.completion_date = None
+        self.trigger = trigger
+        self.target = target
+        self.condition = condition
+        self.progress_of = progress
+        self.distinct = distinct
+        self.progress = 0
+        self.seen = 0  # Bitset of the distinct values counted so far
 
 class AchievementSystem:
     def __init__(self):
@@ -13,45 +41,72 @@ class AchievementSystem:
             "rare_hunter": Achievement(
                 "Rare Hunter", 
                 "Defeat your first rare enemy",
-                reward_exp=100
+                reward_exp=100,
+                trigger="defeat_enemy", condition=_rare_enemy, progress=_rare_kills
             ),
             "legendary_hunter": Achievement(
                 "Legendary Hunter",
                 "Defeat 10 rare enemies",
-                reward_exp=500
+                reward_exp=500,
+                trigger="defeat_enemy", target=10, condition=_rare_enemy, progress=_rare_kills
             ),
             "ghost_wolf_slayer": Achievement(
                 "Ghost Wolf Slayer",
                 "Defeat the mythical Ghost Wolf",
-                reward_exp=250
+                reward_exp=250,
+                trigger="defeat_enemy",
+                condition=lambda player, context: _rare_enemy(player, context) and context["enemy"].name == "ghost wolf"
             ),
             
             # Collection achievements
             "rare_collector": Achievement(
                 "Rare Collector",
                 "Collect 5 different rare items",
-                reward_exp=200
+                reward_exp=200,
+                trigger="collect_item", target=5, distinct="item_name",
+                condition=lambda player, context: context.get("rarity") == "rare"
             ),
             
             # Discovery achievements
             "secret_finder": Achievement(
                 "Secret Finder",
                 "Discover a hidden location",
-                reward_exp=150
+                reward_exp=150,
+                trigger="discover_location",
+                condition=lambda player, context: context.get("hidden", False)
             )
         }
         
+        # trigger -> ids of the incomplete achievements listening for it
+        self.listeners = {}
+        for achievement_id, achievement in self.achievements.items():
+            self.listeners.setdefault(achievement.trigger, []).append(achievement_id)
+        self.values = {}  # Distinct context value -> its bit in Achievement.seen
+        
     def check_achievement(self, player, trigger, context):
-        """Check if an achievement should be unlocked"""
-        if trigger == "defeat_enemy" and context.get("enemy").is_rare:
-            rare_kills = player.stats.get("rare_kills", 0)
-            
-            if rare_kills == 0:
-                self.unlock_achievement(player, "rare_hunter")
-            if rare_kills == 9:
-                self.unlock_achievement(player, "legendary_hunter")
-            if context["enemy"].name == "ghost wolf":
-                self.unlock_achievement(player, "ghost_wolf_slayer")
+        """Check if an achievement should be unlocked
+        
+        Only the incomplete achievements listening for this trigger are
+        looked at; completing one stops it listening.
+        """
+        for achievement_id in list(self.listeners.get(trigger, ())):
+            if self._advance(self.achievements[achievement_id], player, context):
+                self.unlock_achievement(player, achievement_id)
+                
+    def _advance(self, achievement, player, context):
+        """Count an action towards an achievement; returns whether it's now complete"""
+        if achievement.condition and not achievement.condition(player, context):
+            return False
+        if achievement.distinct:
+            bit = 1 << self.values.setdefault(context.get(achievement.distinct), len(self.values))
+            if achievement.seen & bit:
+                return False
+            achievement.seen |= bit
+        if achievement.progress_of:
+            achievement.progress = achievement.progress_of(player, context)
+        else:
+            achievement.progress += 1
+        return achievement.progress >= achievement.target
                 
     def unlock_achievement(self, player, achievement_id):
         """Unlock an achievement and grant its rewards"""
@@ -59,6 +114,9 @@ class AchievementSystem:
         if not achievement.completed:
             achievement.completed = True
             achievement.completion_date = player.game_state.time.current_time
+            listeners = self.listeners.get(achievement.trigger, [])
+            if achievement_id in listeners:
+                listeners.remove(achievement_id)
             
             # Grant rewards
             player.gain_exp(achievement.reward_exp)
@@ -68,4 +126,4 @@ class AchievementSystem:
                 f"Achievement Unlocked: {achievement.name}!\n"
                 f"{achievement.description}\n"
                 f"Reward: {achievement.reward_exp} XP"
-            ) 
\ No newline at end of file
+            ) 
@@ -1,47 +1,66 @@
+from bisect import bisect_right
+
+# Total exp for the first few levels, set by hand; the curve carries on from here
+FIRST_THRESHOLDS = (100, 250, 500, 1000)
+
+
+def polynomial_curve(scale=500, power=2, start=len(FIRST_THRESHOLDS)):
+    """Exp from each level to the next, growing as a power of the level"""
+    return lambda level: round(scale * (level / start) ** power)
+
+
+def exponential_curve(scale=500, growth=1.25, start=len(FIRST_THRESHOLDS)):
+    """Exp from each level to the next, growing by a fixed factor per level"""
+    return lambda level: round(scale * growth ** (level - start))
+
+
 class LevelingSystem:
-    def __init__(self):
-        self.level_thresholds = [
-            100,  # Level 1->2
-            250,  # Level 2->3
-            500,  # Level 3->4
-            1000, # Level 4->5
-            # ... etc
-        ]
+    """Levels from total exp, with no level cap
+    
+    level_thresholds[i] is the total exp needed to go from level i + 1 to
+    i + 2. Past the hand-set first levels, thresholds come from a curve
+    giving the exp between consecutive levels; they are generated only as
+    far as someone's exp reaches and kept for later lookups, which are a
+    bisection.
+    """
+    def __init__(self, curve=None):
+        self.curve = curve or polynomial_curve()
+        self.level_thresholds = list(FIRST_THRESHOLDS)
         
+    def _extend_past(self, exp):
+        """Generate thresholds until the last one is beyond exp"""
+        thresholds = self.level_thresholds
+        while thresholds[-1] <= exp:
+            thresholds.append(thresholds[-1] + max(1, self.curve(len(thresholds) + 1)))
+            
     def calculate_level(self, exp):
         """Calculate level based on total exp"""
-        level = 1
-        for threshold in self.level_thresholds:
-            if exp >= threshold:
-                level += 1
-            else:
-                break
-        return level
+        self._extend_past(exp)
+        return bisect_right(self.level_thresholds, exp) + 1
         
     def exp_to_next_level(self, current_exp):
         """Calculate exp needed for next level"""
         current_level = self.calculate_level(current_exp)
-        if current_level > len(self.level_thresholds):
-            return None  # Max level reached
         return self.level_thresholds[current_level - 1] - current_exp
         
     def level_up(self, player):
-        """Handle level up effects"""
+        """Handle level up effects, for any number of levels gained at once"""
         old_level = player.level
         new_level = self.calculate_level(player.exp)
         
         if new_level > old_level:
+            gained = new_level - old_level
             player.level = new_level
             # Grant level up bonuses
-            player.max_health += 10
+            player.max_health += 10 * gained
             player.health = player.max_health  # Heal on level up
-            player.base_damage += 2
-            player.base_defense += 1
+            player.base_damage += 2 * gained
+            player.base_defense += 1 * gained
             
             # Notify player
             player.game_state.display.show_message(
                 f"Level Up! You are now level {new_level}!\n"
-                f"Health +10\n"
-                f"Damage +2\n"
-                f"Defense +1"
-            ) 
\ No newline at end of file
+                f"Health +{10 * gained}\n"
+                f"Damage +{2 * gained}\n"
+                f"Defense +{gained}"
+            ) 
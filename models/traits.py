@@ -1,3 +1,27 @@
+# Stats every Entity has a slot for; trait modifiers on these compile into a vector
+VECTOR_STATS = ("health", "damage", "defense", "dodge_chance", "crit_chance")
+
+
+class CompiledTrait:
+    """A trait's effects flattened for fast application
+
+    multipliers lines up with VECTOR_STATS (1.0 where the trait doesn't
+    touch a stat); modifiers on any other stat are kept as pairs.
+    """
+    __slots__ = ("multipliers", "other_modifiers", "abilities")
+
+    def __init__(self, effect):
+        object.__setattr__(self, "multipliers",
+                           tuple(effect.stat_modifiers.get(stat, 1.0) for stat in VECTOR_STATS))
+        object.__setattr__(self, "other_modifiers", tuple(
+            (stat, modifier) for stat, modifier in effect.stat_modifiers.items()
+            if stat not in VECTOR_STATS))
+        object.__setattr__(self, "abilities", tuple(effect.abilities))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("compiled traits are shared and can't be changed")
+
+
 class TraitEffect:
     def __init__(self, name, description, stat_modifiers=None, abilities=None):
         self.name = name
@@ -40,18 +64,28 @@ class TraitSystem:
                 abilities=["rage"]
             ),
         }
+        self.compiled = {}  # trait name -> CompiledTrait, or None for traits without effects
+
+    def compile(self, trait_name):
+        """Return the compiled form of a trait, or None if it has no effects"""
+        if trait_name not in self.compiled:
+            effect = self.trait_effects.get(trait_name)
+            self.compiled[trait_name] = CompiledTrait(effect) if effect else None
+        return self.compiled[trait_name]
 
     def apply_trait(self, entity, trait_name):
         """Apply a trait's effects to an entity"""
-        if trait_name not in self.trait_effects:
+        compiled = self.compile(trait_name)
+        if compiled is None:
             return
 
-        effect = self.trait_effects[trait_name]
-        
         # Apply stat modifiers
-        for stat, modifier in effect.stat_modifiers.items():
-            current_value = getattr(entity, stat, 0)
-            setattr(entity, stat, current_value * modifier)
+        for stat, modifier in zip(VECTOR_STATS, compiled.multipliers):
+            if modifier != 1.0:
+                setattr(entity, stat, getattr(entity, stat, 0) * modifier)
+        for stat, modifier in compiled.other_modifiers:
+            setattr(entity, stat, getattr(entity, stat, 0) * modifier)
         
         # Add abilities
-        entity.abilities.extend(effect.abilities) 
\ No newline at end of file
+        if compiled.abilities:
+            entity.abilities = [*entity.abilities, *compiled.abilities] 
\ No newline at end of file
@@ -0,0 +1,337 @@
+import math
+import random
+from array import array
+from entities import Entity
+from items import Item
+from trading import PriceTable, StockIndex, kind_of
+from world_generator import DIRECTION_OFFSETS, ORIGIN, cell_seed, chunk_of
+
+NPC_COUNT = 2000
+NPC_SPREAD = 256  # NPCs start within this many cells of the origin
+NPC_CHANNEL = 11  # Keeps the NPC population from echoing the per-cell location rolls
+EXACT_STEPS = 32   # Longer walks are drawn from their normal approximation
+TURN_BUDGET = 200  # Far-off NPCs brought up to date per turn, round robin
+
+# kind -> (weight in the population, minutes per step along the grid (0 never moves),
+#          gold range, wares carried, health range, damage range, defense range, descriptions)
+NPC_KINDS = {
+    "traveling merchant": (0.4, 90, (100, 300), (4, 8), (20, 25), (3, 5), (1, 2),
+                           ("A traveling merchant with a heavy pack", "A weary merchant rests here")),
+    "traveler": (0.45, 60, (10, 50), (0, 2), (25, 30), (4, 6), (1, 2),
+                 ("A fellow traveler pauses on their journey", "A mysterious traveler considers you")),
+    "hermit": (0.15, 0, (0, 20), (0, 1), (20, 25), (3, 5), (1, 2),
+               ("A solitary hermit keeps to themselves", "A wise-looking hermit meditates quietly"))
+}
+KINDS = tuple(NPC_KINDS)
+WARE_CATEGORIES = ("weapon", "armor", "food", "quest_item")
+STEPS = tuple(DIRECTION_OFFSETS.values())
+
+
+class NPCPopulation:
+    """Persistent neutral NPCs walking the world grid
+
+    Every NPC is a row in parallel arrays (kind, position, gold, the
+    minute it was last moved) plus a compact array('H') of ware ids; a
+    ware is one (item template, bonuses) combination shared by every copy
+    in the world. NPCs walk the grid one step per 60 to 90 minutes,
+    depending on their kind. A turn moves the NPCs in the active chunks
+    and a fixed budget of far-off ones, each caught up for all the steps
+    it missed with one batched draw, so the cost of a turn doesn't grow
+    with the population. An NPC standing where the player is becomes a
+    real Entity until the player leaves.
+
+    The population is only built when someone could be met: the seed puts
+    nobody at the origin, so a new game starts without it. Saves keep the
+    NPCs the player has changed (traded with or killed) and the ones near
+    the player; everyone else is rebuilt from the seed and walked forward
+    to the saved time on load.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.prices = PriceTable()
+        self.reset()
+
+    def reset(self, data=None):
+        """Forget every NPC; they're rebuilt from data, or from the world seed when next needed"""
+        self.kinds = array('B')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.gold = array('i')
+        self.last_minute = array('i')
+        self.alive = bytearray()
+        self.stock = []    # NPC id -> array('H') of ware ids
+        self.wares = []    # Ware id -> (template, damage_bonus, defense_bonus, food_value)
+        self.ware_ids = {}
+        self.indexes = {}  # NPC id -> StockIndex, built the first time someone trades with them
+        self.cells = {}    # (x, y) -> list of NPC ids standing there
+        self.chunks = {}   # (cx, cy) -> set of NPC ids in that chunk
+        self.present = {}  # NPC id -> (Entity, Location), for NPCs sharing the player's location
+        self.changed = set()  # Seeded NPCs the player has changed, which saves have to keep
+        self.seeded = 0        # NPCs (and wares, below) that came from the seed rather than a save
+        self.seeded_wares = 0
+        self.cursor = 0
+        self.rng = random.Random()
+        self.populated = False
+        self.data = data       # Saved NPCs, applied when the population is built
+        self.start_minute = data.get("start_minute", 0) if data else self.game_state.time.current_time
+
+    def __len__(self):
+        self.ensure()
+        return sum(self.alive)
+
+    def ensure(self):
+        if not self.populated:
+            self.populated = True
+            data, self.data = self.data, None
+            if data is None or data.get("seeded"):  # Older saves list every NPC and skip the seed
+                self._populate()
+            if data is not None:
+                self._load(data)
+
+    def ware_id(self, item):
+        """Return the ware id for an item, adding a new ware if needed"""
+        self.ensure()  # Seeded wares come first, so their ids are the same in every session
+        ware = (item.template, item.damage_bonus, item.defense_bonus, item.food_value)
+        ware_id = self.ware_ids.get(ware)
+        if ware_id is None:
+            ware_id = self.ware_ids[ware] = len(self.wares)
+            self.wares.append(ware)
+        return ware_id
+
+    def ware_item(self, ware_id):
+        return Item.from_template(*self.wares[ware_id])
+
+    def stock_index(self, npc):
+        """Return the NPC's stock sorted by value within each kind of item"""
+        index = self.indexes.get(npc)
+        if index is None:
+            index = self.indexes[npc] = StockIndex()
+            for ware in self.stock[npc]:
+                self._index_ware(index.add, ware)
+        return index
+
+    def take_ware(self, npc, ware):
+        self.changed.add(npc)
+        self.stock[npc].remove(ware)
+        if npc in self.indexes:
+            self._index_ware(self.indexes[npc].remove, ware)
+
+    def give_ware(self, npc, ware):
+        self.changed.add(npc)
+        self.stock[npc].append(ware)
+        if npc in self.indexes:
+            self._index_ware(self.indexes[npc].add, ware)
+
+    def _index_ware(self, update, ware):
+        template = self.wares[ware][0]
+        update((kind_of(template), template.type), self.prices.ware_value(*self.wares[ware]) or 0, ware)
+
+    def at(self, x, y):
+        """Ids of the living NPCs standing at (x, y)"""
+        self.ensure()
+        return list(self.cells.get((x, y), ()))
+
+    def add(self, kind, position, gold, wares=(), minute=0):
+        """Add an NPC and return its id"""
+        self.ensure()
+        npc = len(self.kinds)
+        self.kinds.append(KINDS.index(kind))
+        self.xs.append(position[0])
+        self.ys.append(position[1])
+        self.gold.append(gold)
+        self.last_minute.append(minute)
+        self.alive.append(1)
+        self.stock.append(array('H', wares))
+        self._place(npc)
+        return npc
+
+    def tick(self):
+        """Move the NPCs due an update this turn
+
+        All NPCs in the active chunks move, plus the next TURN_BUDGET of
+        the whole population. Returns how many NPCs were updated.
+        """
+        if not self.populated:
+            return 0  # Nobody to move yet; they catch up from the start when built
+        nearby = set()
+        for key in self.game_state.simulation.active:
+            nearby.update(self.chunks.get(key, ()))
+        count = len(self.kinds)
+        budget = min(TURN_BUDGET, count)
+        start = self.cursor
+        self.cursor = (start + budget) % count if count else 0
+        due = nearby.union(range(start, min(start + budget, count)),
+                           range(0, max(0, start + budget - count)))
+        self.walk(due, self.game_state.time.current_time)
+        return len(due)
+
+    def walk(self, npcs, now):
+        """Bring some NPCs' walks up to the game minute now
+
+        The single steps of every short walk come from one draw; long
+        walks jump straight to a displacement drawn from the walk's normal
+        approximation.
+        """
+        rng = self.rng
+        due = []
+        for npc in npcs:
+            pace = NPC_KINDS[KINDS[self.kinds[npc]]][1]
+            if not pace or not self.alive[npc]:
+                continue
+            steps = (now - self.last_minute[npc]) // pace
+            if steps <= 0:
+                continue
+            self.last_minute[npc] += steps * pace
+            if npc not in self.present:  # NPCs talking to the player stay put
+                due.append((npc, steps))
+
+        moves = iter(rng.choices(STEPS, k=sum(steps for _, steps in due if steps <= EXACT_STEPS)))
+        for npc, steps in due:
+            dx = dy = 0
+            if steps <= EXACT_STEPS:
+                for _ in range(steps):
+                    step_x, step_y = next(moves)
+                    dx += step_x
+                    dy += step_y
+            else:
+                spread = math.sqrt(steps / 2)  # Each axis takes half the steps, +1 or -1
+                dx = round(rng.gauss(0, spread))
+                dy = round(rng.gauss(0, spread))
+            if dx or dy:
+                self._unplace(npc)
+                self.xs[npc] += dx
+                self.ys[npc] += dy
+                self._place(npc)
+
+    def meet(self, location):
+        """Turn the NPCs at the player's location into entities there
+
+        NPCs left behind return to the arrays, and ones the player killed
+        leave the population. Returns the entities that just appeared.
+        """
+        coordinates = getattr(location, 'coordinates', None)
+        if not self.populated and self.data is None and coordinates == ORIGIN:
+            return []  # Nobody waits at the start, so there's no one to build yet
+        here = set()
+        if coordinates is not None and getattr(location, 'surface', None) is None:
+            here.update(self.at(*coordinates))  # NPCs keep to the surface
+        for npc in [npc for npc in self.present if npc not in here or self.present[npc][0].health <= 0]:
+            entity, place = self.present.pop(npc)
+            if entity.health <= 0:
+                self._retire(npc)
+            elif entity in place.entities:
+                place.remove_entity(entity)
+
+        met = []
+        for npc in sorted(here - set(self.present)):
+            entity = self._materialize(npc)
+            location.add_entity(entity)
+            self.present[npc] = (entity, location)
+            met.append(entity)
+        return met
+
+    def _materialize(self, npc):
+        kind = KINDS[self.kinds[npc]]
+        _, _, _, _, health, damage, defense, descriptions = NPC_KINDS[kind]
+        # Stats come from the NPC's id, so meeting someone again finds them unchanged
+        rng = random.Random(npc)
+        entity = Entity(kind, rng.choice(descriptions))
+        entity.health = rng.randint(*health)
+        entity.damage = rng.randint(*damage)
+        entity.defense = rng.randint(*defense)
+        entity.inventory = [self.ware_item(ware) for ware in self.stock[npc]]
+        entity.npc_id = npc
+        return entity
+
+    def _retire(self, npc):
+        self.changed.add(npc)
+        self._unplace(npc)
+        self.alive[npc] = 0
+
+    def _place(self, npc):
+        x, y = self.xs[npc], self.ys[npc]
+        self.cells.setdefault((x, y), []).append(npc)
+        self.chunks.setdefault(chunk_of(x, y), set()).add(npc)
+
+    def _unplace(self, npc):
+        x, y = self.xs[npc], self.ys[npc]
+        cell = self.cells[(x, y)]
+        cell.remove(npc)
+        if not cell:
+            del self.cells[(x, y)]
+        self.chunks[chunk_of(x, y)].discard(npc)
+
+    def _populate(self):
+        game_state = self.game_state
+        rng = random.Random(cell_seed(game_state.world_generator.seed * 31 + NPC_CHANNEL, 0, 0))
+        kinds = rng.choices(KINDS, weights=[NPC_KINDS[kind][0] for kind in KINDS], k=NPC_COUNT)
+        wanted = [rng.randint(*NPC_KINDS[kind][3]) for kind in kinds]
+
+        # Every ware in the world comes from one batch per category, made under
+        # the world generator's lock since the prefetcher shares its caches
+        category_of = rng.choices(WARE_CATEGORIES, k=sum(wanted))
+        with game_state.world_generator.lock:
+            batches = {category: iter(game_state.item_generator.generate_items(
+                           category, category_of.count(category), rng=rng))
+                       for category in WARE_CATEGORIES}
+        wares = iter(self.ware_id(next(batches[category])) for category in category_of)
+
+        now = self.start_minute
+        for kind, count in zip(kinds, wanted):
+            position = ORIGIN
+            while position == ORIGIN:  # Nobody waits at the very start
+                position = (rng.randint(-NPC_SPREAD, NPC_SPREAD), rng.randint(-NPC_SPREAD, NPC_SPREAD))
+            gold = rng.randint(*NPC_KINDS[kind][2])
+            self.add(kind, position, gold, [next(wares) for _ in range(count)], now)
+        self.seeded = len(self.kinds)
+        self.seeded_wares = len(self.wares)
+        self.rng.seed(rng.getrandbits(64))
+
+    def to_dict(self):
+        """Save the NPCs that differ from the seed's, and the ones near the player"""
+        if not self.populated and self.data is not None:
+            return self.data  # Not built since loading, so nothing has changed
+        saved = set(self.changed).union(self.present, range(self.seeded, len(self.kinds)))
+        for key in self.game_state.simulation.active:
+            saved.update(self.chunks.get(key, ()))
+        saved = sorted(saved)
+        return {
+            "start_minute": self.start_minute,
+            "minute": self.game_state.time.current_time,
+            "seeded": self.seeded if self.populated else NPC_COUNT,
+            "changed": sorted(self.changed),
+            "ids": saved,
+            "kind": [KINDS[self.kinds[npc]] for npc in saved],
+            "x": [self.xs[npc] for npc in saved],
+            "y": [self.ys[npc] for npc in saved],
+            "gold": [self.gold[npc] for npc in saved],
+            "last_minute": [self.last_minute[npc] for npc in saved],
+            "alive": [self.alive[npc] for npc in saved],
+            "stock": [self.stock[npc].tolist() for npc in saved],
+            "wares": [self.ware_item(ware).to_dict() for ware in range(self.seeded_wares, len(self.wares))]
+        }
+
+    def _load(self, data):
+        ids = data.get("ids", range(len(data["kind"])))
+        if self.seeded:
+            # Seeded NPCs the save left out walked on unseen; catch them up to when it was made
+            kept = set(ids)
+            self.walk([npc for npc in range(self.seeded) if npc not in kept], data["minute"])
+        # Wares the save added after the seeded ones, as ids in this session
+        added = [self.ware_id(Item.from_dict(item)) for item in data["wares"]]
+        for row, npc in enumerate(ids):
+            wares = [ware if ware < self.seeded_wares else added[ware - self.seeded_wares]
+                     for ware in data["stock"][row]]
+            position = (data["x"][row], data["y"][row])
+            if npc < len(self.kinds):
+                self._unplace(npc)
+                self.xs[npc], self.ys[npc] = position
+                self.gold[npc] = data["gold"][row]
+                self.last_minute[npc] = data["last_minute"][row]
+                self.stock[npc] = array('H', wares)
+                self._place(npc)
+            else:
+                self.add(data["kind"][row], position, data["gold"][row], wares, data["last_minute"][row])
+            if not data["alive"][row]:
+                self._retire(npc)
+        self.changed = set(data.get("changed", ()))
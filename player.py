@@ -1,7 +1,16 @@
 from journal import Journal
 from items import Item
+from inventory import Inventory, GEAR_SLOTS, gear_score
 
 class Player:
+    # Systems bolt things like base_damage or stats onto the player; those
+    # land in the __dict__ extension slot
+    __slots__ = ("_inventory", "health", "_base_max_health", "equipped", "damage", "defense",
+                 "journal", "hunger", "thirst", "energy", "bladder", "_base_dodge_chance",
+                 "crit_chance", "status_effects", "level", "exp", "gold", "strength",
+                 "dexterity", "intelligence", "vitality", "charisma", "wisdom", "luck",
+                 "skills", "__dict__")
+    
     def __init__(self):
         self.inventory = []  # Start with empty inventory, not the note
         self.health = 100
@@ -51,21 +60,47 @@ class Player:
             'crafting': 1
         }
         
-    def equip(self, item):
-        """Equip an item"""
-        if item not in self.inventory:
-            self.inventory.append(item)  # Add item if not in inventory
-        
-        if item.type == "weapon":
-            if self.equipped['weapon']:
-                self.inventory.append(self.equipped['weapon'])
-            self.equipped['weapon'] = item
-        elif item.type == "armor":
-            if self.equipped['armor']:
-                self.inventory.append(self.equipped['armor'])
-            self.equipped['armor'] = item
+    @property
+    def inventory(self):
+        return self._inventory
         
-        self.inventory.remove(item)
+    @inventory.setter
+    def inventory(self, items):
+        # Whatever list is assigned, the gear index has to follow it
+        self._inventory = items if isinstance(items, Inventory) else Inventory(items)
+        
+    def equip(self, item):
+        """Equip an item, putting whatever was in its slot back in the inventory"""
+        slot = item.type
+        if slot not in self.equipped:
+            return f"You can't equip the {item.name}."
+        if item in self.inventory:
+            self.inventory.remove(item)
+        if self.equipped[slot]:
+            self.inventory.append(self.equipped[slot])
+        self.equipped[slot] = item
+        return f"You equip the {item.name}."
+        
+    def best_loadout(self, mode="balanced"):
+        """Return {slot: item} for the carried items that beat what's equipped
+        
+        Each slot's best candidate comes straight off the inventory's gear
+        index, so this costs the same however much is being carried.
+        """
+        loadout = {}
+        for slot in GEAR_SLOTS:
+            best = self.inventory.gear.best(slot, mode)
+            if best is not None and gear_score(best, mode) > gear_score(self.equipped.get(slot), mode):
+                loadout[slot] = best
+        return loadout
+        
+    def equip_loadout(self, loadout):
+        """Equip several items at once, one swap per slot"""
+        for slot, item in loadout.items():
+            self.inventory.remove(item)
+            if self.equipped.get(slot):
+                self.inventory.append(self.equipped[slot])
+            self.equipped[slot] = item
             
     def get_stats(self):
         """Calculate total damage and defense including stat bonuses"""
@@ -109,15 +144,18 @@ class Player:
         elif choice == "3":
             self.journal.show_quest_notes() 
         
-    def update_needs(self):
-        # Every 10 minutes
-        self.hunger -= 0.5
-        self.thirst -= 1.0
-        self.energy -= 0.3
-        self.bladder -= 0.7
-        
-        if self.hunger <= 0 or self.thirst <= 0:
-            self.health -= 1
+    def update_needs(self, ticks=1):
+        # Every 10 minutes; each tick that ends at zero hunger or thirst costs a point of health
+        first_starving = min(max(1, int(-(-need // rate)))
+                             for need, rate in ((self.hunger, 0.5), (self.thirst, 1.0)))
+        self.hunger -= 0.5 * ticks
+        self.thirst -= 1.0 * ticks
+        self.energy -= 0.3 * ticks
+        self.bladder -= 0.7 * ticks
+        
+        starving = ticks - first_starving + 1
+        if starving > 0:
+            self.health -= starving
             print("You're dying of hunger/thirst!")
         
         if self.energy <= 20:
@@ -0,0 +1,157 @@
+import math
+from array import array
+
+SPECIES = ("rabbit", "deer", "wolf")
+RABBIT, DEER, WOLF = range(len(SPECIES))
+
+MINUTES_PER_DAY = 1440
+STEP_MINUTES = 60   # Longest Euler step; rates are per day, so this keeps steps stable
+EXTINCT = 0.01      # Populations below this count as gone, and stay gone
+
+# Rates per day. Prey grow logistically towards their chunk's capacity,
+# wolves eat a share of each prey per wolf and turn what they eat into pups.
+RABBIT_GROWTH = 0.8
+DEER_GROWTH = 0.3
+RABBIT_PREDATION = 0.2   # Share of rabbits one wolf takes per day
+DEER_PREDATION = 0.05
+RABBIT_CONVERSION = 0.1  # Wolves gained per rabbit eaten
+DEER_CONVERSION = 0.3
+WOLF_MORTALITY = 0.1
+
+
+def _matmul(a, b):
+    size = len(a)
+    return [[sum(a[i][k] * b[k][j] for k in range(size)) for j in range(size)] for i in range(size)]
+
+
+def _expm(matrix):
+    """Matrix exponential of a small matrix by scaling and squaring a Taylor series"""
+    size = len(matrix)
+    norm = max(sum(abs(value) for value in row) for row in matrix)
+    squarings = max(0, math.ceil(math.log2(norm)) + 1) if norm > 0.5 else 0
+    scale = 2.0 ** -squarings
+    scaled = [[value * scale for value in row] for row in matrix]
+    result = [[float(i == j) for j in range(size)] for i in range(size)]
+    term = [row[:] for row in result]
+    for k in range(1, 13):
+        term = [[value / k for value in row] for row in _matmul(term, scaled)]
+        result = [[r + t for r, t in zip(result_row, term_row)] for result_row, term_row in zip(result, term)]
+    for _ in range(squarings):
+        result = _matmul(result, result)
+    return result
+
+
+def _logistic(population, capacity, growth, days):
+    """Exact solution of logistic growth after some days"""
+    if population <= EXTINCT or capacity <= 0:
+        return 0.0
+    return capacity / (1 + (capacity / population - 1) * math.exp(-growth * days))
+
+
+class PopulationModel:
+    """Rabbit, deer and wolf numbers for every simulated chunk
+
+    Each chunk is a slot in parallel array('d') columns: one per species
+    plus the two prey carrying capacities. step() advances a set of slots
+    together with a discretized Lotka-Volterra model (logistic prey, one
+    predator eating both). catch_up() jumps one slot forward in closed
+    form instead: exactly for prey alone, and through the linearization
+    around the equilibrium when wolves are present.
+    """
+    def __init__(self):
+        self.columns = tuple(array('d') for _ in SPECIES)
+        self.rabbit_capacity = array('d')
+        self.deer_capacity = array('d')
+
+    def __len__(self):
+        return len(self.rabbit_capacity)
+
+    def add(self, rabbits, deer, wolves, rabbit_capacity, deer_capacity):
+        """Start tracking a chunk; returns its slot"""
+        for column, value in zip(self.columns, (rabbits, deer, wolves)):
+            column.append(value)
+        self.rabbit_capacity.append(rabbit_capacity)
+        self.deer_capacity.append(deer_capacity)
+        return len(self.rabbit_capacity) - 1
+
+    def population(self, slot):
+        """Return (rabbits, deer, wolves) for a slot"""
+        return tuple(column[slot] for column in self.columns)
+
+    def adjust(self, slot, species, change):
+        """Add to (or with a negative change, take from) one species in a slot"""
+        column = self.columns[SPECIES.index(species)]
+        column[slot] = max(0.0, column[slot] + change)
+
+    def equilibrium(self, rabbit_capacity, deer_capacity):
+        """Where (rabbits, deer, wolves) settle for these capacities"""
+        supply = (RABBIT_CONVERSION * RABBIT_PREDATION * rabbit_capacity
+                  + DEER_CONVERSION * DEER_PREDATION * deer_capacity)
+        pressure = (RABBIT_CONVERSION * RABBIT_PREDATION ** 2 * rabbit_capacity / RABBIT_GROWTH
+                    + DEER_CONVERSION * DEER_PREDATION ** 2 * deer_capacity / DEER_GROWTH)
+        wolves = (supply - WOLF_MORTALITY) / pressure if pressure else 0.0
+        if wolves <= 0:
+            return rabbit_capacity, deer_capacity, 0.0
+        # Too many wolves for a prey species wipes it out; it then drops out of the balance
+        rabbits = rabbit_capacity * (1 - RABBIT_PREDATION * wolves / RABBIT_GROWTH)
+        deer = deer_capacity * (1 - DEER_PREDATION * wolves / DEER_GROWTH)
+        if rabbits < 0:
+            return self.equilibrium(0.0, deer_capacity)
+        if deer < 0:
+            return self.equilibrium(rabbit_capacity, 0.0)
+        return rabbits, deer, wolves
+
+    def step(self, slots, minutes):
+        """Advance every given slot by some minutes in Euler steps"""
+        rabbits, deer, wolves = self.columns
+        steps = max(1, math.ceil(minutes / STEP_MINUTES))
+        days = minutes / MINUTES_PER_DAY / steps
+        for slot in slots:
+            r, d, w = rabbits[slot], deer[slot], wolves[slot]
+            rabbit_capacity, deer_capacity = self.rabbit_capacity[slot], self.deer_capacity[slot]
+            for _ in range(steps):
+                rabbit_crowding = r / rabbit_capacity if rabbit_capacity else 1.0
+                deer_crowding = d / deer_capacity if deer_capacity else 1.0
+                rabbits_eaten = RABBIT_PREDATION * r * w
+                deer_eaten = DEER_PREDATION * d * w
+                r += (RABBIT_GROWTH * r * (1 - rabbit_crowding) - rabbits_eaten) * days
+                d += (DEER_GROWTH * d * (1 - deer_crowding) - deer_eaten) * days
+                w += (RABBIT_CONVERSION * rabbits_eaten + DEER_CONVERSION * deer_eaten
+                      - WOLF_MORTALITY * w) * days
+                r, d, w = (value if value > EXTINCT else 0.0 for value in (r, d, w))
+            rabbits[slot], deer[slot], wolves[slot] = r, d, w
+
+    def catch_up(self, slot, minutes):
+        """Jump a slot forward by some minutes without stepping through them"""
+        days = minutes / MINUTES_PER_DAY
+        r, d, w = self.population(slot)
+        # Species already gone can't come back, so they leave the balance
+        rabbit_capacity = self.rabbit_capacity[slot] if r > EXTINCT else 0.0
+        deer_capacity = self.deer_capacity[slot] if d > EXTINCT else 0.0
+        
+        if w <= EXTINCT:
+            state = (_logistic(r, rabbit_capacity, RABBIT_GROWTH, days),
+                     _logistic(d, deer_capacity, DEER_GROWTH, days), 0.0)
+        else:
+            settled = self.equilibrium(rabbit_capacity, deer_capacity)
+            jacobian = self._jacobian(settled, rabbit_capacity, deer_capacity)
+            decay = _expm([[value * days for value in row] for row in jacobian])
+            offset = [value - target for value, target in zip((r, d, w), settled)]
+            state = [target + sum(factor * delta for factor, delta in zip(row, offset))
+                     for target, row in zip(settled, decay)]
+            limits = (rabbit_capacity, deer_capacity, max(w, settled[WOLF]))
+            state = [min(max(value, 0.0), limit) for value, limit in zip(state, limits)]
+            
+        for column, value in zip(self.columns, state):
+            column[slot] = value if value > EXTINCT else 0.0
+
+    def _jacobian(self, state, rabbit_capacity, deer_capacity):
+        r, d, w = state
+        rabbit_crowding = 2 * r / rabbit_capacity if rabbit_capacity else 1.0
+        deer_crowding = 2 * d / deer_capacity if deer_capacity else 1.0
+        return [
+            [RABBIT_GROWTH * (1 - rabbit_crowding) - RABBIT_PREDATION * w, 0.0, -RABBIT_PREDATION * r],
+            [0.0, DEER_GROWTH * (1 - deer_crowding) - DEER_PREDATION * w, -DEER_PREDATION * d],
+            [RABBIT_CONVERSION * RABBIT_PREDATION * w, DEER_CONVERSION * DEER_PREDATION * w,
+             RABBIT_CONVERSION * RABBIT_PREDATION * r + DEER_CONVERSION * DEER_PREDATION * d - WOLF_MORTALITY]
+        ]
@@ -0,0 +1,91 @@
+import threading
+from collections import deque
+from world_generator import DIRECTION_OFFSETS
+
+
+class LocationPrefetcher:
+    """Pregenerates the cells the player is likely to enter next
+
+    Generation runs on a background thread while the main loop waits for
+    input. Cells come from the per-cell seeded generator, so a prefetched
+    location is identical to one generated on demand. The generator's lock
+    keeps the worker and the main thread from generating at the same
+    time, since generation fills caches they share. The worker thread
+    exits as soon as it runs out of work and is restarted by the next
+    schedule call.
+    """
+    def __init__(self, game_state, max_candidates=3):
+        self.game_state = game_state
+        self.max_candidates = max_candidates
+        self.enabled = True
+        self.cache = {}  # (seed, x, y) -> pristine Location
+        self.wanted = set()
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.worker = None
+        self.hits = 0
+        self.misses = 0
+
+    def rank_candidates(self, position, heading):
+        """Order the neighbouring cells by how well they match the heading"""
+        x, y = position
+        hx, hy = DIRECTION_OFFSETS.get(heading, (0, 0))
+        neighbours = [(dx * hx + dy * hy, x + dx, y + dy)
+                      for dx, dy in DIRECTION_OFFSETS.values()]
+        # Straight ahead first, then the sides, then back the way we came
+        neighbours.sort(key=lambda cell: -cell[0])
+        return [(cx, cy) for _, cx, cy in neighbours]
+
+    def schedule(self, position, heading):
+        """Queue the most likely next cells for background generation"""
+        if not self.enabled:
+            return
+        seed = self.game_state.world_generator.seed
+        locations = self.game_state.locations
+        discovered = self.game_state.discovered_locations
+        candidates = [
+            (seed, cx, cy) for cx, cy in self.rank_candidates(position, heading)
+            if discovered.get(locations.id_at(cx, cy)) is None
+        ][:self.max_candidates]
+
+        with self.lock:
+            # Anything not on the new shortlist is no longer worth keeping
+            self.wanted = set(candidates)
+            self.cache = {key: loc for key, loc in self.cache.items() if key in self.wanted}
+            self.pending = deque(key for key in candidates if key not in self.cache)
+            if self.pending and self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+
+    def take(self, x, y):
+        """Return a prefetched location for (x, y), or None on a miss"""
+        key = (self.game_state.world_generator.seed, x, y)
+        with self.lock:
+            location = self.cache.pop(key, None)
+        if location is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return location
+
+    def wait(self, timeout=None):
+        """Block until the worker has finished its current queue"""
+        worker = self.worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _run(self):
+        world_generator = self.game_state.world_generator
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.worker = None
+                    return
+                key = self.pending.popleft()
+            seed, x, y = key
+            if seed != world_generator.seed:
+                continue
+            location = world_generator.generate_location_at(x, y, self.game_state)
+            with self.lock:
+                if key in self.wanted:
+                    self.cache[key] = location
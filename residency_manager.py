@@ -0,0 +1,95 @@
+import sys
+from collections import OrderedDict
+
+
+def _object_bytes(obj):
+    size = sys.getsizeof(obj)
+    # Slotted objects keep their attributes inline; reading __dict__ on one
+    # would create the extension dict just to measure it
+    if not hasattr(type(obj), '__slots__'):
+        size += sys.getsizeof(getattr(obj, '__dict__', {}))
+    return size
+
+
+def estimate_location_bytes(location):
+    """Roughly estimate the memory held by a location and its contents"""
+    total = _object_bytes(location)
+    total += sys.getsizeof(location.items) + sys.getsizeof(location.entities)
+    for obj in list(location.items) + list(location.entities):
+        total += _object_bytes(obj)
+    return total
+
+
+class ResidencyManager:
+    """Keeps the in-memory location set within a budget
+
+    Locations are tracked in least-recently-visited order. When the budget
+    (a location count, an estimated byte size, or both) is exceeded the
+    oldest locations are evicted: modified ones leave a compact delta behind
+    in the game state's delta store, unmodified ones are simply dropped and
+    regenerated from the world seed when next needed.
+    """
+    def __init__(self, max_locations=512, max_bytes=None):
+        self.max_locations = max_locations
+        self.max_bytes = max_bytes
+        self.resident = OrderedDict()  # location id -> estimated bytes, oldest first
+        self.resident_bytes = 0
+        self.evictions = 0
+        self.faults = 0
+
+    def touch(self, location):
+        """Mark a location as just visited, refreshing its size estimate"""
+        size = estimate_location_bytes(location)
+        self.resident_bytes += size - self.resident.pop(location.id, 0)
+        self.resident[location.id] = size
+
+    def forget(self, location_id):
+        """Stop tracking a location"""
+        self.resident_bytes -= self.resident.pop(location_id, 0)
+
+    def clear(self):
+        self.resident.clear()
+        self.resident_bytes = 0
+
+    def over_budget(self):
+        if self.max_locations is not None and len(self.resident) > self.max_locations:
+            return True
+        return self.max_bytes is not None and self.resident_bytes > self.max_bytes
+
+    def enforce(self, game_state):
+        """Evict least recently visited locations until back within budget"""
+        current = game_state.current_location
+        protected = set()
+        if current is not None:
+            protected.add(current.id)
+            if getattr(current, 'surface', None) is not None:
+                protected.add(current.surface.id)
+        for location_id in list(self.resident):
+            if not self.over_budget():
+                break
+            if location_id not in protected:
+                self.evict(game_state, location_id)
+
+    def evict(self, game_state, location_id):
+        """Drop a location from memory, keeping only its delta if it was modified"""
+        self.forget(location_id)
+        location = game_state.discovered_locations.pop(location_id, None)
+        if location is None:
+            return
+        self.evictions += 1
+        game_state.simulation.release(location)
+
+        if location.is_modified():
+            # Summoned allies and the like don't outlive the visit
+            location.changes.entities_added = []
+            for room in location.changes.rooms.values():
+                room.entities_added = []
+            game_state.location_deltas[location.coordinates] = location.changes
+
+        # Unlink neighbours so nothing keeps the evicted location alive
+        for direction, neighbour in location.connections.items():
+            if neighbour is not None:
+                for back_direction, target in neighbour.connections.items():
+                    if target is location:
+                        neighbour.connections[back_direction] = None
+            location.connections[direction] = None
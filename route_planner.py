@@ -0,0 +1,116 @@
+import heapq
+from world_generator import DIRECTION_OFFSETS, ORIGIN
+from location_table import DIRECTIONS, NO_LOCATION
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class RoutePlanner:
+    """Finds routes between discovered cells with A*
+
+    The graph is the location table: discovered cells, with an edge between
+    any two that sit side by side. Routes are cached per (start, goal) and
+    the whole cache is dropped whenever a new cell is discovered, since
+    that is the only way the graph can change.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.routes = {}  # (start, goal) -> list of directions
+        self.searches = 0
+
+    def invalidate(self):
+        """Forget cached routes after the discovered graph has changed"""
+        self.routes.clear()
+
+    def find_route(self, start, goal):
+        """Return the directions from start to goal, or None if unreachable"""
+        key = (start, goal)
+        if key in self.routes:
+            return self.routes[key]
+        route = self._search(start, goal)
+        self.routes[key] = route
+        if route:
+            # Every tail of a shortest route is itself a shortest route
+            x, y = start
+            for i, direction in enumerate(route[:-1]):
+                dx, dy = DIRECTION_OFFSETS[direction]
+                x, y = x + dx, y + dy
+                self.routes.setdefault(((x, y), goal), route[i + 1:])
+        return route
+
+    def _search(self, start, goal):
+        self.searches += 1
+        if start == goal:
+            return []
+        table = self.game_state.locations
+        start_id = table.id_at(*start)
+        goal_id = table.id_at(*goal)
+        if start_id is None or goal_id is None:
+            return None
+
+        # Search over ids, reading coordinates and neighbours from the table columns
+        xs, ys = table.xs, table.ys
+        gx, gy = xs[goal_id], ys[goal_id]
+        columns = [(direction, table.adjacency[direction]) for direction in DIRECTIONS]
+        came_from = {start_id: None}
+        cost = {start_id: 0}
+        frontier = [(manhattan(start, goal), 0, start_id)]
+        while frontier:
+            _, steps, cell = heapq.heappop(frontier)
+            if cell == goal_id:
+                break
+            if steps > cost[cell]:
+                continue  # Stale queue entry
+            for direction, column in columns:
+                neighbour = column[cell]
+                if neighbour == NO_LOCATION:
+                    continue
+                if steps + 1 < cost.get(neighbour, steps + 2):
+                    cost[neighbour] = steps + 1
+                    came_from[neighbour] = (cell, direction)
+                    estimate = abs(xs[neighbour] - gx) + abs(ys[neighbour] - gy)
+                    heapq.heappush(frontier, (steps + 1 + estimate, steps + 1, neighbour))
+        else:
+            return None
+
+        route = []
+        cell = goal_id
+        while came_from[cell] is not None:
+            cell, direction = came_from[cell]
+            route.append(direction)
+        route.reverse()
+        return route
+
+    def resolve_target(self, target):
+        """Turn 'x,y', 'x y' or a place name/type into discovered coordinates
+
+        Named targets pick the nearest discovered match to the player.
+        """
+        parts = target.replace(",", " ").split()
+        if len(parts) == 2:
+            try:
+                return int(parts[0]), int(parts[1])
+            except ValueError:
+                pass
+
+        game_state = self.game_state
+        target = target.lower()
+        biome_map = game_state.world_generator.biome_map
+        here = game_state.current_location.coordinates
+        matches = []
+        for coordinates, location_id in game_state.locations.index.items():
+            if coordinates == here:
+                continue
+            location = game_state.discovered_locations.get(location_id)
+            if location is not None:
+                names = (location.name.lower(), location.location_type)
+            else:
+                # Evicted locations still have a biome we can match on
+                names = ("meadow",) if coordinates == ORIGIN else (biome_map.biome_at(*coordinates),)
+            if any(target in name for name in names):
+                matches.append(coordinates)
+        if not matches:
+            return None
+        return min(matches, key=lambda coordinates: manhattan(here, coordinates))
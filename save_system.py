@@ -1,5 +1,7 @@
 import json
 import os
+from base_classes import LocationDelta
+from location_table import LocationTable
 
 class SaveSystem:
     def __init__(self):
@@ -31,11 +33,23 @@ class SaveSystem:
             "story": {
                 "quest_stages": game_state.story.quest_stages,
                 "discovered_chapters": list(game_state.story.discovered_chapters),  # Convert set to list
+                "flags": game_state.story.flags,
+                "fired_rules": sorted(game_state.story.fired),
                 "milestones": game_state.milestones
             },
+            "achievements": game_state.achievements.to_dict(),
             "world": {
                 "discovered_areas": list(game_state.discovered_areas),  # Convert set to list
-                "time": game_state.time.current_time
+                "time": game_state.time.current_time,
+                "seed": game_state.world_generator.seed,
+                "position": list(game_state.current_location.coordinates),
+                # Only player changes are stored; everything else regenerates from the seed
+                "location_deltas": {
+                    f"{x},{y}": delta.to_dict()
+                    for (x, y), delta in game_state.collect_location_deltas().items()
+                },
+                "locations": game_state.locations.to_dict(),
+                "npcs": game_state.npcs.to_dict()
             }
         }
         
@@ -52,16 +66,17 @@ class SaveSystem:
         
         # Restore inventory with proper type info
         game_state.player.inventory = []
-        for item_name, item_type in save_data["player"]["inventory"]:
-            item = game_state.item_generator.generate_item(item_type)
-            if item:
-                game_state.player.inventory.append(item)
-                
-        # Restore equipped items
-        for slot, item_name in save_data['player']['equipped'].items():
-            if item_name:
-                item = game_state.item_generator.generate_item_by_name(item_name)
-                game_state.player.equipped[slot] = item
+        with game_state.world_generator.lock:  # The prefetcher may be generating
+            for item_name, item_type in save_data["player"]["inventory"]:
+                item = game_state.item_generator.generate_item(item_type)
+                if item:
+                    game_state.player.inventory.append(item)
+                    
+            # Restore equipped items
+            for slot, item_name in save_data['player']['equipped'].items():
+                if item_name:
+                    item = game_state.item_generator.generate_item_by_name(item_name)
+                    game_state.player.equipped[slot] = item
                 
         # Restore player stats
         stats = save_data['player']['stats']
@@ -72,10 +87,24 @@ class SaveSystem:
         # Restore story state
         game_state.story.quest_stages = save_data['story']['quest_stages']
         game_state.story.discovered_chapters = set(save_data['story']['discovered_chapters'])
+        game_state.story.flags = save_data['story'].get('flags', {})
+        game_state.story.restore_fired(save_data['story'].get('fired_rules', []))
         game_state.milestones = save_data['story']['milestones']
+        game_state.achievements.restore(save_data.get('achievements', {}))
         
         # Restore world state
         game_state.discovered_areas = set(save_data['world']['discovered_areas'])
         game_state.time.current_time = save_data['world']['time']
         
+        # Older saves predate seeded worlds and keep the current one
+        world = save_data['world']
+        if "seed" in world:
+            deltas = {
+                tuple(int(c) for c in key.split(",")): LocationDelta.from_dict(data)
+                for key, data in world.get("location_deltas", {}).items()
+            }
+            locations = LocationTable.from_dict(world["locations"]) if "locations" in world else None
+            game_state.reset_world(world["seed"], deltas, tuple(world.get("position", (0, 0))), locations,
+                                   world.get("npcs"))
+        
         return game_state  # Return the updated game state 
\ No newline at end of file
@@ -1,3 +1,85 @@
+# Story progression as data. A rule waits for an action whose context has
+# every field in "when" set to the given value, while the story flags match
+# "flags"; its effects can set a milestone or flags, bring a quest up to a
+# stage (counting the stages before it as done), open a chapter or path, and
+# show a message. Rules fire once unless "once" is False.
+STORY_RULES = (
+    {"id": "find_the_pack", "action": "enter_location", "when": {"location_type": "forest"},
+     "effects": {"flags": {"found_pack": True}, "quest": "wolves", "stage": 1,
+                 "message": "Fresh wolf tracks crisscross the forest floor. The pack must be near."}},
+    {"id": "feed_the_wolves", "action": "feed", "when": {"target": "wolf", "befriended": True},
+     "effects": {"milestone": "wolves_befriended", "quest": "wolves", "stage": 2, "chapter": "wilderness",
+                 "message": "You've gained the wolves' trust!"}},
+    {"id": "earn_trust", "action": "feed", "when": {"target": "wolf", "befriended": True},
+     "flags": {"fed_once": True},
+     "effects": {"quest": "wolves", "stage": 3, "path": "wolf_friend",
+                 "message": "The pack accepts you as one of their own."}},
+    {"id": "remember_feeding", "action": "feed", "when": {"target": "wolf", "befriended": True},
+     "effects": {"flags": {"fed_once": True}}},
+    {"id": "first_cave", "action": "enter_location", "when": {"location_type": "cave"},
+     "effects": {"milestone": "cave_discovered", "quest": "crystals", "stage": 1, "chapter": "mysteries",
+                 "message": "You've discovered your first cave!"}},
+    {"id": "first_meal", "action": "cook",
+     "effects": {"quest": "survival", "stage": 2, "message": "A warm meal by the fire. You might just survive out here."}}
+)
+
+
+class StoryRules:
+    """Story rules indexed by the action and context value they wait for
+    
+    Each rule is filed under its action and the first of its "when"
+    fields with the value it wants, or under None if it wants nothing of
+    the context. An event only looks at the None bucket and the buckets
+    for its own context values, so the cost of an event follows the rules
+    that could fire rather than how many rules there are.
+    """
+    def __init__(self, rules=STORY_RULES):
+        self.index = {}  # action -> {(field, value) or None: [rules]}
+        self.by_id = {}
+        self.order = {}  # rule id -> position, so rules fire in the order they're defined
+        for rule in rules:
+            self.add(rule)
+            
+    @staticmethod
+    def _key(rule):
+        return next(iter(rule.get("when", {}).items()), None)
+        
+    def add(self, rule):
+        self.by_id[rule["id"]] = rule
+        self.order[rule["id"]] = len(self.order)
+        self.index.setdefault(rule["action"], {}).setdefault(self._key(rule), []).append(rule)
+        
+    def remove(self, rule):
+        buckets = self.index[rule["action"]]
+        key = self._key(rule)
+        buckets[key].remove(rule)
+        if not buckets[key]:
+            del buckets[key]
+        if not buckets:
+            del self.index[rule["action"]]
+        del self.by_id[rule["id"]]
+        
+    def candidates(self, action, context):
+        """The rules that could fire for an action, in the order they were added"""
+        buckets = self.index.get(action)
+        if not buckets:
+            return []
+        found = list(buckets.get(None, ()))
+        for item in context.items():
+            try:
+                found.extend(buckets.get(item, ()))
+            except TypeError:
+                continue  # Unhashable context values can't be rule keys
+        if len(found) > 1:
+            found.sort(key=lambda rule: self.order[rule["id"]])
+        return found
+        
+    @staticmethod
+    def matches(rule, context, flags):
+        return (all(context.get(field) == value for field, value in rule.get("when", {}).items())
+                and all(flags.get(flag, False) == value for flag, value in rule.get("flags", {}).items()))
+
+
 class StoryManager:
     def __init__(self):
         self.quest_stages = {
@@ -35,28 +117,51 @@ class StoryManager:
         
         self.flags = {}
         self.active_paths = set()
+        self.rules = StoryRules()
+        self.fired = set()  # Ids of the one-shot rules that have fired
         
     def check_progress(self, game_state, action, context):
-        """Check if an action triggers story progression"""
-        updates = []
+        """Check if an action triggers story progression
         
-        if action == "enter_location":
-            if context["location_type"] == "cave" and not game_state.milestones["cave_discovered"]:
-                game_state.milestones["cave_discovered"] = True
-                updates.append("You've discovered your first cave!")
-                self.quest_stages["crystals"] += 1
-                self.discovered_chapters.add("mysteries")
-                
-        elif action == "interact_entity":
-            if context["entity_type"] == "wolf" and context["interaction"] == "feed":
-                if not game_state.milestones["wolves_befriended"]:
-                    game_state.milestones["wolves_befriended"] = True
-                    updates.append("You've gained the wolves' trust!")
-                    self.quest_stages["wolves"] += 1
-                    self.discovered_chapters.add("wilderness")
+        Only the rules indexed under this action and the context's values
+        are looked at. One-shot rules are dropped once they fire.
+        """
+        updates = []
+        for rule in self.rules.candidates(action, context):
+            if not self.rules.matches(rule, context, self.flags):
+                continue
+            message = self._apply(game_state, rule.get("effects", {}))
+            if message:
+                updates.append(message)
+            if rule.get("once", True):
+                self.rules.remove(rule)
+                self.fired.add(rule["id"])
                     
         return "\n".join(updates) if updates else None 
         
+    def _apply(self, game_state, effects):
+        """Carry out a rule's effects; returns its message, if any"""
+        if "milestone" in effects:
+            game_state.milestones[effects["milestone"]] = True
+        self.flags.update(effects.get("flags", {}))
+        if "quest" in effects:
+            stage = self.quest_stages.get(effects["quest"], 0)
+            self.quest_stages[effects["quest"]] = max(stage, effects.get("stage", stage + 1))
+        if "chapter" in effects:
+            self.discovered_chapters.add(effects["chapter"])
+        if "path" in effects:
+            self.active_paths.add(effects["path"])
+        return effects.get("message")
+        
+    def restore_fired(self, rule_ids):
+        """Start over from the full rule set, less the one-shot rules a loaded game had fired"""
+        self.rules = StoryRules()
+        for rule_id in rule_ids:
+            rule = self.rules.by_id.get(rule_id)
+            if rule is not None:
+                self.rules.remove(rule)
+        self.fired = set(rule_ids)
+        
     def get_opening_text(self):
         """Return the game's opening text"""
         return """
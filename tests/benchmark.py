@@ -0,0 +1,158 @@
+import random
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generators import ItemGenerator, EntityGenerator
+from bestiary import Bestiary
+from entity_store import EntityStore
+from game_state import GameState
+from player import Player
+
+ITEM_CATEGORIES = ["weapon", "armor", "food", "quest_item"]
+ENTITY_TYPES = ["wolf", "bat", "troll"]
+
+
+def _bytes_per_object(make, count):
+    """Measure the memory held by count objects built with make(rng)"""
+    rng = random.Random(1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make(rng) for _ in range(count)]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding them isn't part of the objects themselves
+    return (held - sys.getsizeof(objects)) / count
+
+
+def _objects_per_second(make, count):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(count):
+        make(rng)
+    return count / (time.perf_counter() - start)
+
+
+def memory_benchmark(count=100000):
+    """Return bytes per generated item and per generated entity"""
+    items = ItemGenerator()
+    entities = EntityGenerator()
+    return {
+        "item": _bytes_per_object(
+            lambda rng: items.generate_item(rng.choice(ITEM_CATEGORIES), rng=rng), count),
+        "entity": _bytes_per_object(
+            lambda rng: entities.generate_entity(rng.choice(ENTITY_TYPES), rng=rng), count)
+    }
+
+
+def item_generation_benchmark(count=100000):
+    """Return generated items per second"""
+    items = ItemGenerator()
+    return _objects_per_second(
+        lambda rng: items.generate_item(rng.choice(ITEM_CATEGORIES), rng=rng), count)
+
+
+def batch_item_benchmark(count=100000):
+    """Return items per second from generate_items"""
+    items = ItemGenerator()
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for category in ITEM_CATEGORIES:
+        items.generate_items(category, count // len(ITEM_CATEGORIES), rng=rng)
+    return count // len(ITEM_CATEGORIES) * len(ITEM_CATEGORIES) / (time.perf_counter() - start)
+
+
+def entity_spawn_benchmark(count=100000):
+    """Return generated entities (spawns) per second"""
+    entities = EntityGenerator()
+    return _objects_per_second(
+        lambda rng: entities.generate_entity(rng.choice(ENTITY_TYPES), rng=rng), count)
+
+def batch_spawn_benchmark(count=100000, batch_size=1000):
+    """Return entities per second from generate_entities, as columns and as Entity objects"""
+    entities = EntityGenerator()
+    rng = random.Random(1)
+    batches = count // batch_size
+    start = time.perf_counter()
+    generated = [entities.generate_entities(ENTITY_TYPES[i % 3], batch_size, rng=rng) for i in range(batches)]
+    columns = time.perf_counter() - start
+    for batch in generated:
+        batch.entities()
+    materialized = time.perf_counter() - start
+    return {"columns": batches * batch_size / columns, "entities": batches * batch_size / materialized}
+
+def loot_draw_benchmark(count=100000):
+    """Return dead body loot draws per second, one at a time and as a batch"""
+    loot = Bestiary().get_loot_table("dead body")
+    rng = random.Random(1)
+    single = _objects_per_second(lambda rng: loot.drops(rng), count)
+    start = time.perf_counter()
+    loot.drops_many(count, rng)
+    return {"single": single, "batch": count / (time.perf_counter() - start)}
+
+def simulation_benchmark(count=100000, passes=10):
+    """Return creature updates per second for regen and wandering, per object vs column store
+
+    Both sides start with one creature in ten wounded and use the same
+    per-creature speeds.
+    """
+    rng = random.Random(1)
+    batch = EntityGenerator().generate_entities("wolf", count, rng=rng)
+    store = EntityStore()
+    store.add_batch(batch, [(0, 0)] * count)
+    entities = batch.entities()
+    for row, entity in enumerate(entities):
+        entity.max_health, entity.regen, entity.speed = entity.health, store.regen[row], store.speed[row]
+        entity.x = entity.y = 0
+        if row % 10 == 0:
+            entity.health //= 2
+            store.set_health(row, entity.health)
+            
+    start = time.perf_counter()
+    for _ in range(passes):
+        for entity in entities:
+            if entity.health < entity.max_health:
+                entity.health = min(entity.max_health, entity.health + entity.regen)
+            if rng.random() < entity.speed:
+                dx, dy = rng.choice(((0, 1), (0, -1), (1, 0), (-1, 0)))
+                entity.x += dx
+                entity.y += dy
+    objects = count * passes / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for _ in range(passes):
+        store.regenerate()
+        store.wander(rng)
+    return {"objects": objects, "store": count * passes / (time.perf_counter() - start)}
+
+def npc_turn_benchmark(turns=1000):
+    """Return milliseconds per turn spent walking the NPC population"""
+    game_state = GameState(Player())
+    npcs = game_state.npcs
+    npcs.ensure()
+    start = time.perf_counter()
+    for _ in range(turns):
+        game_state.time.advance_time(game_state.time.minutes_per_action)
+        npcs.tick()
+    return (time.perf_counter() - start) * 1000 / turns, len(npcs)
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"Generating {count} items and {count} entities...")
+    for kind, size in memory_benchmark(count).items():
+        print(f"- {size:.0f} bytes per {kind}")
+    print(f"- {item_generation_benchmark(count):.0f} items generated per second")
+    print(f"- {batch_item_benchmark(count):.0f} items generated per second in batches")
+    print(f"- {entity_spawn_benchmark(count):.0f} entity spawns per second")
+    for kind, rate in batch_spawn_benchmark(count).items():
+        print(f"- {rate:.0f} batch spawns per second as {kind}")
+    for kind, rate in simulation_benchmark(count).items():
+        print(f"- {rate:.0f} creature updates per second ({kind})")
+    for kind, rate in loot_draw_benchmark(count).items():
+        print(f"- {rate:.0f} loot draws per second ({kind})")
+    milliseconds, population = npc_turn_benchmark()
+    print(f"- {milliseconds:.2f} ms per turn moving {population} NPCs")
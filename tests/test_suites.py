@@ -11,7 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from game_state import GameState
 from player import Player
 from command_parser import CommandParser
-from items import Item
+from items import Item, ItemTemplate
 from entities import Entity
 from location import Location
 from generators import ItemGenerator
@@ -19,9 +19,10 @@ from commands import (LookCommand, InventoryCommand, TakeCommand,
                      MoveCommand, SearchCommand, AttackCommand)
 from display import Display
 from generators import LocationGenerator, RewardGenerator
-from generators import EntityGenerator, NoteGenerator
+from generators import EntityGenerator, NoteGenerator, CaveSystemGenerator
 from models.achievement import AchievementSystem
 from models.leveling import LevelingSystem
+from location_table import LocationTable, NO_LOCATION
 
 
 class TestInventorySystem(unittest.TestCase):
@@ -157,6 +158,1465 @@ class TestWorldGeneration(unittest.TestCase):
                           "east": "west", "west": "east"}
                 self.assertEqual(connected.move_direction(reverse[direction]), location)
 
+class TestSeededWorld(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.world_generator.seed = 1234
+        
+    def _find_location_with_items(self):
+        for x in range(1, 50):
+            location = self.game_state.get_location_at(x, 0)
+            if location.items:
+                return location
+        self.fail("No location with items found")
+        
+    def test_same_seed_same_content(self):
+        """Test cells regenerate identically from the world seed"""
+        for x, y in [(1, 0), (-3, 7), (25, -40)]:
+            first = self.game_state.get_location_at(x, y)
+            second = self.game_state.world_generator.generate_location_at(x, y, self.game_state)
+            self.assertEqual(first.location_type, second.location_type)
+            self.assertEqual(first.description, second.description)
+            self.assertEqual([i.name for i in first.items], [i.name for i in second.items])
+            self.assertEqual([e.name for e in first.entities], [e.name for e in second.entities])
+            
+    def test_unmodified_locations_not_saved(self):
+        """Test only player changes end up in the save"""
+        self.game_state.move("east")
+        self.game_state.move("east")
+        self.assertEqual(self.game_state.collect_location_deltas(), {})
+        
+    def test_delta_survives_save_load(self):
+        """Test taken items stay taken after a reload"""
+        location = self._find_location_with_items()
+        item = location.items[0]
+        location.remove_item(item)
+        self.game_state.set_current_location(location)
+        
+        self.game_state.save_system.save_game(self.game_state, "test_seeded.json")
+        new_state = GameState(Player())
+        new_state.save_system.load_game(new_state, "test_seeded.json")
+        os.remove(os.path.join(new_state.save_system.save_dir, "test_seeded.json"))
+        
+        self.assertEqual(new_state.world_generator.seed, 1234)
+        self.assertEqual(new_state.current_location.coordinates, location.coordinates)
+        self.assertEqual(len(new_state.current_location.items), len(location.items))
+
+class TestLocationResidency(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.residency.max_locations = 3
+        
+    def test_budget_evicts_least_recent(self):
+        """Test distant locations are evicted and faulted back in"""
+        start = self.game_state.current_location
+        note = start.items[0]
+        start.remove_item(note)
+        
+        for _ in range(5):
+            self.game_state.move("east")
+        self.assertLessEqual(len(self.game_state.discovered_locations), 3)
+        self.assertNotIn(start.id, self.game_state.discovered_locations)
+        self.assertIn((0, 0), self.game_state.location_deltas)
+        
+        # Faulting back in keeps the id and the player's changes
+        restored = self.game_state.get_location(start.id)
+        self.assertEqual(restored.id, start.id)
+        self.assertNotIn("mysterious note", [item.name for item in restored.items])
+        self.assertEqual(self.game_state.residency.faults, 1)
+        
+    def test_unmodified_locations_dropped(self):
+        """Test unmodified locations leave nothing behind when evicted"""
+        for _ in range(5):
+            self.game_state.move("north")
+        self.assertGreater(self.game_state.residency.evictions, 0)
+        self.assertEqual(self.game_state.location_deltas, {})
+        
+    def test_byte_budget(self):
+        """Test eviction by estimated size"""
+        self.game_state.residency.max_locations = None
+        self.game_state.residency.max_bytes = 1
+        for _ in range(3):
+            self.game_state.move("south")
+        self.assertEqual(list(self.game_state.discovered_locations),
+                         [self.game_state.current_location.id])
+
+class TestLocationPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        
+    def test_candidates_follow_heading(self):
+        """Test the cell straight ahead is ranked first"""
+        ranked = self.game_state.prefetcher.rank_candidates((0, 0), "east")
+        self.assertEqual(ranked[0], (1, 0))
+        self.assertEqual(ranked[-1], (-1, 0))
+        
+    def test_prefetch_hit_matches_sync_generation(self):
+        """Test prefetched cells are used and identical to on-demand ones"""
+        prefetcher = self.game_state.prefetcher
+        self.game_state.move("east")
+        prefetcher.wait()
+        
+        location = self.game_state.move("east")
+        self.assertEqual(prefetcher.hits, 1)
+        expected = self.game_state.world_generator.generate_location_at(2, 0, self.game_state)
+        self.assertEqual(location.description, expected.description)
+        self.assertEqual([i.name for i in location.items], [i.name for i in expected.items])
+        self.assertEqual([e.name for e in location.entities], [e.name for e in expected.entities])
+        
+    def test_disabled_prefetch_misses(self):
+        """Test generation falls back to the main thread"""
+        prefetcher = self.game_state.prefetcher
+        prefetcher.enabled = False
+        initial_misses = prefetcher.misses
+        self.game_state.move("north")
+        self.game_state.move("north")
+        self.assertEqual(prefetcher.hits, 0)
+        self.assertEqual(prefetcher.misses, initial_misses + 2)
+        
+    def test_prefetch_waits_for_generation_lock(self):
+        """Test the worker doesn't generate while the main thread holds the generator"""
+        prefetcher = self.game_state.prefetcher
+        world = self.game_state.world_generator
+        with world.lock:
+            prefetcher.schedule((0, 0), "east")
+            prefetcher.wait(0.2)
+            self.assertEqual(prefetcher.cache, {})
+        prefetcher.wait()
+        self.assertIn((world.seed, 1, 0), prefetcher.cache)
+        
+    def test_main_thread_generation_takes_the_lock(self):
+        """Test loot drops wait while another thread holds the generator"""
+        import threading
+        world = self.game_state.world_generator
+        wolf = self.game_state.entity_generator.generate_entity("wolf")
+        held, release = threading.Event(), threading.Event()
+        
+        def hold():
+            with world.lock:
+                held.set()
+                release.wait()
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+        dropper = threading.Thread(target=wolf._drop_loot, args=(self.game_state,))
+        dropper.start()
+        dropper.join(0.2)
+        self.assertTrue(dropper.is_alive())
+        release.set()
+        dropper.join()
+        holder.join()
+
+class TestBiomeMap(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.world = self.game_state.world_generator
+        self.world.seed = 99
+        
+    def test_location_type_follows_biome(self):
+        """Test generated cells take their type from the biome map"""
+        for x, y in [(5, 3), (-20, 11), (40, -7)]:
+            location = self.game_state.get_location_at(x, y)
+            self.assertEqual(location.location_type, self.world.biome_map.biome_at(x, y))
+            
+    def test_biomes_are_coherent(self):
+        """Test neighbouring cells usually share a biome"""
+        same = total = 0
+        for x in range(-32, 32):
+            for y in range(-8, 8):
+                total += 1
+                same += self.world.biome_map.biome_at(x, y) == self.world.biome_map.biome_at(x + 1, y)
+        self.assertGreater(same / total, 0.7)
+        
+    def test_chunks_cached_and_reset_with_seed(self):
+        """Test chunks are built once per seed"""
+        tiles = self.world.biome_map.chunk(0, 0)
+        self.assertIs(self.world.biome_map.chunk(0, 0), tiles)
+        self.world.seed = 100
+        self.assertEqual(self.world.biome_map.chunks, {})
+
+class TestCaveSystem(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.reset_world(7, {}, (0, 0))
+        biome_map = self.game_state.world_generator.biome_map
+        cell = next((x, y) for x in range(-32, 32) for y in range(-32, 32)
+                    if biome_map.biome_at(x, y) == "cave")
+        self.game_state.reset_world(7, {}, cell)
+        self.surface = self.game_state.current_location
+        
+    def test_carving_is_deterministic(self):
+        """Test the same seed carves the same grid"""
+        import random
+        generator = CaveSystemGenerator()
+        self.assertEqual(generator.carve(random.Random(5)), generator.carve(random.Random(5)))
+        
+    def test_rooms_form_connected_tree(self):
+        """Test every room can be reached from the entrance"""
+        rooms = self.game_state.world_generator.generate_cave_system(self.surface, self.game_state)
+        self.assertGreater(len(rooms), 1)
+        seen, stack = {id(rooms[0])}, [rooms[0]]
+        while stack:
+            for neighbour in stack.pop().connections.values():
+                if neighbour in rooms and id(neighbour) not in seen:
+                    seen.add(id(neighbour))
+                    stack.append(neighbour)
+        self.assertEqual(len(seen), len(rooms))
+        
+    def test_climb_down_and_up(self):
+        """Test moving down into the caves and back up"""
+        room = self.game_state.move("down")
+        self.assertIs(room.surface, self.surface)
+        self.assertIs(self.game_state.current_location, room)
+        self.assertIsNone(self.game_state.move("down"))
+        self.assertIs(self.game_state.move("up"), self.surface)
+        
+    def test_room_changes_survive_regeneration(self):
+        """Test items taken underground stay taken after the cave is rebuilt"""
+        world = self.game_state.world_generator
+        rooms = world.generate_cave_system(self.surface, self.game_state)
+        room = next((room for room in rooms if room.items), None)
+        if room is None:
+            self.skipTest("No items in this cave system")
+        taken = room.items[0]
+        room.remove_item(taken)
+        rebuilt = world.generate_cave_system(self.surface, self.game_state)
+        self.assertNotIn(taken.name, [item.name for item in rebuilt[room.room_index].items])
+        
+    def test_large_grid_carves_quickly(self):
+        """Test a 256x256 grid carves and splits into rooms in well under a second"""
+        import random
+        import time
+        generator = CaveSystemGenerator()
+        start = time.perf_counter()
+        grid, stride = generator.carve(random.Random(1), 256, 256)
+        rooms = generator.find_rooms(grid, stride, 256)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertTrue(rooms)
+
+class TestTravel(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.reset_world(3, {}, (0, 0))
+        for direction in ["east"] * 3 + ["north"] * 2:
+            self.game_state.move(direction)
+        for location in self.game_state.discovered_locations.values():
+            location.entities = []
+            
+    def test_route_is_shortest_over_discovered_cells(self):
+        """Test A* only walks through cells the player has seen"""
+        route = self.game_state.route_planner.find_route((3, 2), (0, 0))
+        self.assertEqual(route, ["south", "south", "west", "west", "west"])
+        self.assertIsNone(self.game_state.route_planner.find_route((3, 2), (9, 9)))
+        
+    def test_routes_cached_until_graph_changes(self):
+        """Test repeated lookups reuse the cached route"""
+        planner = self.game_state.route_planner
+        planner.find_route((3, 2), (0, 0))
+        searches = planner.searches
+        planner.find_route((3, 2), (0, 0))
+        planner.find_route((3, 1), (0, 0))  # Tail of the first route
+        self.assertEqual(planner.searches, searches)
+        self.game_state.move("east")
+        self.assertEqual(planner.routes, {})
+        
+    def test_travel_advances_time_once(self):
+        """Test a whole trip passes time for every step in one call"""
+        start = self.game_state.time.current_time
+        route = self.game_state.route_planner.find_route((3, 2), (0, 0))
+        steps = self.game_state.travel(route)
+        self.assertEqual(steps, 5)
+        self.assertEqual(self.game_state.current_location.coordinates, (0, 0))
+        self.assertEqual(self.game_state.time.current_time - start,
+                         5 * self.game_state.time.minutes_per_action)
+        
+    def test_travel_stops_at_hostile(self):
+        """Test a hostile creature on the way interrupts the trip"""
+        wolf = Entity("wolf", "A snarling wolf")
+        wolf.hostile = True
+        self.game_state.get_location_at(3, 0).entities.append(wolf)
+        route = self.game_state.route_planner.find_route((3, 2), (0, 0))
+        self.assertEqual(self.game_state.travel(route), 2)
+        self.assertEqual(self.game_state.current_location.coordinates, (3, 0))
+
+class TestMapRenderer(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.reset_world(3, {}, (0, 0))
+        self.renderer = self.game_state.map_renderer
+        
+    def test_viewport_size_and_player_marker(self):
+        """Test the map is 60x20 tiles with the player in it"""
+        lines = self.renderer.render((0, 0))
+        self.assertEqual(len(lines), 20)
+        import re
+        for line in lines:
+            self.assertEqual(len(re.sub(r"\033\[[0-9;]*m", "", line)), 60)
+        self.assertEqual(sum("@" in line for line in lines), 1)
+        
+    def test_chunks_reused_between_renders(self):
+        """Test drawing again rebuilds nothing when the world hasn't changed"""
+        self.renderer.render((0, 0))
+        rebuilds = self.renderer.rebuilds
+        self.renderer.render((0, 0))
+        self.renderer.render((1, 0))
+        self.assertEqual(self.renderer.rebuilds, rebuilds)
+        
+    def test_discovery_rebuilds_only_its_chunk(self):
+        """Test moving somewhere new dirties just the chunk it lies in"""
+        self.renderer.render((0, 0))
+        rebuilds = self.renderer.rebuilds
+        self.game_state.move("east")
+        self.renderer.render((0, 0))
+        self.assertEqual(self.renderer.rebuilds, rebuilds + 1)
+        self.assertNotEqual(self.renderer.chunk_rows(0, 0)[0][1], " ")
+
+class TestLocationTable(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.game_state.reset_world(3, {}, (0, 0))
+        
+    def test_ids_allocated_in_discovery_order(self):
+        """Test locations get small sequential ids as they are discovered"""
+        start = self.game_state.current_location
+        east = self.game_state.move("east")
+        north = self.game_state.move("north")
+        self.assertEqual([start.id, east.id, north.id], [1, 2, 3])
+        self.game_state.move("south")
+        self.assertEqual(self.game_state.current_location.id, east.id)
+        
+    def test_adjacency_columns_link_neighbours(self):
+        """Test newly discovered cells are linked to known neighbours both ways"""
+        table = self.game_state.locations
+        for direction in ["east", "north", "west"]:
+            self.game_state.move(direction)
+        self.assertEqual(table.neighbour(1, "north"), 4)
+        self.assertEqual(table.neighbour(4, "south"), 1)
+        self.assertEqual(table.neighbour(1, "west"), NO_LOCATION)
+        self.assertEqual(table.coordinates_of(4), (0, 1))
+        
+    def test_table_round_trips_through_dict(self):
+        """Test the table saves and loads as plain integer lists"""
+        for direction in ["east", "east", "north"]:
+            self.game_state.move(direction)
+        data = json.loads(json.dumps(self.game_state.locations.to_dict()))
+        restored = LocationTable.from_dict(data)
+        self.assertEqual(restored.to_dict(), data)
+        self.assertEqual(restored.id_at(2, 1), 4)
+
+class TestCompactModels(unittest.TestCase):
+    def test_core_classes_are_slotted(self):
+        """Test the model classes declare slots with an extension slot"""
+        from base_classes import Location as BaseLocation
+        for cls in (Item, Entity, BaseLocation, Player):
+            self.assertIn("__dict__", cls.__slots__)
+            
+    def test_extra_attributes_still_work(self):
+        """Test attributes outside the slots go to the extension slot"""
+        item = Item("gem", "A shiny gem", "misc", value=25)
+        self.assertEqual(item.value, 25)
+        self.assertEqual(item.__dict__, {"value": 25})
+        restored = Item.from_dict(item.to_dict())
+        self.assertEqual((restored.name, restored.value, restored.type), ("gem", 25, "misc"))
+        
+    def test_names_are_interned(self):
+        """Test generated names share a single string object"""
+        first = Item("".join(["iron", " sword"]), "A sword", "weapon")
+        second = Item("".join(["iron", " sword"]), "A sword", "weapon")
+        self.assertIs(first.name, second.name)
+        
+    def test_entities_share_default_containers(self):
+        """Test plain entities don't allocate their own empty lists"""
+        first, second = Entity("wolf", "A wolf"), Entity("wolf", "A wolf")
+        self.assertIs(first.special_attacks, second.special_attacks)
+        self.assertIs(first.inventory, second.inventory)
+
+class TestItemTemplates(unittest.TestCase):
+    def setUp(self):
+        self.generator = ItemGenerator()
+        
+    def test_generated_items_share_templates(self):
+        """Test items of the same kind point at one template"""
+        import random
+        first = self.generator.generate_item("weapon", rng=random.Random(4))
+        second = self.generator.generate_item("weapon", rng=random.Random(4))
+        self.assertIsNot(first, second)
+        self.assertIs(first.template, second.template)
+        self.assertEqual(first.name, first.template.name)
+        
+    def test_templates_are_immutable(self):
+        """Test a shared template can't be changed through one item"""
+        template = ItemTemplate.get("iron key", "An iron key", "quest_item")
+        with self.assertRaises(AttributeError):
+            template.name = "gold key"
+        item = Item.from_template(template)
+        item.name = "gold key"
+        self.assertEqual(template.name, "iron key")
+        self.assertEqual(item.name, "gold key")
+        
+    def test_rolled_stats_stay_per_item(self):
+        """Test per-item bonuses don't leak between items of one template"""
+        template = ItemTemplate.get("bone club", "A bone club", "weapon")
+        weak, strong = Item.from_template(template, damage_bonus=1), Item.from_template(template, damage_bonus=9)
+        self.assertEqual((weak.damage_bonus, strong.damage_bonus), (1, 9))
+        
+    def test_one_off_templates_are_freed(self):
+        """Test a template made for a single item goes away with the item"""
+        import gc
+        from crafting import RecipeBook
+        from trading import PriceTable
+        meal = Item("prepared meal", "A tasty meal made from apple and pear", "food", food_value=30)
+        key = ("prepared meal", meal.description, "food", "common", None)
+        RecipeBook().key_of(meal.template)
+        PriceTable().value(meal)
+        self.assertIs(ItemTemplate._cache.get(key), meal.template)
+        del meal
+        gc.collect()
+        self.assertIsNone(ItemTemplate._cache.get(key))
+
+class TestCreatureTemplates(unittest.TestCase):
+    def setUp(self):
+        self.generator = EntityGenerator()
+        
+    def test_template_compiled_once(self):
+        """Test a creature type is compiled on first use and then shared"""
+        template = self.generator.get_template("wolf")
+        self.assertIs(self.generator.get_template("wolf"), template)
+        self.assertEqual(template.trait_rarity["alpha"], "uncommon")
+        self.assertIs(template.loot_table, self.generator.bestiary["wolf"]["loot_table"])
+        with self.assertRaises(AttributeError):
+            template.rare_multiplier = 10
+        with self.assertRaises(ValueError):
+            self.generator.get_template("dragon")
+            
+    def test_compiled_trait_vector(self):
+        """Test trait modifiers compile into a multiplier vector plus extras"""
+        from models.traits import VECTOR_STATS
+        compiled = self.generator.trait_system.compile("hungry")
+        multipliers = dict(zip(VECTOR_STATS, compiled.multipliers))
+        self.assertEqual((multipliers["damage"], multipliers["defense"], multipliers["health"]), (1.3, 0.7, 1.0))
+        self.assertEqual(compiled.other_modifiers, (("aggression", 2.0),))
+        self.assertIsNone(self.generator.trait_system.compile("curious"))
+        
+    def test_spawned_stats_match_apply_trait(self):
+        """Test spawning gives the same stats as applying the trait afterwards"""
+        import random
+        for seed in range(200):
+            entity = self.generator.generate_entity("wolf", level=3, rng=random.Random(seed))
+            template = self.generator.get_template("wolf")
+            multiplier = template.rare_multiplier if entity.is_rare else 1.0
+            health, damage, defense = (int(base * multiplier * 1.3) for base in template.base_stats)
+            expected = Entity.spawn(entity.name, "", health, damage, defense)
+            self.generator.trait_system.apply_trait(expected, entity.trait)
+            for stat in ("health", "damage", "defense", "dodge_chance", "crit_chance", "abilities"):
+                self.assertEqual(getattr(entity, stat), getattr(expected, stat))
+            self.assertEqual(getattr(entity, "aggression", None), getattr(expected, "aggression", None))
+
+class TestEntityBatch(unittest.TestCase):
+    def setUp(self):
+        self.generator = EntityGenerator()
+        
+    def test_batch_columns(self):
+        """Test a batch holds one row per creature in typed columns"""
+        import random
+        batch = self.generator.generate_entities("bat", 500, level=2, rng=random.Random(3))
+        self.assertEqual(len(batch), 500)
+        self.assertEqual(len(batch.health), 500)
+        self.assertEqual(batch.health.typecode, "d")
+        template = self.generator.get_template("bat")
+        for name, trait, rare in zip(batch.names, batch.traits, batch.is_rare):
+            self.assertIn(name, template.rare_variants if rare else template.variants)
+            self.assertIn(trait, template.trait_rarity)
+            
+    def test_batch_is_reproducible(self):
+        """Test a seeded batch comes out the same every time"""
+        import random
+        first = self.generator.generate_entities("troll", 200, rng=random.Random(8))
+        second = self.generator.generate_entities("troll", 200, rng=random.Random(8))
+        self.assertEqual(first.names, second.names)
+        self.assertEqual(first.traits, second.traits)
+        self.assertEqual(first.damage, second.damage)
+        
+    def test_materialized_entities(self):
+        """Test rows materialize into Entities matching their columns"""
+        import random
+        batch = self.generator.generate_entities("wolf", 300, force_rare=True, rng=random.Random(5))
+        batch.health[0] = 1
+        entities = batch.entities()
+        self.assertEqual(entities[0].health, 1)
+        for index, entity in enumerate(entities):
+            self.assertIsInstance(entity, Entity)
+            self.assertTrue(entity.is_rare)
+            self.assertEqual(entity.name, batch.names[index])
+            self.assertEqual(entity.damage, batch.damage[index])
+            self.assertEqual(entity.loot_table, self.generator.bestiary["wolf"]["rare_loot_table"])
+        self.assertEqual(batch.entity(7).trait, entities[7].trait)
+
+class TestBatchItemGeneration(unittest.TestCase):
+    def setUp(self):
+        self.generator = ItemGenerator()
+        
+    def test_batch_uses_shared_templates(self):
+        """Test a batch of items is built from the generator's templates"""
+        import random
+        items = self.generator.generate_items("weapon", 400, quality=1, rng=random.Random(2))
+        self.assertEqual(len(items), 400)
+        templates = set(self.generator.templates.values())
+        for item in items:
+            self.assertIn(item.template, templates)
+            self.assertEqual(item.type, "weapon")
+        self.assertLess(len({id(item.template) for item in items}), len(items))
+        
+    def test_batch_matches_single_item_stats(self):
+        """Test batch items get the same stats a single generated item would"""
+        import random
+        for item in self.generator.generate_items("armor", 100, quality=2, rng=random.Random(6)):
+            single = self.generator._generate_combat_item(
+                "armor", item.template, self.generator.item_types["armor"][item.name.split()[-1]], 2)
+            self.assertEqual(item.defense_bonus, single.defense_bonus)
+            
+    def test_batch_edge_cases(self):
+        """Test unknown categories and empty batches"""
+        self.assertEqual(self.generator.generate_items("potion", 5), [])
+        self.assertEqual(self.generator.generate_items("quest_item", 0), [])
+        
+    def test_food_batch(self):
+        """Test food batches share templates and raw meat is worth half until cooked"""
+        import random
+        items = self.generator.generate_items("food", 200, quality=1, rng=random.Random(4))
+        self.assertEqual({item.type for item in items}, {"food"})
+        self.assertLessEqual(len({id(item.template) for item in items}), len(self.generator.templates))
+        for item in items:
+            self.assertEqual(item.food_value, self.generator._food_value(item.name.split()[-1], 1))
+        self.assertGreater(self.generator.generate_item("food", rng=random.Random(0)).food_value, 0)
+        meat = next(item for item in items if item.name == "raw meat")
+        self.assertEqual(meat.food_value, (25 + 2) * 0.5)
+
+class TestLootTables(unittest.TestCase):
+    def setUp(self):
+        from bestiary import Bestiary
+        self.bestiary = Bestiary()
+        
+    def test_compiled_once_per_type(self):
+        """Test loot tables compile on first use and hand back shared templates"""
+        from items import ItemTemplate
+        wolf = self.bestiary.get_loot_table("wolf")
+        self.assertIs(self.bestiary.get_loot_table("wolf"), wolf)
+        self.assertIsNone(self.bestiary.get_loot_table("dragon"))
+        for template in wolf.pick_many(50):
+            self.assertIsInstance(template, ItemTemplate)
+            self.assertIn(template, wolf.templates)
+            
+    def test_pick_one_follows_weights(self):
+        """Test pick-one draws are proportional to the listed chances"""
+        import random
+        from collections import Counter
+        loot = self.bestiary.get_loot_table("dead body")
+        counts = Counter(template.name for template in loot.pick_many(60000, random.Random(1)))
+        total = sum(loot.chances)
+        for template, chance in zip(loot.templates, loot.chances):
+            self.assertAlmostEqual(counts[template.name] / 60000, chance / total, delta=0.01)
+            
+    def test_independent_drops(self):
+        """Test each entry drops on its own chance, with and without the joint table"""
+        import random
+        import loot_table
+        from loot_table import LootTable
+        entries = [(chr(ord("a") + i), 0.08 * (i + 1)) for i in range(loot_table.MAX_JOINT_ENTRIES + 1)]
+        for table in (LootTable(entries[:4]), LootTable(entries)):
+            draws = table.drops_many(40000, random.Random(2))
+            for name, chance in zip(table.templates, table.chances):
+                rate = sum(name in drop for drop in draws) / 40000
+                self.assertAlmostEqual(rate, chance, delta=0.015)
+        self.assertEqual(self.bestiary.get_loot_table("bat").drops(), tuple(self.bestiary.get_loot_table("bat").templates))
+        
+    def test_dead_body_shares_templates(self):
+        """Test dead bodies carry items built on the shared loot templates"""
+        from entities import DEAD_BODY_LOOT
+        bodies = [Entity("dead body", "A lifeless body lies in the grass") for _ in range(30)]
+        carried = [item for body in bodies for item in body.inventory]
+        self.assertTrue(carried)
+        for item in carried:
+            self.assertIn(item.template, DEAD_BODY_LOOT)
+        self.assertEqual(set(DEAD_BODY_LOOT), set(self.bestiary.get_loot_table("dead body").templates))
+        
+    def test_generated_variants_drop_their_kinds_loot(self):
+        """Test killing a generated variant draws from its kind's table and its own loot keys"""
+        game_state = GameState(Player())
+        location = game_state.current_location
+        dropped = set()
+        for _ in range(40):
+            wolf = game_state.entity_generator.generate_entity("wolf", force_rare=False)
+            self.assertNotEqual(wolf.name, "wolf")
+            location.add_entity(wolf)
+            wolf.health = 1
+            wolf.dodge_chance = 0
+            wolf.combat_round(10, game_state)
+            dropped.update(item.name for item in location.items)
+        self.assertTrue({"wolf pelt", "wolf fang", "raw meat"} <= dropped)
+        meat = next(item for item in location.items if item.name == "raw meat")
+        self.assertEqual(meat.type, Item.FOOD)
+        self.assertGreater(meat.food_value, 0)
+        
+    def test_loot_multiplier_scales_chances(self):
+        """Test a creature's loot multiplier scales every chance, capped at certain"""
+        wolf = self.bestiary.get_loot_table("wolf")
+        boosted = self.bestiary.get_loot_table("wolf", ("wolf_pelt", "ancient_rune"), 2.0)
+        self.assertIs(self.bestiary.get_loot_table("wolf", ("wolf_pelt", "ancient_rune"), 2.0), boosted)
+        self.assertEqual(boosted.chances[:2], tuple(min(1.0, chance * 2.0) for chance in wolf.chances))
+        self.assertEqual([template.name for template in boosted.templates][2:], ["ancient rune"])
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        from entity_store import EntityStore
+        self.store = EntityStore()
+        
+    def test_views_read_and_write_columns(self):
+        """Test a view is an Entity backed by its row's columns"""
+        row = self.store.add("wolf", "A grey wolf", 30, 8, 2, position=(3, 4), hostile=True)
+        view = self.store.view(row)
+        self.assertIsInstance(view, Entity)
+        self.assertIs(self.store.view(row), view)
+        self.assertEqual((view.name, view.health, view.damage, view.hostile), ("wolf", 30, 8, True))
+        view.damage = 12
+        self.assertEqual(self.store.damage[row], 12)
+        self.assertEqual(self.store.rows_at(3, 4), [row])
+        
+    def test_free_list_reuses_rows(self):
+        """Test removed rows are recycled and their views let go"""
+        first = self.store.add("bat", "A bat", 10, 2, 1)
+        second = self.store.add("bat", "A bat", 10, 2, 1)
+        view = self.store.view(first)
+        self.store.remove(first)
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(view.row)
+        self.assertEqual(self.store.add("troll", "A troll", 90, 15, 8), first)
+        self.assertEqual(self.store.rows(), [first, second])
+        
+    def test_regenerate_and_reap(self):
+        """Test regeneration only heals the wounded, up to max, and reap frees the dead"""
+        hurt = self.store.add("wolf", "A wolf", 40, 8, 2)
+        dying = self.store.add("wolf", "A wolf", 40, 8, 2)
+        self.store.view(hurt).health = 30
+        self.store.set_health(dying, 0)
+        self.store.regenerate(minutes=10)
+        self.assertEqual(self.store.view(hurt).health, 34)
+        self.store.regenerate(minutes=100)
+        self.assertEqual(self.store.view(hurt).health, 40)
+        self.assertNotIn(hurt, self.store.wounded)
+        self.assertEqual(self.store.health[dying], 0)
+        self.assertEqual(self.store.reap(), 1)
+        self.assertEqual(self.store.rows(), [hurt])
+        
+    def test_wander_moves_live_rows_one_step(self):
+        """Test each movement pass moves live creatures at most one cell"""
+        import random
+        from generators import EntityGenerator
+        batch = EntityGenerator().generate_entities("wolf", 200, rng=random.Random(1))
+        rows = self.store.add_batch(batch, [(0, 0)] * 200)
+        self.store.remove(rows[0])
+        moved = self.store.wander(random.Random(2))
+        self.assertGreater(moved, 0)
+        self.assertEqual((self.store.x[rows[0]], self.store.y[rows[0]]), (0, 0))
+        for row in rows[1:]:
+            self.assertLessEqual(abs(self.store.x[row]) + abs(self.store.y[row]), 1)
+            
+    def test_combat_on_a_view(self):
+        """Test combat code written for Entity works on a stored creature"""
+        game_state = GameState(Player())
+        view = self.store.view(self.store.add("spider", "A spider", 5, 1, 0))
+        view.dodge_chance = 0
+        game_state.current_location.add_entity(view)
+        result = view.combat_round(50, game_state)
+        self.assertIn("defeated", result['message'])
+        self.assertNotIn(view, game_state.current_location.entities)
+        self.assertEqual(self.store.reap(), 1)
+
+class TestWorldSimulation(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.simulation = self.game_state.simulation
+        self.far = self.simulation.chunk((50, 50))  # A far-off chunk
+        
+    def test_only_active_region_ticks(self):
+        """Test a turn updates the active chunks no matter how many chunks exist"""
+        for key in [(x, 20) for x in range(30)]:
+            self.simulation.chunk(key)
+        before = self.simulation.updates
+        self.game_state.advance_time(10)
+        self.assertEqual(self.simulation.updates - before, len(self.simulation.active))
+        self.assertEqual(len(self.simulation.active), 9)
+        self.assertEqual(self.far.last_minute, 0)
+        
+    def test_idle_chunk_catches_up_on_entry(self):
+        """Test an idle chunk is brought up to date in one step when it becomes active"""
+        populations = self.simulation.populations
+        slot = self.far.slot
+        twin = populations.add(*populations.population(slot),
+                               populations.rabbit_capacity[slot], populations.deer_capacity[slot])
+        self.game_state.time.advance_time(510)
+        self.simulation.focus(800, 800)
+        self.assertEqual(self.simulation.catch_ups, 1)
+        self.assertEqual(self.far.last_minute, self.game_state.time.current_time)
+        populations.catch_up(twin, 510)
+        for value, expected in zip(populations.population(self.far.slot), populations.population(twin)):
+            self.assertAlmostEqual(value, expected)
+            
+    def test_loaded_creatures_live_in_chunk_store(self):
+        """Test a loaded location's creatures are store rows its chunk heals, freed on eviction"""
+        from entity_store import EntityView
+        location = next(location for location in
+                        (self.game_state.get_location_at(x, y) for x in range(1, 15) for y in range(1, 15))
+                        if location.entities)
+        store = self.simulation.chunk((0, 0)).creatures
+        creature = location.entities[0]
+        self.assertIsInstance(creature, EntityView)
+        self.assertIs(creature.store, store)
+        
+        creature.health = 1
+        self.game_state.advance_time(30)
+        self.assertGreater(creature.health, 1)
+        
+        rows = len(store)
+        self.simulation.release(location)
+        self.assertEqual(len(store), rows - len(location.entities))
+        
+    def _inhabited(self, cells):
+        return next(location for location in (self.game_state.get_location_at(x, y) for x, y in cells)
+                    if location.entities and location is not self.game_state.current_location)
+        
+    def test_idle_chunk_heals_on_catch_up(self):
+        """Test wounded creatures in an idle chunk are healed for the whole gap when it becomes active"""
+        location = self._inhabited((x, y) for x in range(801, 815) for y in range(801, 815))
+        creature = location.entities[0]
+        creature.health = 1
+        self.game_state.time.advance_time(600)
+        self.assertEqual(creature.health, 1)
+        self.simulation.focus(800, 800)
+        self.assertEqual(creature.health, creature.store.max_health[creature.row])
+        
+    def test_respawn_and_item_decay(self):
+        """Test removed residents come back and dropped items decay, except quest items"""
+        from world_simulation import RESPAWN_MINUTES, ITEM_DECAY_MINUTES
+        location = self._inhabited((x, y) for x in range(1, 15) for y in range(1, 15))
+        resident = location.entities[0]
+        location.remove_entity(resident)
+        stick = Item("stick", "A dry stick", item_type=Item.MISC)
+        letter = Item("sealed letter", "A letter for someone", item_type=Item.QUEST_ITEM)
+        location.add_item(stick)
+        location.add_item(letter)
+        self.game_state.advance_time(10)
+        self.assertNotIn(resident.name, [entity.name for entity in location.entities])
+        
+        self.game_state.advance_time(RESPAWN_MINUTES)
+        self.assertIn(resident.name, [entity.name for entity in location.entities])
+        self.assertEqual(location.changes.entities_removed, [])
+        self.game_state.advance_time(ITEM_DECAY_MINUTES)
+        self.assertNotIn(stick, location.items)
+        self.assertIn(letter, location.items)
+        
+    def test_unloaded_delta_settles_on_load(self):
+        """Test a removal stored while a location was out of memory still respawns on time"""
+        from base_classes import LocationDelta
+        from world_simulation import RESPAWN_MINUTES
+        location = self._inhabited((x, y) for x in range(1, 15) for y in range(1, 15))
+        name = location.entities[0].name
+        location.remove_entity(location.entities[0])
+        self.simulation.release(location)
+        delta = LocationDelta.from_dict(location.changes.to_dict())
+        self.assertEqual(delta.entities_removed_at, [0])
+        
+        self.game_state.location_deltas[location.coordinates] = delta
+        self.game_state.time.advance_time(RESPAWN_MINUTES)
+        reloaded = self.game_state.get_location_at(*location.coordinates)
+        self.assertEqual([entity.name for entity in reloaded.entities].count(name),
+                         [entity.name for entity in location.entities].count(name) + 1)
+
+    def test_reset_forgets_chunks(self):
+        """Test loading a different world drops the simulated chunks"""
+        self.game_state.reset_world(7, {}, (0, 0))
+        self.assertNotIn((50, 50), self.simulation.chunks)
+        self.assertEqual(len(self.simulation.active), 9)
+
+class TestPopulationModel(unittest.TestCase):
+    def setUp(self):
+        from population_model import PopulationModel
+        self.model = PopulationModel()
+        self.capacities = (9.0, 3.0)
+        
+    def test_equilibrium_is_steady(self):
+        """Test a chunk at its equilibrium stays there, stepped or caught up"""
+        settled = self.model.equilibrium(*self.capacities)
+        self.assertGreater(settled[2], 0)
+        stepped = self.model.add(*settled, *self.capacities)
+        caught_up = self.model.add(*settled, *self.capacities)
+        self.model.step([stepped], 3 * 1440)
+        self.model.catch_up(caught_up, 3 * 1440)
+        for slot in (stepped, caught_up):
+            for value, expected in zip(self.model.population(slot), settled):
+                self.assertAlmostEqual(value, expected, places=6)
+                
+    def test_catch_up_matches_stepping(self):
+        """Test the closed-form catch-up lands where stepping through the time does"""
+        settled = self.model.equilibrium(*self.capacities)
+        start = (settled[0] * 1.2, settled[1] * 0.8, settled[2] * 1.1)
+        stepped = self.model.add(*start, *self.capacities)
+        caught_up = self.model.add(*start, *self.capacities)
+        for days in (1, 5, 60):
+            self.model.step([stepped], days * 1440)
+            self.model.catch_up(caught_up, days * 1440)
+            for value, expected in zip(self.model.population(caught_up), self.model.population(stepped)):
+                self.assertAlmostEqual(value, expected, delta=0.1 * max(expected, 1))
+                
+        # Without wolves the prey grow logistically, which catch-up solves exactly
+        stepped = self.model.add(1.0, 0.5, 0.0, *self.capacities)
+        caught_up = self.model.add(1.0, 0.5, 0.0, *self.capacities)
+        self.model.step([stepped], 4 * 1440)
+        self.model.catch_up(caught_up, 4 * 1440)
+        for value, expected in zip(self.model.population(caught_up), self.model.population(stepped)):
+            self.assertAlmostEqual(value, expected, delta=0.05)
+            
+    def test_extinct_species_stay_gone(self):
+        """Test a species wiped out of a chunk doesn't come back"""
+        slot = self.model.add(0.0, 2.0, 3.0, *self.capacities)
+        self.model.step([slot], 1440)
+        self.model.catch_up(slot, 30 * 1440)
+        self.assertEqual(self.model.population(slot)[0], 0)
+        
+    def test_kills_and_befriending_reduce_wolves(self):
+        """Test wolves the player kills or tames leave their chunk's population"""
+        game_state = GameState(Player())
+        simulation = game_state.simulation
+        location = game_state.current_location
+        slot = simulation.chunk((0, 0)).slot
+        simulation.populations.adjust(slot, "wolf", 5)
+        
+        wolf = game_state.entity_generator.generate_entity("wolf")
+        location.add_entity(wolf)
+        wolves = simulation.populations.population(slot)[2]
+        wolf.health = 1
+        wolf.dodge_chance = 0
+        wolf.combat_round(10, game_state)
+        self.assertNotIn(wolf, location.entities)
+        self.assertAlmostEqual(simulation.populations.population(slot)[2], wolves - 1)
+        
+        tame = game_state.entity_generator.generate_entity("wolf")
+        meat = Item("raw meat", "A cut of meat", item_type="food")
+        game_state.player.add_item(meat)
+        tame.feed(meat, game_state)
+        self.assertFalse(tame.hostile)
+        self.assertAlmostEqual(simulation.populations.population(slot)[2], wolves - 2)
+        
+    def test_arrivals_follow_populations(self):
+        """Test the animals wandering into a chunk come from its current populations"""
+        game_state = GameState(Player())
+        simulation = game_state.simulation
+        slot = simulation.chunk((0, 0)).slot
+        rabbits, deer, wolves = simulation.populations.population(slot)
+        simulation.populations.adjust(slot, "wolf", -wolves)
+        simulation.populations.adjust(slot, "deer", -deer)
+        locations = [game_state.world_generator.generate_location_at(x, y, game_state)
+                     for x in range(1, 15) for y in range(1, 15)]
+        locations = [location for location in locations if location.location_type != "cave"]
+        kinds = {game_state.encounters._arrival_kind(location) for location in locations}
+        self.assertEqual(kinds - {None}, {"rabbit"})
+        
+        simulation.populations.adjust(slot, "rabbit", -rabbits)
+        self.assertIsNone(game_state.encounters._arrival_kind(locations[0]))
+        
+    def test_resident_wildlife_ignores_live_populations(self):
+        """Test the animals a cell is generated with only depend on the seed"""
+        game_state = GameState(Player())
+        simulation = game_state.simulation
+        world = game_state.world_generator
+        cells = [(x, y) for x in range(1, 15) for y in range(1, 15)]
+        
+        def residents():
+            return [[entity.name for entity in world.generate_location_at(x, y, game_state).entities]
+                    for x, y in cells]
+        before = residents()
+        slot = simulation.chunk((0, 0)).slot
+        for kind, population in zip(("rabbit", "deer", "wolf"), simulation.populations.population(slot)):
+            simulation.populations.adjust(slot, kind, -population)
+        self.assertEqual(residents(), before)
+        self.assertTrue(any(before))
+
+class TestEncounters(unittest.TestCase):
+    def setUp(self):
+        import random
+        self.game_state = GameState(Player())
+        self.encounters = self.game_state.encounters
+        self.encounters.rng = random.Random(5)
+        
+    def test_poisson_draws(self):
+        """Test Poisson draws have the right mean and variance, small means and large"""
+        import random
+        import statistics
+        from encounters import poisson
+        rng = random.Random(2)
+        for mean in (0.5, 6, 40, 5000):
+            draws = [poisson(mean, rng) for _ in range(20000)]
+            self.assertAlmostEqual(statistics.mean(draws), mean, delta=0.05 * mean + 0.02)
+            self.assertAlmostEqual(statistics.pvariance(draws), mean, delta=0.1 * mean + 0.05)
+        self.assertEqual(poisson(0, rng), 0)
+        
+    def test_rates_follow_time_of_day(self):
+        """Test expected arrivals integrate the hourly rate over each part of the day"""
+        from encounters import ENCOUNTER_RATES
+        rates = ENCOUNTER_RATES["forest"]
+        self.assertEqual(self.game_state.time.get_time_of_day(19 * 60), "Evening")
+        self.assertAlmostEqual(self.encounters.expected_arrivals("forest", 0, 60), rates["Night"])
+        self.assertAlmostEqual(self.encounters.expected_arrivals("forest", 23 * 60, 25 * 60),
+                               rates["Evening"] + rates["Night"])
+        self.assertAlmostEqual(self.encounters.expected_arrivals("forest", 100, 100 + 3 * 1440),
+                               3 * 6 * sum(rates.values()))
+        self.assertEqual(self.encounters.expected_arrivals("cave_room", 0, 1440), 0)
+        
+    def test_first_visit_starts_the_clock(self):
+        """Test a location only gathers arrivals for time after it was first seen"""
+        from base_classes import Location
+        cave = Location("cave", "A dark cave")
+        self.assertEqual(self.encounters.catch_up(cave), [])
+        self.assertEqual(cave.last_seen, self.game_state.time.current_time)
+        
+        self.game_state.time.advance_time(3 * 1440)
+        arrivals = self.encounters.catch_up(cave)
+        self.assertTrue(arrivals)
+        self.assertTrue(all(creature.name in self.game_state.entity_generator.bestiary["bat"]["variants"]
+                            + self.game_state.entity_generator.bestiary["bat"]["rare_variants"]
+                            for creature in arrivals))
+        self.assertFalse(cave.is_modified())  # Arrivals are transient, not player changes
+        
+    def test_long_waits_stay_bounded(self):
+        """Test a very long wait adds at most a few creatures and runs in one draw"""
+        from encounters import MAX_CREATURES
+        location = self.game_state.current_location
+        self.game_state.time.advance_time(100 * 365 * 1440)
+        self.encounters.catch_up(location)
+        self.assertLessEqual(len(location.entities), MAX_CREATURES)
+        self.assertEqual(self.encounters.catch_up(location), [])  # No time has passed since
+
+class TestNPCPopulation(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.npcs = self.game_state.npcs
+        
+    def test_built_on_first_meeting(self):
+        """Test a new game doesn't build the NPCs until the player could meet one"""
+        self.assertFalse(self.npcs.populated)
+        self.assertEqual(self.npcs.tick(), 0)
+        self.game_state.move("north")
+        self.assertTrue(self.npcs.populated)
+        
+    def _index_matches(self):
+        for npc in range(len(self.npcs.kinds)):
+            if self.npcs.alive[npc]:
+                self.assertIn(npc, self.npcs.cells[(self.npcs.xs[npc], self.npcs.ys[npc])])
+                
+    def test_population_is_compact(self):
+        """Test NPCs live in typed arrays with their wares as ids into a shared table"""
+        from npc_population import NPC_COUNT
+        self.assertEqual(len(self.npcs), NPC_COUNT)
+        self.assertEqual(self.npcs.xs.typecode, 'i')
+        merchants = [npc for npc in range(NPC_COUNT) if self.npcs.kinds[npc] == 0]
+        self.assertTrue(all(len(self.npcs.stock[npc]) >= 4 for npc in merchants))
+        self.assertLess(len(self.npcs.wares), sum(len(stock) for stock in self.npcs.stock))
+        self._index_matches()
+        
+    def test_turns_have_a_fixed_budget(self):
+        """Test a turn updates a bounded number of NPCs and hermits stay put"""
+        from npc_population import TURN_BUDGET, KINDS
+        hermits = {npc: (self.npcs.xs[npc], self.npcs.ys[npc])
+                   for npc in range(len(self.npcs.kinds)) if KINDS[self.npcs.kinds[npc]] == "hermit"}
+        for _ in range(30):
+            self.game_state.time.advance_time(60)
+            self.assertLessEqual(self.npcs.tick(), TURN_BUDGET + 50)
+        self._index_matches()
+        for npc, position in hermits.items():
+            self.assertEqual((self.npcs.xs[npc], self.npcs.ys[npc]), position)
+            
+    def test_long_walks_catch_up_at_once(self):
+        """Test an NPC idle for a long time catches up its whole walk in one update"""
+        npc = self.npcs.add("traveler", (5000, 5000), 10)
+        self.npcs.walk([npc], 60 * 24 * 365)
+        self.assertEqual(self.npcs.last_minute[npc], 60 * 24 * 365)
+        self.assertNotEqual((self.npcs.xs[npc], self.npcs.ys[npc]), (5000, 5000))
+        self._index_matches()
+        
+    def test_meeting_an_npc(self):
+        """Test an NPC at the player's location becomes an entity until the player leaves"""
+        sword = Item("sword", "A fine sword", item_type="weapon", damage_bonus=4)
+        npc = self.npcs.add("traveling merchant", (1, 0), 150, [self.npcs.ware_id(sword)])
+        self.game_state.move("east")
+        merchant = next(entity for entity in self.game_state.current_location.entities
+                        if getattr(entity, 'npc_id', None) == npc)
+        self.assertFalse(merchant.hostile)
+        self.assertEqual([(item.name, item.damage_bonus) for item in merchant.inventory], [("sword", 4)])
+        self.assertFalse(self.game_state.current_location.is_modified())
+        
+        location = self.game_state.current_location
+        self.game_state.move("east")
+        self.assertNotIn(merchant, location.entities)
+        self.assertEqual((self.npcs.xs[npc], self.npcs.ys[npc]), (1, 0))  # Waited while talking
+        
+        merchant.health = 0
+        self.npcs.present[npc] = (merchant, location)
+        self.npcs.meet(self.game_state.current_location)
+        self.assertFalse(self.npcs.alive[npc])
+        self.assertNotIn(npc, self.npcs.at(1, 0))
+        
+    def test_population_survives_saving(self):
+        """Test saves keep changed and nearby NPCs and rebuild the rest from the seed"""
+        import json
+        from npc_population import NPC_COUNT
+        self.game_state.move("north")
+        self.game_state.time.advance_time(600)
+        self.npcs.tick()
+        merchant = next(npc for npc in range(NPC_COUNT) if self.npcs.stock[npc])
+        ware = self.npcs.stock[merchant][0]
+        self.npcs.take_ware(merchant, ware)
+        self.npcs.gold[merchant] = 4321
+        self.npcs._retire(7)
+        trinket = self.npcs.ware_id(Item("brass trinket", "A trinket", item_type="misc"))
+        stranger = self.npcs.add("traveler", (40, 40), 12, [trinket])
+        before = {npc: (self.npcs.xs[npc], self.npcs.ys[npc], self.npcs.gold[npc],
+                        [self.npcs.ware_item(ware).name for ware in self.npcs.stock[npc]])
+                  for npc in (merchant, stranger)}
+        
+        data = json.loads(json.dumps(self.npcs.to_dict()))
+        self.assertLess(len(data["ids"]), NPC_COUNT // 10)
+        self.npcs.reset(data)
+        self.assertEqual(self.npcs.to_dict(), data)  # Not rebuilt just to save again
+        self.assertEqual(len(self.npcs), NPC_COUNT)
+        for npc, (x, y, gold, wares) in before.items():
+            self.assertEqual((self.npcs.xs[npc], self.npcs.ys[npc], self.npcs.gold[npc]), (x, y, gold))
+            self.assertEqual([self.npcs.ware_item(ware).name for ware in self.npcs.stock[npc]], wares)
+        self.assertFalse(self.npcs.alive[7])
+        self.assertTrue(all(self.npcs.last_minute[npc] <= self.game_state.time.current_time
+                            for npc in range(NPC_COUNT)))
+        self._index_matches()
+
+class TestTrading(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.npcs = self.game_state.npcs
+        self.market = self.game_state.market
+        self.swords = [Item(f"{prefix} Iron sword", "A sword", item_type="weapon", damage_bonus=5)
+                       for prefix in ("Rusty", "Sharp", "Blessed")]
+        self.meat = Item("raw meat", "A cut of meat", item_type="food", food_value=30)
+        wares = [self.npcs.ware_id(item) for item in self.swords + [self.meat]]
+        self.merchant = self.npcs.add("traveling merchant", (1, 0), 500, wares)
+        
+    def _run(self, command):
+        return self.game_state.command_parser.parse(command).execute(self.game_state)
+        
+    def test_prices_per_template(self):
+        """Test values follow rarity and quality, are cached per template, and skip quest items"""
+        prices = self.npcs.prices
+        rusty, sharp, blessed = (prices.value(sword) for sword in self.swords)
+        self.assertLess(rusty, sharp)
+        self.assertLess(sharp, blessed)
+        self.assertIn((self.swords[0].name, self.swords[0].rarity), prices.values)
+        rare = Item("Rusty Iron sword", "A sword", item_type="weapon", rarity=Item.RARE, damage_bonus=5)
+        self.assertGreater(prices.value(rare), rusty)
+        note = Item("mysterious note", "A note", item_type="quest_item", rarity=Item.QUEST)
+        self.assertIsNone(prices.value(note))
+        
+    def test_charisma_moves_prices(self):
+        """Test charming players pay less and get more, but never profit from a round trip"""
+        from trading import buy_factor, sell_factor
+        for charisma in range(0, 40):
+            self.assertLess(sell_factor(charisma), buy_factor(charisma))
+        player = self.game_state.player
+        player.charisma = 5
+        asking, offer = self.market.asking_price(100), self.market.offer(100)
+        player.charisma = 15
+        self.assertLess(self.market.asking_price(100), asking)
+        self.assertGreater(self.market.offer(100), offer)
+        
+    def test_stock_index_queries(self):
+        """Test cheapest and best-under queries answer from the sorted index"""
+        index = self.npcs.stock_index(self.merchant)
+        self.assertEqual(index.values["sword"], sorted(index.values["sword"]))
+        rusty, sharp, blessed = (self.npcs.ware_id(sword) for sword in self.swords)
+        self.assertEqual(index.cheapest("sword"), rusty)
+        self.assertEqual(index.cheapest("meat"), self.npcs.ware_id(self.meat))
+        self.assertEqual(index.best_under("sword", self.npcs.prices.value(self.swords[1])), sharp)
+        self.assertIsNone(index.best_under("sword", 0))
+        self.assertEqual(index.best_under("weapon", 10 ** 6), blessed)
+        self.npcs.take_ware(self.merchant, blessed)
+        self.assertEqual(index.best_under("sword", 10 ** 6), sharp)
+        self.assertEqual(len(index.all()), 3)
+        
+    def test_buy_and_sell(self):
+        """Test buying and selling moves items and gold between player and merchant"""
+        player = self.game_state.player
+        player.gold = 100
+        self._run("buy cheapest meat")
+        self.assertEqual(player.gold, 100)  # No merchant here yet
+        self.game_state.move("east")
+        npc, merchant = self.market.merchant()
+        self.assertEqual(npc, self.merchant)
+        
+        price = self.market.asking_price(self.npcs.prices.value(self.meat))
+        self._run("buy cheapest meat")
+        self.assertEqual(player.gold, 100 - price)
+        self.assertEqual(self.npcs.gold[npc], 500 + price)
+        self.assertIn("raw meat", [item.name for item in player.inventory])
+        self.assertNotIn("raw meat", [item.name for item in merchant.inventory])
+        self.assertEqual(len(self.npcs.stock[npc]), 3)
+        
+        budget = self.market.asking_price(self.npcs.prices.value(self.swords[1]))
+        player.gold = budget + 1
+        self._run(f"buy best sword under {budget}")
+        self.assertEqual(player.gold, 1)
+        self.assertIn("Sharp Iron sword", [item.name for item in player.inventory])
+        
+        gold = player.gold
+        meat = next(item for item in player.inventory if item.name == "raw meat")
+        self._run("sell raw meat")
+        self.assertEqual(player.gold, gold + self.market.offer(self.npcs.prices.value(meat)))
+        self.assertEqual(self.npcs.stock_index(npc).cheapest("meat"), self.npcs.ware_id(meat))
+        
+    def test_seeded_merchants_sell_food(self):
+        """Test the world's own merchants stock food, so cheapest meat finds some"""
+        from npc_population import KINDS
+        self.npcs.ensure()
+        merchants = [npc for npc in range(len(self.npcs.kinds))
+                     if KINDS[self.npcs.kinds[npc]] == "traveling merchant" and npc != self.merchant]
+        cheapest = [self.npcs.stock_index(npc).cheapest("meat") for npc in merchants]
+        found = [ware for ware in cheapest if ware is not None]
+        self.assertTrue(found)
+        self.assertTrue(all(self.npcs.wares[ware][0].name == "raw meat" for ware in found))
+
+class TestCrafting(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.player = self.game_state.player
+        self.player.inventory = []
+        self.recipes = self.game_state.recipes
+        
+    def _give(self, name, count, item_type="food", food_value=10):
+        for _ in range(count):
+            self.player.add_item(Item(name, f"Some {name}", item_type, food_value=food_value))
+            
+    def _run(self, command):
+        return self.game_state.command_parser.parse(command).execute(self.game_state)
+        
+    def test_recipes_compile_to_vectors(self):
+        """Test each recipe becomes counts over ingredient key indexes"""
+        bandage = self.recipes.recipes["bandage"]
+        self.assertEqual(bandage.vector, ((self.recipes.keys["herbs"], 2),))
+        for recipe in self.recipes.recipes.values():
+            for index, _ in recipe.vector:
+                self.assertIn(recipe, self.recipes.users[index])
+        
+    def test_craftable_counts(self):
+        """Test one count of the inventory says how many of each recipe can be made"""
+        self._give("raw meat", 3)
+        self._give("herbs", 5)
+        self._give("wolf pelt", 1, item_type="misc", food_value=0)
+        self.assertEqual(self.recipes.craftable(self.player.inventory),
+                         {"cooked meat": 3, "herbal tea": 5, "bandage": 2, "leather": 1})
+        self.assertEqual(self.recipes.craftable(self.player.inventory, ("craft",)),
+                         {"bandage": 2, "leather": 1})
+        self.assertEqual(self.recipes.craftable([]), {})
+        
+    def test_craft_max_in_one_turn(self):
+        """Test `cook max` uses every ingredient it can in a single action"""
+        self._give("raw meat", 4, food_value=10)
+        start = self.game_state.time.current_time
+        self._run("cook max cooked meat")
+        made = [item for item in self.player.inventory if item.name == "cooked meat"]
+        self.assertEqual(len(made), 4)
+        self.assertTrue(all(item.food_value == 20 for item in made))
+        self.assertFalse(any(item.name == "raw meat" for item in self.player.inventory))
+        self.assertEqual(self.game_state.time.current_time - start, 4 * self.recipes.recipes["cooked meat"].minutes)
+        
+    def test_batches_take_each_ingredient(self):
+        """Test every batch of a multi-ingredient recipe gets one of each ingredient"""
+        self._give("wood", 2, item_type="misc", food_value=0)
+        self._give("cloth", 2, item_type="misc", food_value=0)
+        made = self.recipes.craft(self.recipes.recipes["torch"], self.player, batches=2)
+        self.assertEqual([item.description for item in made], ["A torch made from cloth and wood"] * 2)
+        
+        self._give("herbs", 1, food_value=4)
+        self._give("bread", 1, food_value=10)
+        self._give("herbs", 1, food_value=6)
+        self._give("bread", 1, food_value=20)
+        from crafting import RecipeBook
+        book = RecipeBook(({"name": "stew", "kind": "cook", "needs": {"herbs": 1, "food": 1}, "minutes": 5,
+                            "result": ("stew", "A stew", Item.FOOD), "food_multiplier": 1.0},))
+        stews = book.craft(book.recipes["stew"], self.player, batches=2)
+        self.assertEqual([stew.food_value for stew in stews], [14, 26])
+        
+    def test_missing_ingredients_use_nothing(self):
+        """Test a recipe that can't be finished leaves the inventory alone"""
+        self._give("herbs", 1)
+        self.assertEqual(self.recipes.craft(self.recipes.recipes["bandage"], self.player), [])
+        self._run("craft bandage")
+        self.assertEqual([item.name for item in self.player.inventory], ["herbs"])
+        
+    def test_counts_match_what_craft_delivers(self):
+        """Test an item matching several keys counts once, as the key crafting picks it by"""
+        from crafting import RecipeBook
+        book = RecipeBook(({"name": "stew", "kind": "cook", "needs": {"herbs": 1, "food": 1}, "minutes": 5,
+                            "result": ("stew", "A stew", Item.FOOD)},))
+        self._give("herbs", 2)
+        self.assertEqual(book.craftable(self.player.inventory), {})
+        self.assertEqual(book.craft(book.recipes["stew"], self.player), [])
+        self._give("bread", 1)
+        self.assertEqual(book.craftable(self.player.inventory), {"stew": 1})
+        self.assertEqual(len(book.craft(book.recipes["stew"], self.player)), 1)
+        
+    def test_cooking_sets_camp_milestone(self):
+        """Test listing dishes isn't making camp, but cooking one is"""
+        self._run("cook")
+        self.assertFalse(self.game_state.milestones["made_camp"])
+        self._give("raw meat", 1)
+        self._run("cook cooked meat")
+        self.assertTrue(self.game_state.milestones["made_camp"])
+        
+    def test_camp_cooking_reports_progress(self):
+        """Test cooking from the camp menu counts for the story like the cook command"""
+        from unittest import mock
+        self._give("raw meat", 1)
+        with mock.patch("builtins.input", side_effect=["1", "1"]):
+            self._run("camp")
+        self.assertIn("cooked meat", [item.name for item in self.player.inventory])
+        self.assertIn("first_meal", self.game_state.story.fired)
+        
+    def test_meal_combines_food(self):
+        """Test a prepared meal takes two cooked foods, never raw ones"""
+        self._give("raw meat", 2)
+        self.assertNotIn("prepared meal", self.recipes.craftable(self.player.inventory))
+        self._give("bread", 1, food_value=10)
+        self._give("fruit", 1, food_value=5)
+        meal, = self.recipes.craft(self.recipes.recipes["prepared meal"], self.player)
+        self.assertAlmostEqual(meal.food_value, 18)
+        self.assertEqual(meal.description, "A tasty meal made from bread and fruit")
+        
+class TestGearIndex(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.player = self.game_state.player
+        self.axe = Item("heavy axe", "An axe", "weapon", damage_bonus=9, defense_bonus=0)
+        self.sword = Item("long sword", "A sword", "weapon", damage_bonus=6, defense_bonus=4)
+        self.plate = Item("plate armor", "Armor", "armor", defense_bonus=8)
+        self.hide = Item("hide armor", "Armor", "armor", damage_bonus=2, defense_bonus=3)
+        for item in (self.axe, self.sword, self.plate, self.hide):
+            self.player.add_item(item)
+            
+    def _run(self, command):
+        return self.game_state.command_parser.parse(command).execute(self.game_state)
+        
+    def test_index_follows_inventory(self):
+        """Test the per-slot indexes track adds, removes and reassignment"""
+        gear = self.player.inventory.gear
+        self.assertIs(gear.best("weapon", "damage"), self.axe)
+        self.assertIs(gear.best("weapon", "balanced"), self.sword)
+        self.player.remove_item(self.axe)
+        self.assertIs(gear.best("weapon", "damage"), self.sword)
+        self.player.inventory = [self.hide]
+        gear = self.player.inventory.gear
+        self.assertIsNone(gear.best("weapon", "damage"))
+        self.assertIs(gear.best("armor", "defense"), self.hide)
+        
+    def test_duplicates_and_changed_items(self):
+        """Test an item carried twice stays indexed until its last copy goes, and changed stats re-rank it"""
+        gear = self.player.inventory.gear
+        self.player.add_item(self.axe)
+        self.player.remove_item(self.axe)
+        self.assertIs(gear.best("weapon", "damage"), self.axe)
+        self.player.remove_item(self.axe)
+        self.assertIs(gear.best("weapon", "damage"), self.sword)
+        self.assertEqual(len(gear.items[("weapon", "damage")]), 1)
+        self.sword.damage_bonus = 0
+        self.hide.defense_bonus = 20
+        gear.refresh(self.hide)
+        self.assertIs(gear.best("armor", "defense"), self.hide)
+        self.assertEqual(gear.best("weapon", "damage"), self.sword)
+        self.assertEqual(gear.scores[("weapon", "damage")][-1], (0, 4))
+        self.player.remove_item(self.sword)
+        self.assertIsNone(gear.best("weapon", "damage"))
+        
+    def test_best_loadout(self):
+        """Test each slot's pick beats what is already equipped"""
+        self.assertEqual(self.player.best_loadout("damage"), {"weapon": self.axe, "armor": self.hide})
+        self.assertEqual(self.player.best_loadout("defense"), {"weapon": self.sword, "armor": self.plate})
+        self.player.equip(self.axe)
+        self.assertNotIn("weapon", self.player.best_loadout("damage"))
+        
+    def test_equip_best_command(self):
+        """Test `equip best` swaps every slot in one go and returns old gear to the inventory"""
+        self.player.equip(self.hide)
+        self._run("equip best defense")
+        self.assertIs(self.player.equipped["weapon"], self.sword)
+        self.assertIs(self.player.equipped["armor"], self.plate)
+        self.assertIn(self.hide, self.player.inventory)
+        self.assertNotIn(self.plate, self.player.inventory)
+        self.assertIs(self.player.inventory.gear.best("armor", "defense"), self.hide)
+        
+    def test_equip_keeps_unequippable_items(self):
+        """Test equipping something without a slot leaves it in the inventory"""
+        note = self.player.inventory[0]
+        self.player.equip(note)
+        self.assertIn(note, self.player.inventory)
+        
+class TestAchievementDispatch(unittest.TestCase):
+    def setUp(self):
+        from achievements import AchievementManager
+        self.game_state = GameState(Player())
+        self.achievements = AchievementManager()  # Untouched by the game's own actions
+        
+    def test_listeners_by_action(self):
+        """Test achievements are registered against the actions they listen for"""
+        self.assertEqual(self.achievements.listeners["cook"], ["survivalist", "master_chef"])
+        self.assertEqual(self.achievements.listeners["discover_location"], ["explorer"])
+        
+    def test_unlocked_achievements_stop_listening(self):
+        """Test unlocking deregisters an achievement and its action is dropped once nobody listens"""
+        messages = self.achievements.check_achievement(None, "move", {})
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(self.achievements.is_unlocked("first_steps"))
+        self.assertNotIn("move", self.achievements.listeners)
+        self.assertEqual(self.achievements.check_achievement(None, "move", {}), [])
+        self.achievements.unlock("survivalist")
+        self.assertEqual(self.achievements.listeners["cook"], ["master_chef"])
+        
+    def test_distinct_progress_bitset(self):
+        """Test repeated values don't count twice towards distinct-value achievements"""
+        for location_type in ("forest", "forest", "cave", "cave"):
+            self.achievements.check_achievement(None, "discover_location", {"location_type": location_type})
+        self.assertEqual(self.achievements.get_progress("explorer"), 2)
+        self.assertFalse(self.achievements.is_unlocked("explorer"))
+        messages = self.achievements.check_achievement(None, "discover_location", {"location_type": "meadow"})
+        self.assertIn("Explorer", messages[0])
+        self.assertNotIn("discover_location", self.achievements.listeners)
+        
+    def test_conditions_filter_actions(self):
+        """Test an action failing an achievement's condition doesn't count"""
+        self.achievements.check_achievement(None, "befriend", {"creature": "wolf", "damage_taken": 5})
+        self.assertFalse(self.achievements.is_unlocked("wolf_whisperer"))
+        self.achievements.check_achievement(None, "befriend", {"creature": "wolf", "damage_taken": 0})
+        self.assertTrue(self.achievements.is_unlocked("wolf_whisperer"))
+        
+    def test_model_system_listeners(self):
+        """Test the achievement models keep listeners and distinct-item bitsets too"""
+        system = AchievementSystem()
+        self.assertEqual(system.listeners["defeat_enemy"],
+                         ["rare_hunter", "legendary_hunter", "ghost_wolf_slayer"])
+        collector = system.achievements["rare_collector"]
+        for name in ("ruby", "ruby", "opal"):
+            system._advance(collector, None, {"item_name": name, "rarity": "rare"})
+        system._advance(collector, None, {"item_name": "pebble", "rarity": "common"})
+        self.assertEqual(collector.progress, 2)
+        self.assertEqual(bin(collector.seen).count("1"), 2)
+        
+    def test_game_actions_reach_achievements(self):
+        """Test moving, cooking and taming in play count, and progress survives a save"""
+        game_state = self.game_state
+        achievements = game_state.achievements
+        player = game_state.player
+        player.inventory = []
+        game_state.move("north")
+        self.assertTrue(achievements.is_unlocked("first_steps"))
+        
+        for name in ("raw meat", "herbs"):
+            player.add_item(Item(name, "Something to cook", item_type="food", food_value=10))
+        game_state.current_location.entities = []
+        for recipe in ("cooked meat", "herbal tea"):
+            game_state.command_parser.parse(f"cook {recipe}").execute(game_state)
+        self.assertTrue(achievements.is_unlocked("survivalist"))
+        self.assertEqual(achievements.get_progress("master_chef"), 2)
+        
+        wolf = game_state.entity_generator.generate_entity("wolf")
+        game_state.current_location.add_entity(wolf)
+        player.add_item(Item("raw meat", "A cut of meat", item_type="food"))
+        game_state.command_parser.parse("feed wolf raw meat").execute(game_state)
+        self.assertTrue(achievements.is_unlocked("wolf_whisperer"))
+        
+        game_state.save_system.save_game(game_state, "achievements_save.json")
+        loaded = GameState(Player())
+        loaded.save_system.load_game(loaded, "achievements_save.json")
+        os.remove(os.path.join(loaded.save_system.save_dir, "achievements_save.json"))
+        self.assertTrue(loaded.achievements.is_unlocked("wolf_whisperer"))
+        self.assertNotIn("befriend", loaded.achievements.listeners)
+        self.assertEqual(loaded.achievements.get_progress("master_chef"), 2)
+        loaded.achievements.check_achievement(None, "cook", {"meal_type": "herbal tea"})
+        self.assertEqual(loaded.achievements.get_progress("master_chef"), 2)  # Already counted
+        
+class TestStoryRules(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState(Player())
+        self.story = self.game_state.story
+        
+    def test_rules_indexed_by_action_and_field(self):
+        """Test rules are filed under their action and first wanted context value"""
+        buckets = self.story.rules.index["enter_location"]
+        self.assertEqual([rule["id"] for rule in buckets[("location_type", "cave")]], ["first_cave"])
+        self.assertEqual([rule["id"] for rule in self.story.rules.candidates("enter_location", {"location_type": "meadow"})], [])
+        self.assertEqual([rule["id"] for rule in self.story.rules.candidates("cook", {"recipe": "herbal tea"})], ["first_meal"])
+        
+    def test_one_shot_rules_removed(self):
+        """Test a rule fires once, applies its effects and leaves the index"""
+        update = self.story.check_progress(self.game_state, "enter_location", {"location_type": "cave"})
+        self.assertIn("first cave", update)
+        self.assertTrue(self.game_state.milestones["cave_discovered"])
+        self.assertEqual(self.story.quest_stages["crystals"], 1)
+        self.assertIn("mysteries", self.story.discovered_chapters)
+        self.assertNotIn(("location_type", "cave"), self.story.rules.index["enter_location"])
+        self.assertIsNone(self.story.check_progress(self.game_state, "enter_location", {"location_type": "cave"}))
+        self.assertEqual(self.story.quest_stages["crystals"], 1)
+        
+    def test_flags_order_quest_stages(self):
+        """Test a rule waiting on a flag only fires once an earlier rule set it"""
+        context = {"target": "wolf", "item": "raw meat", "befriended": True}
+        first = self.story.check_progress(self.game_state, "feed", context)
+        self.assertIn("trust", first)
+        self.assertEqual(self.story.quest_stages["wolves"], 2)
+        self.assertTrue(self.story.get_flag("fed_once"))
+        second = self.story.check_progress(self.game_state, "feed", context)
+        self.assertIn("one of their own", second)
+        self.assertEqual(self.story.quest_stages["wolves"], 3)
+        self.assertIn("wolf_friend", self.story.active_paths)
+        self.assertNotIn("feed", self.story.rules.index)
+        
+    def test_feeding_reports_befriending(self):
+        """Test the feed command tells the story whether the meal won the wolf over"""
+        wolf = Entity("wolf", "A wolf")
+        self.game_state.current_location.add_entity(wolf)
+        player = self.game_state.player
+        for _ in range(2):
+            player.add_item(Item("raw meat", "A cut of meat", "food", food_value=10))
+        player.add_item(Item("bread", "A loaf", "food", food_value=10))
+        self.game_state.command_parser.parse("feed wolf bread").execute(self.game_state)
+        self.assertNotIn("feed_the_wolves", self.story.fired)
+        self.game_state.command_parser.parse("feed wolf meat").execute(self.game_state)
+        self.assertIn("feed_the_wolves", self.story.fired)
+        self.game_state.command_parser.parse("feed wolf meat").execute(self.game_state)
+        self.assertIn("earn_trust", self.story.fired)
+        
+    def test_unmatched_context_does_nothing(self):
+        """Test events missing a wanted value leave the rules in place"""
+        self.assertIsNone(self.story.check_progress(self.game_state, "feed", {"target": "wolf", "befriended": False}))
+        self.assertIsNone(self.story.check_progress(self.game_state, "feed", {"target": "bat", "befriended": True}))
+        self.assertIn("feed_the_wolves", self.story.rules.by_id)
+        
+    def test_fired_rules_survive_save(self):
+        """Test loading a game drops the one-shot rules it had fired"""
+        self.story.check_progress(self.game_state, "cook", {"recipe": "cooked meat"})
+        self.game_state.save_system.save_game(self.game_state, "story_rules_test.json")
+        loaded_state = GameState(Player())
+        loaded_state.save_system.load_game(loaded_state, "story_rules_test.json")
+        self.assertIn("first_meal", loaded_state.story.fired)
+        self.assertNotIn("cook", loaded_state.story.rules.index)
+        
+    def tearDown(self):
+        path = os.path.join(self.game_state.save_system.save_dir, "story_rules_test.json")
+        if os.path.exists(path):
+            os.remove(path)
+            
 class TestSaveSystem(unittest.TestCase):
     def setUp(self):
         self.game_state = GameState(Player())
@@ -591,6 +2051,13 @@ class TestNeedSystem(unittest.TestCase):
         self.player.update_needs()
         self.assertLess(self.player.health, initial_health)
         
+        # A long stretch costs a point for every tick spent starving
+        self.player.health = initial_health
+        self.player.hunger = 1
+        self.player.thirst = 50
+        self.player.update_needs(10)
+        self.assertEqual(self.player.health, initial_health - 9)
+        
         # Test energy effects
         self.player.energy = 10
         self.player.update_needs()
@@ -804,6 +2271,32 @@ class TestLevelingSystem(unittest.TestCase):
         next_level = self.leveling_system.calculate_level(exp + 1)
         self.assertGreaterEqual(next_level, level)
 
+    def test_levels_past_first_thresholds(self):
+        """Test exp keeps earning levels once the hand-set thresholds run out"""
+        self.assertEqual(self.leveling_system.calculate_level(999), 4)
+        self.assertEqual(self.leveling_system.exp_to_next_level(1000), self.leveling_system.level_thresholds[4] - 1000)
+        level = self.leveling_system.calculate_level(10 ** 9)
+        self.assertGreater(level, 100)
+        thresholds = self.leveling_system.level_thresholds
+        self.assertLessEqual(thresholds[level - 2], 10 ** 9)
+        self.assertGreater(thresholds[level - 1], 10 ** 9)
+        
+    def test_thresholds_generated_lazily(self):
+        """Test thresholds are only generated as far as exp reaches"""
+        self.leveling_system.calculate_level(500)
+        self.assertEqual(len(self.leveling_system.level_thresholds), 4)
+        self.leveling_system.calculate_level(5000)
+        self.assertGreater(self.leveling_system.level_thresholds[-1], 5000)
+        self.assertGreater(self.leveling_system.level_thresholds[-2], 1000)
+        
+    def test_custom_curve(self):
+        """Test a configured curve sets the exp between levels"""
+        from models.leveling import exponential_curve
+        leveling = LevelingSystem(exponential_curve(scale=1000, growth=2))
+        self.assertEqual(leveling.exp_to_next_level(1000), 2000)
+        self.assertEqual(leveling.calculate_level(3000), 6)
+        self.assertEqual(leveling.calculate_level(7000), 7)
+        
 class TestDisplaySystem(unittest.TestCase):
     def setUp(self):
         self.display = Display()
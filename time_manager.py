@@ -1,3 +1,7 @@
+DAY_PARTS = ("Night", "Morning", "Afternoon", "Evening")  # Six hours each, from midnight
+PART_MINUTES = 360
+
+
 class TimeManager:
     def __init__(self):
         self.current_time = 0  # Time in minutes
@@ -12,20 +16,11 @@ class TimeManager:
         
         return new_day > old_day
         
-    def get_time_of_day(self):
-        """Get the current time of day as a string"""
-        minutes_today = self.current_time % self.minutes_per_day
-        hours = minutes_today // 60
-        minutes = minutes_today % 60
-        
-        if hours < 6:
-            return "Night"
-        elif hours < 12:
-            return "Morning"
-        elif hours < 18:
-            return "Afternoon"
-        else:
-            return "Evening"
+    def get_time_of_day(self, minute=None):
+        """Get the time of day as a string, now or at a given game minute"""
+        if minute is None:
+            minute = self.current_time
+        return DAY_PARTS[minute % self.minutes_per_day // PART_MINUTES]
             
     def get_formatted_time(self):
         """Get the current time formatted as HH:MM"""
@@ -0,0 +1,214 @@
+import math
+from bisect import bisect_left, bisect_right
+
+# Value ranges of the kinds of item merchants deal in; an item's base value is the middle
+VALUE_RANGES = {
+    "sword": (10, 50), "dagger": (5, 25), "axe": (12, 55), "spear": (8, 40), "mace": (10, 45),
+    "helmet": (8, 35), "chest": (15, 60), "chestplate": (15, 60), "boots": (6, 30), "shield": (10, 40),
+    "bread": (2, 8), "meat": (4, 12), "fruit": (1, 6), "herbs": (3, 15),
+    "key": (5, 20), "scroll": (8, 30), "artifact": (20, 80)
+}
+DEFAULT_VALUE_RANGE = (2, 10)
+RARITY_VALUES = {
+    "common": 1.0, "uncommon": 1.5, "rare": 2.5, "epic": 4.0,
+    "legendary": 8.0, "mythic": 12.0, "unique": 10.0
+}  # Quest items are missing on purpose: they can't be traded
+# Words in an item's name that say something about its quality
+QUALITY_WORDS = {
+    "cursed": 0.5, "rusty": 0.6, "worn": 0.7, "raw": 0.7, "bone": 0.8, "leather": 0.8, "hide": 0.8,
+    "light": 0.9, "bronze": 0.9, "heavy": 1.1, "chain": 1.1, "sharp": 1.2, "sturdy": 1.2,
+    "scale": 1.2, "lost": 1.2, "cooked": 1.2, "steel": 1.3, "mysterious": 1.3, "plate": 1.4,
+    "ancient": 1.5, "relic": 1.5, "crystal": 1.6, "sacred": 1.6, "blessed": 1.8, "enchanted": 1.8
+}
+BONUS_VALUE = 2.0  # Gold per point of damage or defense bonus
+FOOD_VALUE = 0.1   # Gold per point of food value
+
+MERCHANT = "traveling merchant"
+AVERAGE_CHARISMA = 5
+CHARISMA_STEP = 0.03  # Each point of charisma moves prices this much in the player's favour
+
+
+def kind_of(template):
+    """The kind of item a template is, e.g. "sword" for a Sharp Iron sword"""
+    return template.name.split()[-1].lower()
+
+
+def buy_factor(charisma):
+    """What merchants charge, as a multiple of an item's value"""
+    return max(1.05, 1.5 - CHARISMA_STEP * (charisma - AVERAGE_CHARISMA))
+
+
+def sell_factor(charisma):
+    """What merchants pay, as a multiple of an item's value; always below buy_factor"""
+    return min(0.95, max(0.2, 0.5 + CHARISMA_STEP * (charisma - AVERAGE_CHARISMA)))
+
+
+class PriceTable:
+    """Item values, worked out once per template
+
+    A template's value comes from the base value of its kind, its rarity
+    and the quality words in its name. An item adds the worth of its own
+    rolled bonuses on top, so pricing any item is a dictionary lookup and
+    a little arithmetic. Untradeable items are worth None.
+    """
+    def __init__(self):
+        self.values = {}  # (name, rarity) -> value, or None
+
+    def template_value(self, template):
+        # The value only depends on the name and rarity, so templates differing elsewhere share it
+        fields = (template.name, template.rarity)
+        if fields in self.values:
+            return self.values[fields]
+        rarity = RARITY_VALUES.get(template.rarity)
+        if rarity is None:
+            value = None
+        else:
+            low, high = VALUE_RANGES.get(kind_of(template), DEFAULT_VALUE_RANGE)
+            value = (low + high) / 2 * rarity
+            for word in template.name.lower().split():
+                value *= QUALITY_WORDS.get(word, 1.0)
+        self.values[fields] = value
+        return value
+
+    def ware_value(self, template, damage_bonus=0, defense_bonus=0, food_value=0):
+        """Value of an item given as its template and bonuses, in whole gold"""
+        value = self.template_value(template)
+        if value is None:
+            return None
+        value += BONUS_VALUE * (damage_bonus + defense_bonus) + FOOD_VALUE * food_value
+        return max(1, round(value))
+
+    def value(self, item):
+        return self.ware_value(item.template, item.damage_bonus, item.defense_bonus, item.food_value)
+
+
+class StockIndex:
+    """A merchant's stock, sorted by value within each kind of item
+
+    Each kind ("sword", and also the broader "weapon") keeps a sorted list
+    of values with the matching ware ids alongside; the None kind holds
+    everything. Finding the cheapest of a kind, or the best one below a
+    price, is a bisection.
+    """
+    def __init__(self):
+        self.values = {}  # kind -> sorted list of values
+        self.wares = {}   # kind -> ware ids in the same order
+
+    def add(self, kinds, value, ware):
+        for key in (*kinds, None):
+            values = self.values.setdefault(key, [])
+            position = bisect_right(values, value)
+            values.insert(position, value)
+            self.wares.setdefault(key, []).insert(position, ware)
+
+    def remove(self, kinds, value, ware):
+        for key in (*kinds, None):
+            values, wares = self.values[key], self.wares[key]
+            position = bisect_left(values, value)
+            while wares[position] != ware:
+                position += 1
+            del values[position]
+            del wares[position]
+
+    def kinds(self):
+        return [kind for kind, values in self.values.items() if kind is not None and values]
+
+    def cheapest(self, kind=None):
+        wares = self.wares.get(kind)
+        return wares[0] if wares else None
+
+    def best_under(self, kind, limit):
+        """The most valuable ware of a kind worth at most limit, or None"""
+        values = self.values.get(kind)
+        if not values:
+            return None
+        position = bisect_right(values, limit)
+        return self.wares[kind][position - 1] if position else None
+
+    def all(self):
+        return list(self.wares.get(None, ()))
+
+
+class Market:
+    """Trading with the merchant at the player's location
+
+    Prices are item values scaled by buy_factor or sell_factor of the
+    player's charisma. Stock lives in the NPC population, which keeps a
+    StockIndex per merchant for the queries behind `buy cheapest meat`
+    and `buy best sword under 40`.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+
+    @property
+    def prices(self):
+        return self.game_state.npcs.prices
+
+    def merchant(self):
+        """Return (NPC id, Entity) of a merchant at the player's location, or None"""
+        npcs = self.game_state.npcs
+        for npc, (entity, location) in npcs.present.items():
+            if location is self.game_state.current_location and entity.name == MERCHANT:
+                return npc, entity
+        return None
+
+    def asking_price(self, value):
+        return math.ceil(value * buy_factor(self.game_state.player.charisma))
+
+    def offer(self, value):
+        return math.floor(value * sell_factor(self.game_state.player.charisma))
+
+    def find_ware(self, npc, words):
+        """Find a ware from `cheapest <kind>`, `best <kind> [under <gold>]` or part of its name"""
+        npcs = self.game_state.npcs
+        index = npcs.stock_index(npc)
+        words = [word.lower() for word in words]
+        if words[0] in ("cheapest", "best") and len(words) > 1:
+            kind = self._kind(index, words[1])
+            if words[0] == "cheapest":
+                return index.cheapest(kind)
+            limit = self.game_state.player.gold
+            if len(words) > 3 and words[2] in ("under", "below") and words[3].isdigit():
+                limit = int(words[3])
+            return index.best_under(kind, limit / buy_factor(self.game_state.player.charisma))
+
+        name = ' '.join(words)
+        return next((ware for ware in index.all() if name in npcs.wares[ware][0].name.lower()), None)
+
+    def _kind(self, index, word):
+        kinds = index.kinds()
+        if word not in kinds and word.endswith("s") and word[:-1] in kinds:
+            return word[:-1]  # "cheapest swords"
+        return word
+
+    def buy(self, npc, entity, ware):
+        """Buy a ware from a merchant; returns what happened"""
+        npcs = self.game_state.npcs
+        player = self.game_state.player
+        price = self.asking_price(self.prices.ware_value(*npcs.wares[ware]))
+        item = npcs.ware_item(ware)
+        if price > player.gold:
+            return f"The {item.name} costs {price} gold, but you only have {player.gold}."
+        player.gold -= price
+        npcs.gold[npc] += price
+        npcs.take_ware(npc, ware)
+        entity.inventory.remove(next(held for held in entity.inventory if npcs.ware_id(held) == ware))
+        player.add_item(item)
+        return f"You buy the {item.name} for {price} gold."
+
+    def sell(self, npc, entity, item):
+        """Sell an item from the player's inventory to a merchant; returns what happened"""
+        npcs = self.game_state.npcs
+        player = self.game_state.player
+        value = self.prices.value(item)
+        if value is None:
+            return f"The merchant won't take the {item.name}."
+        price = self.offer(value)
+        if price > npcs.gold[npc]:
+            return f"The merchant can't afford the {item.name}."
+        player.remove_item(item)
+        player.gold += price
+        npcs.gold[npc] -= price
+        npcs.give_ware(npc, npcs.ware_id(item))
+        entity.inventory.append(item)
+        return f"You sell the {item.name} for {price} gold."
@@ -1,67 +1,253 @@
 import random
+import threading
+from array import array
+from collections import OrderedDict
 from base_classes import Location
 from items import Item
-from entities import Entity
+from generators import CaveSystemGenerator
+
+CHUNK_SIZE = 16  # Locations per chunk edge
+ORIGIN = (0, 0)  # Where the starting meadow sits
+
+DIRECTION_OFFSETS = {
+    "north": (0, 1),
+    "south": (0, -1),
+    "east": (1, 0),
+    "west": (-1, 0)
+}
+
+_MASK64 = (1 << 64) - 1
+
+
+def cell_seed(world_seed, x, y):
+    """Mix the world seed and a cell's coordinates into a stable 64-bit seed"""
+    h = (world_seed * 0x9E3779B97F4A7C15
+         + x * 0xBF58476D1CE4E5B9
+         + y * 0x94D049BB133111EB) & _MASK64
+    # SplitMix64 finalizer so neighbouring cells get unrelated seeds
+    h ^= h >> 30
+    h = (h * 0xBF58476D1CE4E5B9) & _MASK64
+    h ^= h >> 27
+    h = (h * 0x94D049BB133111EB) & _MASK64
+    return h ^ (h >> 31)
+
+
+def chunk_of(x, y):
+    """Return the chunk coordinates containing the cell (x, y)"""
+    return x // CHUNK_SIZE, y // CHUNK_SIZE
+
+
+BIOMES = ("meadow", "forest", "cave")
+CAVE_ELEVATION = 0.6   # Elevation above this is rocky cave country
+FOREST_MOISTURE = 0.5  # Below the caves, moisture above this grows forest
+
+
+def _smoothstep(t):
+    return t * t * (3 - 2 * t)
+
+
+class BiomeMap:
+    """Spatially coherent biome field built from value noise
+
+    Elevation and moisture are generated for a whole chunk at once and
+    thresholded into biome indices, stored in one byte array per chunk.
+    Looking up a cell's biome is then a cache hit and an array index.
+    The cache is guarded by a lock, since the prefetcher's thread looks
+    up biomes too.
+    """
+    # (lattice spacing in cells, weight) for each noise octave
+    OCTAVES = ((8, 2 / 3), (3, 1 / 3))
+
+    def __init__(self, seed, max_chunks=256):
+        self.seed = seed
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> array('B') of biome indices
+        self.lock = threading.Lock()
+
+    def biome_at(self, x, y):
+        """Return the biome name for the cell at (x, y)"""
+        cx, cy = chunk_of(x, y)
+        tiles = self.chunk(cx, cy)
+        return BIOMES[tiles[(y - cy * CHUNK_SIZE) * CHUNK_SIZE + (x - cx * CHUNK_SIZE)]]
+
+    def chunk(self, cx, cy):
+        """Return the cached biome indices for a chunk, row by row"""
+        with self.lock:
+            tiles = self.chunks.get((cx, cy))
+            if tiles is not None:
+                self.chunks.move_to_end((cx, cy))
+                return tiles
+
+        # Building the tiles only reads the seed, so it happens outside the lock
+        elevation = self._noise_field(0, cx, cy)
+        moisture = self._noise_field(1, cx, cy)
+        tiles = array('B', [
+            2 if height > CAVE_ELEVATION else 1 if wet > FOREST_MOISTURE else 0
+            for height, wet in zip(elevation, moisture)
+        ])
+        with self.lock:
+            self.chunks[(cx, cy)] = tiles
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        return tiles
+
+    def _noise_field(self, channel, cx, cy):
+        """Sum the noise octaves over every cell of a chunk"""
+        field = array('d', bytes(8 * CHUNK_SIZE * CHUNK_SIZE))
+        for spacing, weight in self.OCTAVES:
+            octave = self._octave(channel, spacing, cx * CHUNK_SIZE, cy * CHUNK_SIZE)
+            for i, value in enumerate(octave):
+                field[i] += value * weight
+        return field
+
+    def _octave(self, channel, spacing, x0, y0):
+        """Bilinearly interpolated lattice noise for a chunk starting at (x0, y0)"""
+        offsets = range(CHUNK_SIZE)
+        # Per-column and per-row lattice cells and blend weights, shared by the whole chunk
+        columns = [((x0 + i) // spacing, _smoothstep((x0 + i) % spacing / spacing)) for i in offsets]
+        rows = [((y0 + j) // spacing, _smoothstep((y0 + j) % spacing / spacing)) for j in offsets]
+
+        lattice = {}
+        channel_seed = self.seed * 31 + channel
+        for lx in range(columns[0][0], columns[-1][0] + 2):
+            for ly in range(rows[0][0], rows[-1][0] + 2):
+                lattice[lx, ly] = cell_seed(channel_seed, lx, ly) / _MASK64
+
+        values = []
+        for ly, ty in rows:
+            for lx, tx in columns:
+                top = lattice[lx, ly] + (lattice[lx + 1, ly] - lattice[lx, ly]) * tx
+                bottom = lattice[lx, ly + 1] + (lattice[lx + 1, ly + 1] - lattice[lx, ly + 1]) * tx
+                values.append(top + (bottom - top) * ty)
+        return values
+
 
 class WorldGenerator:
-    def __init__(self):
-        self.starting_meadow_generated = False
+    def __init__(self, seed=None):
+        # Held while generating: the prefetcher generates on its own thread,
+        # and generation fills caches shared with the main thread
+        self.lock = threading.RLock()
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.cave_generator = CaveSystemGenerator()
         self.location_types = {
             'meadow': self._generate_meadow,
             'forest': self._generate_forest,
             'cave': self._generate_cave
         }
-        
-    def generate_location(self, location_type):
-        """Generate a location of the specified type"""
-        if location_type == "meadow":
-            return self._generate_meadow()
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @seed.setter
+    def seed(self, value):
+        # A new seed means a new world, so cached biomes no longer apply
+        with self.lock:
+            self._seed = value
+            self.biome_map = BiomeMap(value)
+
+    def location_rng(self, x, y):
+        """Return a random generator seeded for the cell at (x, y)"""
+        return random.Random(cell_seed(self.seed, x, y))
+
+    def generate_location_at(self, x, y, game_state, delta=None):
+        """Generate the location at (x, y) from the world seed
+
+        The same seed and coordinates always produce the same content, so a
+        location can be dropped and rebuilt later. Any stored delta of player
+        changes is replayed on top of the regenerated content. The animals
+        living in meadows and forests follow the surrounding chunk's
+        equilibrium populations; ones drawn in by the live populations
+        arrive later through the encounter scheduler.
+        """
+        with self.lock:
+            rng = self.location_rng(x, y)
+            if (x, y) == ORIGIN:
+                location = self._generate_starting_meadow(game_state, rng)
+            else:
+                location = self._generate_biome_location(x, y, game_state, rng)
+                self._add_wildlife(location, x, y, game_state, rng)
+        location.coordinates = (x, y)
+        location.track_changes(delta)
+        return location
+
+    def generate_location(self, location_type, game_state=None, rng=None, coordinates=ORIGIN):
+        """Generate a location of the specified type, or the biome's type at coordinates"""
         if location_type in self.location_types:
-            return self.location_types[location_type]()
-        return self._generate_random_location()
-        
-    def _generate_meadow(self):
-        """Generate the starting meadow location"""
-        location = Location("meadow", "A peaceful meadow")
+            return self.location_types[location_type](game_state, rng)
+        return self._generate_biome_location(*coordinates, game_state, rng)
+
+    def _generate_starting_meadow(self, game_state=None, rng=None):
+        """Generate the starting meadow with the quest note"""
+        location = self._generate_meadow(game_state, rng)
         location.description = "You find yourself in a peaceful meadow surrounded by tall grass..."
-        
+
         # Add starting note as a quest item
-        if not self.starting_meadow_generated:
-            note = Item(
-                name="mysterious note",
-                description="An old parchment with elegant script",
-                item_type="quest_item",
-                rarity=Item.QUEST  # Make it cyan to indicate quest item
-            )
-            location.add_item(note)
-            self.starting_meadow_generated = True
-        
+        note = Item(
+            name="mysterious note",
+            description="An old parchment with elegant script",
+            item_type="quest_item",
+            rarity=Item.QUEST  # Make it cyan to indicate quest item
+        )
+        location.add_item(note)
         return location
-        
-    def _generate_forest(self, game_state):
-        description = game_state.location_generator.generate_description("forest")
-        location = Location("forest", description)
-        
+
+    def _generate_meadow(self, game_state=None, rng=None):
+        """Generate a meadow location"""
+        location = Location("meadow", "A peaceful meadow")
+        if game_state:
+            location.description = game_state.location_generator.generate_description("meadow", rng)
+        else:
+            location.description = "You find yourself in a peaceful meadow surrounded by tall grass..."
+        return location
+
+    def _generate_forest(self, game_state, rng=None):
+        rng = rng or random
+        location = Location("forest", "A dense forest")
+        location.description = game_state.location_generator.generate_description("forest", rng)
+
         # Add random features
-        if random.random() < 0.4:
-            location.add_item(game_state.item_generator.generate_item())
-        if random.random() < 0.3:
-            location.add_entity(game_state.entity_generator.generate_entity("wolf", "hostile"))
-        
+        if rng.random() < 0.4:
+            category = rng.choice(["weapon", "armor"])
+            location.add_item(game_state.item_generator.generate_item(category, rng=rng))
+
         return location
-        
-    def _generate_cave(self, game_state):
-        description = game_state.location_generator.generate_description("cave")
-        location = Location("cave", description)
-        
+
+    def _add_wildlife(self, location, x, y, game_state, rng):
+        """Add the animal, if any, living at (x, y)"""
+        if location.location_type not in ("meadow", "forest") or game_state is None:
+            return
+        kind = game_state.simulation.sample_encounter(x, y, rng)
+        if kind is not None:
+            creature = game_state.entity_generator.generate_entity(kind, rng=rng)
+            creature.hostile = kind == "wolf"
+            location.add_entity(creature)
+
+    def _generate_cave(self, game_state, rng=None):
+        rng = rng or random
+        location = Location("cave", "A dark cave")
+        location.description = game_state.location_generator.generate_description("cave", rng)
+
         # Add random features
-        if random.random() < 0.4:
-            location.add_item(game_state.item_generator.generate_item())
-        if random.random() < 0.2:
-            location.add_entity(game_state.entity_generator.generate_entity("bat", "neutral"))
-            
+        if rng.random() < 0.4:
+            location.add_item(game_state.item_generator.generate_item("quest_item", rng=rng))
+        if rng.random() < 0.2:
+            location.add_entity(game_state.entity_generator.generate_entity("bat", rng=rng))
+
+        # The rooms below are only carved when someone climbs down
+        location.cave_seed = rng.getrandbits(64)
         return location
-        
-    def _generate_random_location(self):
-        location_type = random.choice(list(self.location_types.keys()))
-        return self.location_types[location_type]() 
\ No newline at end of file
+
+    def generate_cave_system(self, surface, game_state):
+        """Carve and link the cave rooms below a surface cave
+
+        Player changes to the rooms are kept in the surface location's delta,
+        so they survive the surface being evicted and regenerated.
+        """
+        room_deltas = surface.changes.rooms if surface.changes is not None else None
+        with self.lock:
+            return self.cave_generator.generate(surface, game_state, surface.cave_seed, room_deltas)
+
+    def _generate_biome_location(self, x, y, game_state=None, rng=None):
+        location_type = self.biome_map.biome_at(x, y)
+        return self.location_types[location_type](game_state, rng)
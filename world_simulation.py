@@ -0,0 +1,260 @@
+import random
+from entity_store import EntityStore, EntityView
+from population_model import PopulationModel, SPECIES
+from world_generator import BIOMES, cell_seed, chunk_of
+
+ACTIVE_RADIUS = 1  # Chunks this many rings around the player's tick every action
+SIMULATION_CHANNEL = 7  # Keeps chunk populations from echoing the per-cell location rolls
+STEP_LIMIT_MINUTES = 1440  # Longer ticks (a long wait) move populations in closed form instead
+RESPAWN_MINUTES = 720  # A creature the player removed from a cell is replaced after this long
+ITEM_DECAY_MINUTES = 2880  # Items dropped in the world rot or get carried off after this long
+
+# Carrying capacity per cell of each biome for the prey the population model tracks
+PREY_CAPACITY = {
+    "rabbit": {"meadow": 0.06, "forest": 0.03},
+    "deer": {"meadow": 0.01, "forest": 0.03}
+}
+WOLF_RANGE = {"meadow": 0.25, "forest": 1.0}  # Share of wolves' time spent in each biome
+SIGHTING_SCALE = 5.0  # Animals expected in a cell -> chance of meeting one there
+MAX_SIGHTING = 0.6
+
+
+class ChunkSimulation:
+    """The simulated state of one chunk
+
+    slot is the chunk's row in the population model and cells counts its
+    tiles of each biome. last_minute is the game time this chunk was last
+    brought up to date. creatures holds the creatures of the chunk's
+    loaded locations, which are kept in locations by coordinates.
+    """
+    __slots__ = ("key", "slot", "cells", "last_minute", "creatures", "locations")
+
+    def __init__(self, key, minute):
+        self.key = key
+        self.slot = None
+        self.cells = {}
+        self.last_minute = minute
+        self.creatures = EntityStore()
+        self.locations = {}
+
+
+class WorldSimulation:
+    """Level-of-detail simulation of the world's creatures
+
+    Rabbit, deer and wolf numbers per chunk come from a predator-prey
+    PopulationModel. Only the player's chunk and its neighbours (the
+    active region) are stepped every action. Every other chunk just
+    remembers the minute it was last simulated; when it becomes active
+    again it is caught up in one closed-form step: populations, healing
+    of its creatures, respawns and item decay. The cost of a turn
+    therefore depends on the active region, not on how much of the world
+    has been visited.
+
+    The animals living in a cell come from its chunk's equilibrium, which
+    only depends on the seed, so a cell is the same every time it's
+    generated. The live populations decide which creatures wander in
+    later, through the EncounterScheduler.
+
+    The creatures of loaded locations live in their chunk's EntityStore,
+    behind EntityViews, so a tick heals and reaps a whole chunk in one
+    pass over its wounded rows. Respawns and decay work off the minutes
+    stamped on each LocationDelta, so they come out the same however
+    late a location is settled, loaded or not.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.chunks = {}   # (cx, cy) -> ChunkSimulation
+        self.populations = PopulationModel()
+        self.active = set()
+        self.center = None
+        self.updates = 0    # Chunk updates run, counting full ticks and catch-ups
+        self.catch_ups = 0
+
+    def reset(self):
+        """Forget every simulated chunk, e.g. after loading a different world"""
+        self.chunks.clear()
+        self.populations = PopulationModel()
+        self.active.clear()
+        self.center = None
+
+    def now(self):
+        return self.game_state.time.current_time
+
+    def chunk(self, key):
+        """Return a chunk's simulation, populating it the first time it's needed"""
+        simulation = self.chunks.get(key)
+        if simulation is None:
+            simulation = self._populate(key)
+            self.chunks[key] = simulation
+        return simulation
+
+    def focus(self, x, y):
+        """Make the region around (x, y) the active one, catching up chunks that join it"""
+        center = chunk_of(x, y)
+        if center == self.center:
+            return
+        self.center = center
+        cx, cy = center
+        active = {(cx + dx, cy + dy)
+                  for dx in range(-ACTIVE_RADIUS, ACTIVE_RADIUS + 1)
+                  for dy in range(-ACTIVE_RADIUS, ACTIVE_RADIUS + 1)}
+        for key in active - self.active:
+            self.catch_up(self.chunk(key))
+        self.active = active
+
+    def tick(self, minutes):
+        """Run full updates for the active region after time has passed"""
+        now = self.now()
+        chunks = [self.chunk(key) for key in self.active]
+        slots = [simulation.slot for simulation in chunks]
+        if minutes > STEP_LIMIT_MINUTES:
+            for slot in slots:
+                self.populations.catch_up(slot, minutes)
+        else:
+            self.populations.step(slots, minutes)
+        for simulation in chunks:
+            self._advance(simulation, minutes, now)
+        self.updates += len(chunks)
+
+    def catch_up(self, simulation):
+        """Bring an idle chunk up to the present in one step"""
+        now = self.now()
+        elapsed = now - simulation.last_minute
+        if elapsed > 0:
+            self.updates += 1
+            self.catch_ups += 1
+            self.populations.catch_up(simulation.slot, elapsed)
+            self._advance(simulation, elapsed, now)
+        simulation.last_minute = now
+        
+    def _advance(self, simulation, minutes, now):
+        """Heal, reap and settle a chunk's loaded locations over some minutes"""
+        simulation.creatures.regenerate(minutes)  # Linear up to full health, so any gap is one pass
+        simulation.creatures.reap()
+        for location in list(simulation.locations.values()):
+            self._settle(simulation, location, now)
+        simulation.last_minute = now
+
+    def adopt(self, location):
+        """Move a freshly loaded location's creatures into its chunk's store"""
+        simulation = self.chunk(chunk_of(*location.coordinates))
+        previous = simulation.locations.get(location.coordinates)
+        if previous is not None and previous is not location:
+            self.release(previous)
+        simulation.locations[location.coordinates] = location
+        location.entities = [self._store(simulation, entity, location.coordinates)
+                             for entity in location.entities]
+        self._settle(simulation, location, self.now())
+
+    def admit(self, location, creature):
+        """Return what to add to a location for a new creature: its store view, if the location is kept"""
+        simulation = self._keeper(location)
+        if simulation is None:
+            return creature
+        return self._store(simulation, creature, location.coordinates)
+
+    def release(self, location):
+        """Free the store rows of a location leaving memory"""
+        simulation = self._keeper(location)
+        if simulation is None:
+            return
+        self._settle(simulation, location, self.now())  # Stamps what its delta carries away
+        del simulation.locations[location.coordinates]
+        store = simulation.creatures
+        for entity in location.entities:
+            if isinstance(entity, EntityView) and entity.store is store and entity.row is not None:
+                store.remove(entity.row)
+
+    def _keeper(self, location):
+        """The chunk simulation keeping a location's creatures, or None"""
+        coordinates = getattr(location, 'coordinates', None)
+        simulation = self.chunks.get(chunk_of(*coordinates)) if coordinates else None
+        if simulation is None or simulation.locations.get(coordinates) is not location:
+            return None
+        return simulation
+
+    def _settle(self, simulation, location, now):
+        """Respawn a location's removed creatures and decay its dropped items once due"""
+        delta = location.changes
+        if delta is None:
+            return
+        respawned, decayed = delta.expire(now, RESPAWN_MINUTES, ITEM_DECAY_MINUTES)
+        if decayed:
+            location.items = [item for item in location.items
+                              if not any(item is gone for gone in decayed)]
+        if respawned:
+            # The seed says who lived here; bring back the ones that were removed
+            fresh = self.game_state.world_generator.generate_location_at(*location.coordinates, self.game_state)
+            for name in respawned:
+                match = next((entity for entity in fresh.entities if entity.name == name), None)
+                if match is not None:
+                    fresh.entities.remove(match)
+                    location.entities.append(self._store(simulation, match, location.coordinates))
+                    
+    def _store(self, simulation, entity, position):
+        if isinstance(entity, EntityView):
+            return entity
+        return simulation.creatures.adopt(entity, position)
+
+    def sample_encounter(self, x, y, rng):
+        """Pick the kind of animal living at (x, y), or None
+
+        Uses the chunk's equilibrium rather than its live populations, so
+        the answer only depends on the seed and rng.
+        """
+        expected = self.expected_animals(x, y, settled=True)
+        if rng.random() >= min(MAX_SIGHTING, sum(expected) * SIGHTING_SCALE):
+            return None
+        return rng.choices(SPECIES, weights=expected)[0]
+
+    def expected_animals(self, x, y, settled=False):
+        """How many of each species in SPECIES are expected in the cell at (x, y)
+
+        A chunk nobody has simulated yet, or any chunk when settled is
+        set, is taken to be sitting at its equilibrium.
+        """
+        cx, cy = chunk_of(x, y)
+        simulation = self.chunks.get((cx, cy))
+        cells = simulation.cells if simulation is not None else self._count_cells(cx, cy)
+        capacities = self._prey_capacities(cells)
+        if simulation is not None and not settled:
+            populations = self.populations.population(simulation.slot)
+        else:
+            populations = self.populations.equilibrium(*capacities)
+            
+        # Each cell's share of every species follows its biome's share of their habitat
+        biome = self.game_state.world_generator.biome_map.biome_at(x, y)
+        wolf_range = sum(cells[habitat] * share for habitat, share in WOLF_RANGE.items())
+        shares = [PREY_CAPACITY[kind].get(biome, 0) / capacity if capacity else 0
+                  for kind, capacity in zip(("rabbit", "deer"), capacities)]
+        shares.append(WOLF_RANGE.get(biome, 0) / wolf_range if wolf_range else 0)
+        return [population * share for population, share in zip(populations, shares)]
+
+    def record_loss(self, name, coordinates):
+        """Take a creature the player killed or befriended out of its chunk's population"""
+        kind = self.game_state.entity_generator.kind_of(name)
+        simulation = self.chunks.get(chunk_of(*coordinates)) if coordinates else None
+        if kind in SPECIES and simulation is not None:
+            self.populations.adjust(simulation.slot, kind, -1)
+
+    def _count_cells(self, cx, cy):
+        tiles = self.game_state.world_generator.biome_map.chunk(cx, cy)
+        return {biome: tiles.count(index) for index, biome in enumerate(BIOMES)}
+
+    def _prey_capacities(self, cells):
+        return tuple(sum(cells[biome] * density for biome, density in PREY_CAPACITY[kind].items())
+                     for kind in ("rabbit", "deer"))
+
+    def _populate(self, key):
+        cx, cy = key
+        game_state = self.game_state
+        world = game_state.world_generator
+        rng = random.Random(cell_seed(world.seed * 31 + SIMULATION_CHANNEL, cx, cy))
+        simulation = ChunkSimulation(key, self.now())
+        
+        # Start every chunk somewhere near its balance, so neighbours don't move in lockstep
+        simulation.cells = self._count_cells(cx, cy)
+        capacities = self._prey_capacities(simulation.cells)
+        start = [value * rng.uniform(0.7, 1.3) for value in self.populations.equilibrium(*capacities)]
+        simulation.slot = self.populations.add(*start, *capacities)
+        return simulation